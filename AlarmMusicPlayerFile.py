@@ -1,10 +1,29 @@
+import io
 import os
 import sys
-import tkinter as tk
-from tkinter import filedialog
-import winsound
+import time
+import wave
+import logging
+import threading
+from collections import OrderedDict, deque
+
+from metrics_calendaralarmclock import METRICS
+
+# 알람 음악 재생
+# - WAV 는 wave 모듈로 한 번만 디코딩해 PCM 을 메모리 캐시(LRU, 크기 제한)에 둔다. 키는 (경로, mtime)
+# - 같은 음악을 쓰는 알람들은 버퍼 하나를 공유하고, 알람 추가 시 preload 로 미리 읽어 둔다
+# - 재생은 백엔드(winsound 메모리 재생 / 리눅스 aplay / 무음)에 맡긴다
+# - 알람 발생 -> 첫 프레임 전달까지 걸린 시간을 기록한다 (latency_stats)
+
+# 캐시 상한(바이트). CALENDARALARM_AUDIO_CACHE_MB 로 조정
+CACHE_BYTES = int(float(os.environ.get("CALENDARALARM_AUDIO_CACHE_MB") or 64) * 1024 * 1024)
+# 백엔드에 한 번에 넘기는 크기
+CHUNK_BYTES = 64 * 1024
+
+FIRST_FRAME = METRICS.histogram("alarm_audio_first_frame_seconds", "알람 발생 -> 첫 오디오 프레임 전달까지")
 
 def select_music_file():
+    from tkinter import filedialog
     # 기본 음악 폴더 경로
     default_music_folder = os.path.join(os.path.expanduser("~"), "Music")
     # 파일 선택 대화상자 열기
@@ -12,6 +31,249 @@ def select_music_file():
                                              filetypes=(("음악 파일", "*.mp3;*.wav"), ("모든 파일", "*.*")))
     return music_file
 
-def play_music(file_path):
-    if os.path.exists(file_path):
-        winsound.PlaySound(file_path, winsound.SND_FILENAME)
\ No newline at end of file
+class PCMBuffer:
+    # 디코딩된 WAV. 여러 알람이 같이 쓰므로 만든 뒤에는 바꾸지 않는다
+    # wav 는 표준 PCM RIFF 이미지(winsound 메모리 재생용), data 는 그 안의 PCM 부분(복사 없이 공유)
+    __slots__ = ("path", "wav", "data", "channels", "sampwidth", "framerate")
+
+    def __init__(self, path, pcm, channels, sampwidth, framerate):
+        bio = io.BytesIO()
+        with wave.open(bio, "wb") as w:
+            w.setnchannels(channels)
+            w.setsampwidth(sampwidth)
+            w.setframerate(framerate)
+            w.writeframes(pcm)
+        self.path = path
+        self.wav = bio.getvalue()
+        self.data = memoryview(self.wav)[len(self.wav) - len(pcm):]
+        self.channels = channels
+        self.sampwidth = sampwidth
+        self.framerate = framerate
+
+    @property
+    def nbytes(self):
+        return len(self.wav)
+
+    @property
+    def duration(self):
+        return len(self.data) / float(self.channels * self.sampwidth * self.framerate)
+
+    def chunks(self, size=CHUNK_BYTES):
+        data = self.data
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+
+def decode_wav(path):
+    with wave.open(path, "rb") as w:
+        return PCMBuffer(path, w.readframes(w.getnframes()), w.getnchannels(), w.getsampwidth(), w.getframerate())
+
+class AudioCache:
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._items = OrderedDict()   # (경로, mtime_ns) -> PCMBuffer
+        self._keys = {}               # 경로 -> 현재 키 (파일이 바뀌면 예전 버퍼를 버리기 위해)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path):
+        # WAV 가 아니거나 읽을 수 없으면 None
+        path = os.path.abspath(path)
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            return None
+        with self._lock:
+            buf = self._items.get(key)
+            if buf is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return buf
+            self.misses += 1
+        try:
+            buf = decode_wav(path)
+        except (wave.Error, EOFError, OSError):
+            return None
+        with self._lock:
+            # 다른 스레드가 먼저 넣었으면 그 버퍼를 공유
+            other = self._items.get(key)
+            if other is not None:
+                return other
+            old = self._keys.get(path)
+            if old is not None and old != key:
+                self._discard(old)
+            if buf.nbytes <= self.max_bytes:
+                self._items[key] = buf
+                self._keys[path] = key
+                self.size += buf.nbytes
+                while self.size > self.max_bytes:
+                    self._discard(next(iter(self._items)))
+                    self.evictions += 1
+        return buf
+
+    def _discard(self, key):
+        buf = self._items.pop(key, None)
+        if buf is not None:
+            self.size -= buf.nbytes
+            if self._keys.get(key[0]) == key:
+                del self._keys[key[0]]
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._keys.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self.size, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+class NullBackend:
+    # 소리를 내지 않고 버퍼만 흘려보낸다(테스트/헤드리스용)
+    name = "null"
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, buf, on_first_frame):
+        first = True
+        for _ in buf.chunks():
+            if first:
+                on_first_frame()
+                first = False
+        self.played.append(buf.path)
+
+    def play_file(self, path, on_first_frame):
+        on_first_frame()
+        self.played.append(path)
+
+class WinsoundBackend:
+    name = "winsound"
+
+    def __init__(self):
+        import winsound
+        self._ws = winsound
+
+    def play(self, buf, on_first_frame):
+        # SND_MEMORY 는 동기 재생만 지원 -> 오디오 채널 스레드에서 호출된다
+        on_first_frame()
+        self._ws.PlaySound(buf.wav, self._ws.SND_MEMORY)
+
+    def play_file(self, path, on_first_frame):
+        on_first_frame()
+        self._ws.PlaySound(path, self._ws.SND_FILENAME)
+
+class AplayBackend:
+    # 리눅스 대체: PCM 을 aplay 표준입력으로 흘려 넣는다
+    name = "aplay"
+    FORMATS = {1: "U8", 2: "S16_LE", 3: "S24_3LE", 4: "S32_LE"}
+
+    def __init__(self, exe=None):
+        import shutil
+        self.exe = exe or shutil.which("aplay")
+        if not self.exe:
+            raise RuntimeError("aplay 를 찾을 수 없습니다")
+
+    def play(self, buf, on_first_frame):
+        fmt = self.FORMATS.get(buf.sampwidth)
+        if fmt is None:
+            raise ValueError(f"지원하지 않는 샘플 크기: {buf.sampwidth}")
+        import subprocess
+        cmd = [self.exe, "-q", "-t", "raw", "-f", fmt, "-c", str(buf.channels), "-r", str(buf.framerate)]
+        proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            first = True
+            for chunk in buf.chunks():
+                proc.stdin.write(chunk)
+                if first:
+                    on_first_frame()
+                    first = False
+            proc.stdin.close()
+        except BrokenPipeError:
+            pass
+        proc.wait()
+
+    def play_file(self, path, on_first_frame):
+        import subprocess
+        on_first_frame()
+        subprocess.run([self.exe, "-q", path], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+BACKENDS = {"winsound": WinsoundBackend, "aplay": AplayBackend, "null": NullBackend}
+
+def default_backend():
+    # CALENDARALARM_AUDIO=winsound|aplay|null 로 고정 가능. 기본은 쓸 수 있는 첫 번째
+    name = os.environ.get("CALENDARALARM_AUDIO")
+    if name:
+        try:
+            return BACKENDS[name]()
+        except Exception:
+            logging.exception("오디오 백엔드 %s 사용 불가, 자동 선택으로 진행", name)
+    order = ["winsound"] if sys.platform == "win32" else ["aplay"]
+    for name in order:
+        try:
+            return BACKENDS[name]()
+        except Exception:
+            pass
+    return NullBackend()
+
+class AlarmMusicPlayer:
+    def __init__(self, backend=None, cache=None):
+        self.backend = backend if backend is not None else default_backend()
+        self.cache = cache if cache is not None else AudioCache()
+        self._lock = threading.Lock()
+        self.latencies = deque(maxlen=256)  # 알람 발생 -> 첫 프레임(초)
+
+    def preload(self, file_path):
+        return self.cache.get(file_path) if file_path else None
+
+    def play(self, file_path, triggered_at=None):
+        # triggered_at: 알람 발생 시점 time.perf_counter() (없으면 지금부터 잰다)
+        if triggered_at is None:
+            triggered_at = time.perf_counter()
+        if not os.path.exists(file_path):
+            return False
+
+        def first_frame():
+            lat = time.perf_counter() - triggered_at
+            FIRST_FRAME.observe(lat)
+            with self._lock:
+                self.latencies.append(lat)
+
+        buf = self.cache.get(file_path)
+        if buf is not None:
+            self.backend.play(buf, first_frame)
+        else:
+            # WAV 가 아닌 파일은 캐시 없이 백엔드에 경로째 넘긴다
+            self.backend.play_file(file_path, first_frame)
+        return True
+
+    def latency_stats(self):
+        with self._lock:
+            vals = sorted(self.latencies)
+        if not vals:
+            return {"count": 0}
+        pick = lambda q: vals[min(len(vals) - 1, int(q * len(vals)))]
+        return {"count": len(vals), "min_s": vals[0], "p50_s": pick(0.5), "p99_s": pick(0.99), "max_s": vals[-1]}
+
+_player = None
+_player_lock = threading.Lock()
+
+def get_player():
+    global _player
+    with _player_lock:
+        if _player is None:
+            _player = AlarmMusicPlayer()
+        return _player
+
+def preload(file_path):
+    try:
+        return get_player().preload(file_path)
+    except Exception:
+        logging.exception("음악 미리 읽기 실패: %s", file_path)
+        return None
+
+def play_music(file_path, triggered_at=None):
+    return get_player().play(file_path, triggered_at)
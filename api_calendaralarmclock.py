@@ -0,0 +1,236 @@
+import os
+import json
+import asyncio
+import logging
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from engine_calendaralarmclock import BatchError, FireEvent, ReadOnlyError
+
+# 실행 중인 엔진에 붙는 로컬 HTTP/JSON API (스크립트/자동화용). 엔진 루프에서 함께 돈다
+#   GET  /alarms[?enabled=1][&tag=T]  목록
+#   GET  /alarms/<id>         알람 하나
+#   POST /batch               {"ops": [...]}  create/update/delete/toggle 묶음(AlarmEngine.apply_batch)
+#                             -> 저장 한 번, 화면 갱신 한 번. 잘못된 항목이 있으면 400 과 함께 아무것도 바꾸지 않는다
+#   GET  /tags                {태그: 알람 수}
+#   POST /bulk                {"action": "enable"|"disable"|"delete", "tag": ...} 또는 {"action": "delete_expired"}
+#                             -> 해당 알람만 한 번에 기록. {"changed": 개수}
+#   GET  /events[?changes=1]  울림(또는 목록 변경) 이벤트를 줄 단위 JSON(NDJSON)으로 계속 보낸다
+#   GET  /health              {"leader": false} 면 다른 인스턴스가 알람을 담당(변경 요청은 409)
+# 주소: "8765" / "127.0.0.1:8765" / "unix:/tmp/alarm.sock". 기본은 루프백에만 연다
+# CALENDARALARM_API_TOKEN 이 있으면 "Authorization: Bearer <토큰>" 이 있어야 한다.
+# POST 는 Content-Type: application/json 만 받는다(브라우저 페이지가 몰래 보내는 요청 차단)
+#   curl -s localhost:8765/batch -H 'Content-Type: application/json' \
+#        -d '{"ops": [{"op": "create", "alarm": {"name": "회의", "times": ["10:00"]}}]}'
+
+MAX_BODY = 64 << 20
+HEARTBEAT = 15.0   # 이벤트가 없을 때 빈 줄을 보내 끊긴 연결을 알아챈다
+REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 415: "Unsupported Media Type", 500: "Internal Server Error"}
+
+def parse_address(text):
+    # -> ("unix", 경로) 또는 ("tcp", 호스트, 포트)
+    text = str(text).strip()
+    if text.startswith("unix:"):
+        return ("unix", text[5:])
+    host, _, port = text.rpartition(":")
+    try:
+        return ("tcp", host.strip("[]") or "127.0.0.1", int(port))
+    except ValueError:
+        raise ValueError(f"API 주소 형식이 잘못되었습니다: {text}") from None
+
+def _event_json(event):
+    if isinstance(event, FireEvent):
+        a = event.alarm
+        return {"type": "fire", "id": a.get("id"), "name": a.get("name"),
+                "scheduled": str(event.scheduled), "fired_at": str(event.fired_at)}
+    return {"type": "change", "kind": event.kind, "id": event.alarm_id}
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class ApiServer:
+    def __init__(self, engine, address, token=None):
+        self.engine = engine
+        self.address = parse_address(address)
+        self.token = token if token is not None else os.environ.get("CALENDARALARM_API_TOKEN")
+        self._server = None
+        self._clients = set()   # 연결별 처리 태스크(닫을 때 취소)
+
+    async def start(self):
+        if self.address[0] == "unix":
+            path = self.address[1]
+            if os.path.exists(path):
+                os.unlink(path)  # 이전 실행이 남긴 소켓
+            self._server = await asyncio.start_unix_server(self._handle, path)
+            os.chmod(path, 0o600)
+        else:
+            _, host, port = self.address
+            if host not in ("127.0.0.1", "localhost", "::1"):
+                logging.warning("API 가 루프백이 아닌 주소에 열립니다: %s (CALENDARALARM_API_TOKEN 권장)", host)
+            self._server = await asyncio.start_server(self._handle, host, port)
+        logging.info("알람 API 시작: %s", self.url)
+        return self
+
+    @property
+    def url(self):
+        if self.address[0] == "unix":
+            return "unix:" + self.address[1]
+        host, port = self._server.sockets[0].getsockname()[:2] if self._server else self.address[1:]
+        return f"http://{host}:{port}"
+
+    async def close(self):
+        if self._server is None:
+            return
+        self._server.close()
+        for task in list(self._clients):
+            task.cancel()
+        await self._server.wait_closed()
+        self._server = None
+        if self.address[0] == "unix" and os.path.exists(self.address[1]):
+            os.unlink(self.address[1])
+
+    # --- HTTP ---
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    return
+                try:
+                    method, target, _ = line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    return await self._send(writer, 400, {"error": "요청 줄 형식 오류"}, close=True)
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                # 잘못된 길이는 본문 경계를 알 수 없으므로 연결을 닫는다
+                try:
+                    n = int(headers.get("content-length") or 0)
+                    if n < 0:
+                        raise ValueError(n)
+                except ValueError:
+                    return await self._send(writer, 400, {"error": "Content-Length 형식 오류"}, close=True)
+                if n > MAX_BODY:
+                    return await self._send(writer, 413, {"error": "본문이 너무 큽니다"}, close=True)
+                body = await reader.readexactly(n) if n else b""
+                close = headers.get("connection", "").lower() == "close"
+                url = urlsplit(target)
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                try:
+                    self._check(method, headers)
+                    if method == "GET" and url.path == "/events":
+                        return await self._stream(writer, query.get("changes") in ("1", "true"))
+                    status, obj = await self._route(method, url.path, query, body)
+                except HttpError as e:
+                    status, obj = e.status, {"error": str(e)}
+                except BatchError as e:
+                    status, obj = 400, {"error": str(e), "index": e.index}
+                except ReadOnlyError as e:
+                    status, obj = 409, {"error": str(e)}
+                except Exception:
+                    logging.exception("API 요청 처리 실패: %s %s", method, target)
+                    status, obj = 500, {"error": "내부 오류"}
+                await self._send(writer, status, obj, close)
+                if close:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass  # 서버 종료(close)로 취소됨. 연결만 닫고 끝낸다
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    def _check(self, method, headers):
+        if self.token and headers.get("authorization") != f"Bearer {self.token}":
+            raise HttpError(401, "토큰이 필요합니다")
+        if method == "POST" and headers.get("content-type", "").split(";")[0].strip() != "application/json":
+            raise HttpError(415, "Content-Type: application/json 이어야 합니다")
+
+    async def _send(self, writer, status, obj, close=False):
+        data = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n" + ("Connection: close\r\n" if close else "") + "\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def _route(self, method, path, query, body):
+        engine = self.engine
+        if path == "/health":
+            return 200, {"alarms": len(engine.alarms), "next": str(engine.next_deadline() or "") or None,
+                         "fired": engine.fired, "leader": engine.is_leader}
+        if path == "/alarms":
+            if method != "GET":
+                raise HttpError(405, "GET 만 됩니다")
+            if query.get("tag"):
+                alarms = [a for a in map(engine.store.get, engine.store.tag_ids(query["tag"])) if a is not None]
+            else:
+                alarms = engine.alarms
+            if query.get("enabled") in ("1", "true"):
+                alarms = [a for a in alarms if a.get("enabled", True)]
+            return 200, alarms
+        if path.startswith("/alarms/"):
+            if method != "GET":
+                raise HttpError(405, "GET 만 됩니다")
+            alarm = engine.store.get(unquote(path[len("/alarms/"):]))
+            if alarm is None:
+                raise HttpError(404, "알람이 없습니다")
+            return 200, alarm
+        if path == "/tags":
+            if method != "GET":
+                raise HttpError(405, "GET 만 됩니다")
+            return 200, engine.store.tags()
+        if path == "/bulk":
+            req = self._json(method, body)
+            action, tag = (req.get("action"), req.get("tag")) if isinstance(req, dict) else (None, None)
+            if action == "delete_expired":
+                return 200, {"changed": await engine.delete_expired()}
+            if not isinstance(tag, str) or not tag:
+                raise HttpError(400, "tag 가 필요합니다")
+            if action in ("enable", "disable"):
+                return 200, {"changed": await engine.set_tag_enabled(tag, action == "enable")}
+            if action == "delete":
+                return 200, {"changed": await engine.delete_tag(tag)}
+            raise HttpError(400, f"알 수 없는 action: {action!r}")
+        if path == "/batch":
+            req = self._json(method, body)
+            ops = req.get("ops") if isinstance(req, dict) else req
+            if not isinstance(ops, list):
+                raise HttpError(400, '{"ops": [...]} 형식이어야 합니다')
+            results = await engine.apply_batch(ops)
+            return 200, {"applied": len(results), "results": results}
+        raise HttpError(404, "없는 경로입니다")
+
+    @staticmethod
+    def _json(method, body):
+        if method != "POST":
+            raise HttpError(405, "POST 만 됩니다")
+        try:
+            return json.loads(body or b"null")
+        except ValueError:
+            raise HttpError(400, "JSON 형식 오류") from None
+
+    async def _stream(self, writer, changes):
+        # 청크 전송으로 이벤트마다 JSON 한 줄. 구독 큐가 넘치면 엔진이 버리고 집계한다(느린 클라이언트가 엔진을 막지 않음)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson\r\nTransfer-Encoding: chunked\r\n"
+                     b"Cache-Control: no-cache\r\n\r\n")
+        q = await self.engine.subscribe(changes=changes)
+        try:
+            while True:
+                try:
+                    line = json.dumps(_event_json(await asyncio.wait_for(q.get(), HEARTBEAT)), ensure_ascii=False) + "\n"
+                except asyncio.TimeoutError:
+                    line = "\n"
+                data = line.encode("utf-8")
+                writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+                await writer.drain()
+        finally:
+            await self.engine.unsubscribe(q)
@@ -1,51 +1,37 @@
-import json
 import os
 import logging
-from datetime import datetime
 import uuid
+from store_calendaralarmclock import open_store
+from engine_calendaralarmclock import AlarmEngine, ReadOnlyError
+from dispatch_calendaralarmclock import FireCoalescer, batch_lines
 
-try:
-    from kivy.app import App
-    from kivy.uix.boxlayout import BoxLayout
-    from kivy.uix.textinput import TextInput
-    from kivy.uix.button import Button
-    from kivy.clock import Clock
-    from kivy.uix.label import Label
-except Exception:
-    raise SystemExit("Kivy 모듈을 불러올 수 없습니다. Android에서 실행하거나 Kivy를 설치하세요.")
-
-# plyer optional
-try:
-    from plyer import notification
-    def notify(title, message):
-        try:
-            notification.notify(title=title, message=message, timeout=5)
-        except Exception:
-            logging.exception("plyer 알림 실패")
-else:
-    def notify(title, message):
+# plyer optional - 처음 알림 때 불러온다
+def notify(title, message):
+    try:
+        from plyer import notification
+    except Exception:
         logging.info("NOTIFY: %s - %s", title, message)
+        return
+    try:
+        notification.notify(title=title, message=message, timeout=5)
+    except Exception:
+        logging.exception("plyer 알림 실패")
 
 DATA_FILE = os.path.join(os.path.dirname(__file__), "alarms.json")
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
+# 저장소는 Tk 앱과 같은 모듈 사용 (CALENDARALARM_STORE=*.db 면 SQLite)
+store = open_store(os.environ.get("CALENDARALARM_STORE") or DATA_FILE)
+
 def ensure_data_file():
-    if not os.path.exists(DATA_FILE):
-        save_alarms([])
+    store.ensure()
 
 def load_alarms():
-    ensure_data_file()
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        logging.exception("alarms.json 로드 실패 - 빈 리스트로 초기화")
-        return []
+    return store.load()
 
 def save_alarms(alarms):
     try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(alarms, f, ensure_ascii=False, indent=2)
+        store.save_all(alarms)
     except Exception:
         logging.exception("alarms.json 저장 실패")
 
@@ -58,56 +44,78 @@ def normalize_time_token(tok):
         return f"{int(parts[0]):02d}:{int(parts[1]):02d}:{int(parts[2]):02d}"
     return tok
 
-class MainLayout(BoxLayout):
-    def __init__(self, **kwargs):
-        super().__init__(orientation="vertical", **kwargs)
-        self.alarms = load_alarms()
-        self.add_widget(Label(text="앱용 Calendar Alarm Clock"))
-        self.name = TextInput(hint_text="이름", size_hint_y=None, height=40)
-        self.add_widget(self.name)
-        self.time = TextInput(hint_text="시간 HH:MM 또는 HH:MM:SS (콤마구분)", size_hint_y=None, height=40)
-        self.add_widget(self.time)
-        self.rec = TextInput(hint_text="반복( daily / weekly / monthly / yearly / interval )", size_hint_y=None, height=40)
-        self.add_widget(self.rec)
-        btn = Button(text="추가", size_hint_y=None, height=50)
-        btn.bind(on_release=self.add_alarm)
-        self.add_widget(btn)
-        self.status = Label(text="")
-        self.add_widget(self.status)
-        Clock.schedule_interval(self.check_alarms, 1)
-
-    def add_alarm(self, *args):
-        times = [normalize_time_token(t) for t in self.time.text.split(",") if t.strip()]
-        a = {"id": str(uuid.uuid4()), "name": self.name.text or "알람", "recurrence": self.rec.text or "daily",
-             "times": times, "enabled": True, "last_triggered": ""}
-        self.alarms.append(a)
-        save_alarms(self.alarms)
-        self.status.text = "저장됨"
-        self.name.text = ""
-        self.time.text = ""
-        self.rec.text = ""
-
-    def check_alarms(self, dt):
-        now = datetime.now()
-        cur_t = now.strftime("%H:%M:%S")
-        changed = False
-        for a in self.alarms:
-            if not a.get("enabled", True):
-                continue
-            for t in a.get("times", []):
-                if cur_t.startswith(t):
-                    if a.get("last_triggered") == now.strftime("%Y-%m-%d %H:%M:%S"):
-                        continue
-                    a["last_triggered"] = now.strftime("%Y-%m-%d %H:%M:%S")
-                    notify(title="Alarm", message=f"{a.get('name')}\n{a.get('recurrence')}")
-                    changed = True
-        if changed:
-            save_alarms(self.alarms)
-
-class AlarmApp(App):
-    def build(self):
-        ensure_data_file()
-        return MainLayout()
+def create_app():
+    # Kivy 는 앱을 띄울 때만 불러온다(모듈을 import 하는 것만으로 Kivy 가 초기화되지 않게)
+    try:
+        from kivy.app import App
+        from kivy.uix.boxlayout import BoxLayout
+        from kivy.uix.textinput import TextInput
+        from kivy.uix.button import Button
+        from kivy.clock import Clock
+        from kivy.uix.label import Label
+    except Exception:
+        raise SystemExit("Kivy 모듈을 불러올 수 없습니다. Android에서 실행하거나 Kivy를 설치하세요.")
+
+    class MainLayout(BoxLayout):
+        def __init__(self, **kwargs):
+            super().__init__(orientation="vertical", **kwargs)
+            # 스케줄링은 Tk 앱과 같은 헤드리스 엔진이 맡는다(UI 스레드에서 매초 검사하지 않음)
+            self.engine = AlarmEngine(store).start()
+            # 같은 순간에 울린 알람들은 알림 하나로 묶는다(Tk 앱과 같은 규칙)
+            self.coalescer = FireCoalescer(self.on_alarm_batch)
+            self.engine.call(self.engine.subscribe(self.on_alarm_due))
+            self.add_widget(Label(text="앱용 Calendar Alarm Clock"))
+            self.name = TextInput(hint_text="이름", size_hint_y=None, height=40)
+            self.add_widget(self.name)
+            self.time = TextInput(hint_text="시간 HH:MM 또는 HH:MM:SS (콤마구분)", size_hint_y=None, height=40)
+            self.add_widget(self.time)
+            self.rec = TextInput(hint_text="반복( daily / weekly / monthly / yearly / interval )", size_hint_y=None, height=40)
+            self.add_widget(self.rec)
+            btn = Button(text="추가", size_hint_y=None, height=50)
+            btn.bind(on_release=self.add_alarm)
+            self.add_widget(btn)
+            self.status = Label(text="")
+            self.add_widget(self.status)
+
+        def add_alarm(self, *args):
+            times = [normalize_time_token(t) for t in self.time.text.split(",") if t.strip()]
+            a = {"id": str(uuid.uuid4()), "name": self.name.text or "알람", "recurrence": self.rec.text or "daily",
+                 "times": times, "enabled": True, "last_triggered": ""}
+            try:
+                self.engine.call(self.engine.add(a))
+            except ReadOnlyError:
+                # 같은 alarms.json 을 연 다른 앱(Tk 등)이 알람을 담당 중
+                self.status.text = "읽기 전용: 다른 앱에서 추가하세요"
+                return
+            self.status.text = "저장됨"
+            self.name.text = ""
+            self.time.text = ""
+            self.rec.text = ""
+
+        def on_alarm_due(self, event):
+            # 엔진 스레드에서 호출됨 -> 묶음으로 모은다
+            self.coalescer.add(event)
+
+        def on_alarm_batch(self, events, first_at):
+            # 타이머 스레드에서 호출됨 -> 알림은 Kivy 메인 루프에서
+            if len(events) == 1:
+                a = events[0].alarm
+                title, message = "Alarm", f"{a.get('name')}\n{a.get('recurrence')}"
+            else:
+                title, message = f"Alarm ({len(events)})", "\n".join(batch_lines(events, limit=5))
+            Clock.schedule_once(lambda dt: notify(title=title, message=message))
+
+    class AlarmApp(App):
+        def build(self):
+            ensure_data_file()
+            self.layout = MainLayout()
+            return self.layout
+
+        def on_stop(self):
+            self.layout.engine.stop()
+            self.layout.coalescer.close()
+
+    return AlarmApp()
 
 if __name__ == "__main__":
-    AlarmApp().run()
\ No newline at end of file
+    create_app().run()
\ No newline at end of file
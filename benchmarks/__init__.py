@@ -0,0 +1,2 @@
+# 성능 측정용 스크립트 모음 (python -m benchmarks.<이름> 으로 개별 실행)
+# python -m benchmarks --out bench.json 으로 전체를 JSON 으로 남기고 --compare 로 커밋 간 비교
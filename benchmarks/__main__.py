@@ -0,0 +1,118 @@
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+from benchmarks import bench_rules, bench_store, bench_ui, bench_fire, bench_audio, bench_ical, bench_shard, bench_import, bench_history, bench_api, bench_sim
+
+# 전체 벤치마크를 돌려 JSON 으로 저장/비교
+#   python -m benchmarks --sizes 1000,100000 --out bench.json
+#   python -m benchmarks --compare old.json new.json
+
+SUITES = {
+    "rules": lambda n, a: bench_rules.run(n, a.ticks),
+    "store": lambda n, a: bench_store.run(n, a.repeat),
+    "ui": lambda n, a: bench_ui.run(n, a.ui_repeat),
+    "fire": lambda n, a: bench_fire.run(n),
+    "ical": lambda n, a: bench_ical.run(n),
+    "shard": lambda n, a: bench_shard.run(n, a.workers),
+    "history": lambda n, a: bench_history.run(n),
+    "api": lambda n, a: bench_api.run(n),
+    "sim": lambda n, a: bench_sim.run(n, a.sim_days),
+}
+# 알람 개수와 무관한 항목
+SINGLE = {
+    "audio": lambda a: bench_audio.run(repeat=a.repeat),
+    "import": lambda a: bench_import.run(),
+}
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        commit = None
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except Exception:
+        numpy_version = None
+    return {"commit": commit, "time": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+            "platform": platform.platform(), "numpy": numpy_version}
+
+def run_all(sizes, only, args):
+    out = {"meta": _meta(), "sizes": sizes, "results": {}}
+    for name in only:
+        if name in SINGLE:
+            out["results"][name] = SINGLE[name](args)
+            continue
+        rows = []
+        for n in sizes:
+            t0 = time.perf_counter()
+            r = SUITES[name](n, args)
+            print(f"{name} n={n} {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+            rows.append(r)
+        out["results"][name] = rows
+    return out
+
+def _timings(node, path=""):
+    # {"경로": 초} — 이름이 _s 로 끝나는 숫자만 비교 대상
+    if isinstance(node, dict):
+        key = node.get("alarms")
+        for k, v in node.items():
+            sub = f"{path}.{k}" if path else k
+            if isinstance(v, (int, float)) and k.endswith("_s"):
+                yield (f"{path}[{key}].{k}" if key is not None else sub), float(v)
+            elif isinstance(v, (dict, list)):
+                yield from _timings(v, f"{path}[{key}].{k}" if key is not None else sub)
+    elif isinstance(node, list):
+        for v in node:
+            yield from _timings(v, path)
+
+def compare(old, new, threshold=1.10):
+    a, b = dict(_timings(old["results"])), dict(_timings(new["results"]))
+    worse = 0
+    print(f"{'항목':<48} {'이전':>10} {'이후':>10} {'비율':>7}")
+    for k in sorted(a.keys() & b.keys()):
+        ratio = b[k] / a[k] if a[k] else float("inf")
+        flag = " <-" if ratio > threshold else ""
+        worse += bool(flag)
+        print(f"{k:<48} {a[k]*1e3:>8.2f}ms {b[k]*1e3:>8.2f}ms {ratio:>6.2f}x{flag}")
+    return worse
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="캘린더 알람 벤치마크 전체 실행(JSON 출력)")
+    ap.add_argument("--sizes", default="1000,10000", help="알람 개수 목록, 예: 1000,100000,1000000")
+    ap.add_argument("--only", default="rules,store,ui,fire,ical,shard,history,api,sim,audio,import", help="실행할 항목")
+    ap.add_argument("--ticks", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--ui-repeat", type=int, default=3)
+    ap.add_argument("--workers", type=int, help="shard 항목의 작업 프로세스 수(기본: CPU 수)")
+    ap.add_argument("--sim-days", type=int, default=30, help="sim 항목의 시뮬레이션 기간(일)")
+    ap.add_argument("--out", help="결과 JSON 파일(없으면 표준 출력)")
+    ap.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="두 결과 파일의 시간 항목 비교")
+    ap.add_argument("--threshold", type=float, default=1.10, help="--compare 에서 느려짐으로 표시할 비율")
+    args = ap.parse_args(argv)
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            old = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        return 1 if compare(old, new, args.threshold) else 0
+    only = [x for x in args.only.split(",") if x]
+    unknown = [x for x in only if x not in SUITES and x not in SINGLE]
+    if unknown:
+        ap.error(f"알 수 없는 항목: {', '.join(unknown)}")
+    result = run_all([int(x) for x in args.sizes.split(",")], only, args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
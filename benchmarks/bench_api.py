@@ -0,0 +1,69 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import http.client
+
+from store_calendaralarmclock import JournalStore
+from engine_calendaralarmclock import AlarmEngine
+
+# 로컬 API 일괄 변경 처리량: n 개 생성 -> 전부 토글 -> 전부 삭제 (batch 개씩 POST /batch)
+# 묶음마다 저장 한 번, 변경 알림(reloaded) 한 번인지도 같이 센다
+
+def run(n, batch=1000, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_api_")
+    os.environ.setdefault("CALENDARALARM_HISTORY", "off")
+    engine = AlarmEngine(JournalStore(os.path.join(workdir, "alarms.json")), api="127.0.0.1:0")
+    try:
+        engine.start()
+        notices = []
+        engine.call(engine.subscribe(notices.append, changes=True))
+        host, port = engine.api_server._server.sockets[0].getsockname()[:2]
+        conn = http.client.HTTPConnection(host, port)
+
+        def post(ops):
+            conn.request("POST", "/batch", json.dumps({"ops": ops}), {"Content-Type": "application/json"})
+            resp = conn.getresponse()
+            body = json.loads(resp.read())
+            if resp.status != 200:
+                raise RuntimeError(body)
+            return body["results"]
+
+        out = {"alarms": n, "batch": batch}
+        ids = []
+        t0 = time.perf_counter()
+        for b in range(0, n, batch):
+            ops = [{"op": "create", "alarm": {"name": f"api-{i}", "times": ["09:00", "18:30"]}}
+                   for i in range(b, min(n, b + batch))]
+            ids += [r["id"] for r in post(ops)]
+        out["create_s"] = time.perf_counter() - t0
+        for name, make in (("toggle", lambda i: {"op": "toggle", "id": i}), ("delete", lambda i: {"op": "delete", "id": i})):
+            t0 = time.perf_counter()
+            for b in range(0, n, batch):
+                post([make(i) for i in ids[b:b + batch]])
+            out[f"{name}_s"] = time.perf_counter() - t0
+        out["ops_per_s"] = 3 * n / (out["create_s"] + out["toggle_s"] + out["delete_s"])
+        out["batches"] = 3 * -(-n // batch)
+        out["change_events"] = len(notices)
+        conn.close()
+        return out
+    finally:
+        engine.stop()
+        engine.store.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="로컬 API 일괄 변경 처리량")
+    ap.add_argument("--sizes", default="1000,100000")
+    ap.add_argument("--batch", type=int, default=1000)
+    args = ap.parse_args(argv)
+    print(f"{'alarms':>8} {'create':>10} {'toggle':>10} {'delete':>10} {'ops/s':>10} {'batches':>8} {'events':>7}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n, args.batch)
+        print(f"{n:>8} {r['create_s']*1e3:>8.0f}ms {r['toggle_s']*1e3:>8.0f}ms {r['delete_s']*1e3:>8.0f}ms "
+              f"{r['ops_per_s']:>10.0f} {r['batches']:>8} {r['change_events']:>7}")
+
+if __name__ == "__main__":
+    main()
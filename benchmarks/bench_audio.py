@@ -0,0 +1,54 @@
+import os
+import time
+import wave
+import shutil
+import argparse
+import tempfile
+
+import AlarmMusicPlayerFile as music_player
+
+# 알람 발생 -> 첫 오디오 프레임까지 지연: 매번 디스크에서 디코딩 vs 메모리 캐시
+# 무음 백엔드를 써서 장치 지연 없이 플레이어 자체 비용만 잰다
+
+def make_wav(path, seconds, rate=44100, channels=2):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x01" * channels * rate * seconds)
+
+def run(seconds=30, repeat=20, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_audio_")
+    try:
+        path = os.path.join(workdir, "tone.wav")
+        make_wav(path, seconds)
+        out = {"wav_seconds": seconds, "wav_bytes": os.path.getsize(path)}
+        # 캐시 없음(용량 0): 울릴 때마다 파일을 읽어 디코딩
+        cold = music_player.AlarmMusicPlayer(music_player.NullBackend(), music_player.AudioCache(0))
+        for _ in range(repeat):
+            cold.play(path, time.perf_counter())
+        out["uncached"] = cold.latency_stats()
+        warm = music_player.AlarmMusicPlayer(music_player.NullBackend())
+        t0 = time.perf_counter()
+        warm.preload(path)
+        out["preload_s"] = time.perf_counter() - t0
+        for _ in range(repeat):
+            warm.play(path, time.perf_counter())
+        out["cached"] = warm.latency_stats()
+        return out
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="알람 음악 첫 프레임 지연(캐시 유무)")
+    ap.add_argument("--seconds", type=int, default=30, help="테스트 WAV 길이(초)")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args(argv)
+    r = run(args.seconds, args.repeat)
+    print(f"wav {r['wav_bytes'] / 1e6:.1f}MB, preload {r['preload_s'] * 1e3:.1f}ms")
+    for name in ("uncached", "cached"):
+        m = r[name]
+        print(f"{name:>9} p50 {m['p50_s'] * 1e3:>8.3f}ms  p99 {m['p99_s'] * 1e3:>8.3f}ms  max {m['max_s'] * 1e3:>8.3f}ms")
+
+if __name__ == "__main__":
+    main()
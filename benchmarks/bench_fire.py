@@ -0,0 +1,69 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from store_calendaralarmclock import JournalStore
+from engine_calendaralarmclock import AlarmEngine
+from dispatch_calendaralarmclock import FireExecutor, FireCoalescer
+from benchmarks.gen_alarms import generate_alarms
+
+# 알람 발생 경로 비용: 같은 초에 n 개가 울릴 때
+#   pop_due(스케줄러) -> 엔진 _fire(울림 기록 저장 + 구독자 전달) -> 묶음(FireCoalescer) -> 작업 스레드(후속 처리)
+# 실제 시각을 기다리지 않도록 pop_due 에 예정 시각을 직접 넘기고, 묶음 대기 시간도 flush 로 건너뛴다
+# batches = 작업 스레드로 넘어간 알림 묶음 수(앱에서는 팝업/소리 횟수)
+
+def run(n, seed=0, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_fire_")
+    target = (datetime.now() + timedelta(minutes=10)).replace(microsecond=0)
+    alarms = generate_alarms(n, seed)
+    for a in alarms:
+        for k in ("period_start", "period_end"):
+            a.pop(k, None)
+        a.update(recurrence="daily", times=[target.strftime("%H:%M:%S")], enabled=True)
+    store = JournalStore(os.path.join(workdir, "alarms.json"))
+    executor = FireExecutor(workers=2)
+    try:
+        store.save_all(alarms)
+        engine = AlarmEngine(store)
+        engine.scheduler.reset(store.load())
+        done = []
+        coalescer = FireCoalescer(lambda events, first_at: executor.submit(done.append, len(events)), window=60)
+        engine._callbacks["fire"].append(coalescer.add)
+
+        t0 = time.perf_counter()
+        due = engine.scheduler.pop_due(target)
+        pop_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        engine._fire_many(due)
+        fire_s = time.perf_counter() - t0
+        coalescer.flush()
+        # 작업 스레드가 받은 일을 모두 끝낼 때까지
+        while True:
+            st = executor.stats()
+            if st["completed"] + st["failed"] >= st["submitted"]:
+                break
+            time.sleep(0.001)
+        drain_s = time.perf_counter() - t0
+        return {"alarms": n, "due": len(due), "pop_due_s": pop_s, "fire_s": fire_s,
+                "fire_per_alarm_s": fire_s / len(due) if due else 0.0, "drain_s": drain_s, "batches": len(done),
+                "executor": executor.stats()}
+    finally:
+        executor.shutdown()
+        store.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="같은 초에 여러 알람이 울릴 때 발생 경로 비용")
+    ap.add_argument("--sizes", default="100,10000")
+    args = ap.parse_args(argv)
+    print(f"{'alarms':>8} {'pop_due':>10} {'fire':>10} {'per alarm':>10} {'drain':>10} {'batches':>8} {'rejected':>9}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n)
+        print(f"{n:>8} {r['pop_due_s']*1e3:>8.1f}ms {r['fire_s']*1e3:>8.1f}ms "
+              f"{r['fire_per_alarm_s']*1e6:>8.1f}us {r['drain_s']*1e3:>8.1f}ms {r['batches']:>8} {r['executor']['rejected']:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from logCalendarAlarmClock import FireHistory, FIRE, SNOOZE, DISMISS
+
+# 울림 기록 링 버퍼: 덧붙이기 1건 비용 / 알람 하나 기록 조회 / 기간 조회 / CSV 내보내기
+# n = 쓰는 기록 수. capacity 는 n 의 절반이라 절반은 덮어쓴 상태에서 조회한다
+
+def run(n, alarms=1000, seed=0, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_history_")
+    rnd = random.Random(seed)
+    ids = [f"alarm-{i}" for i in range(alarms)]
+    base = datetime(2026, 1, 1)
+    try:
+        with FireHistory(os.path.join(workdir, "history.bin"), capacity=max(1, n // 2)) as hist:
+            items = [(rnd.choice(ids), base + timedelta(minutes=i), rnd.choice((FIRE, FIRE, SNOOZE, DISMISS)))
+                     for i in range(n)]
+            t0 = time.perf_counter()
+            for aid, t, oc in items:
+                hist.append(aid, t, oc, t)
+            append_s = time.perf_counter() - t0
+            out = {"records": n, "capacity": hist.capacity, "append_s": append_s,
+                   "append_us": append_s / n * 1e6 if n else 0.0}
+            t0 = time.perf_counter()
+            h = hist.history(ids[0])
+            out.update(history_s=time.perf_counter() - t0, history_rows=len(h))
+            mid = base + timedelta(minutes=n * 3 // 4)
+            t0 = time.perf_counter()
+            r = hist.fires_between(mid, mid + timedelta(days=1))
+            out.update(range_s=time.perf_counter() - t0, range_rows=len(r))
+            t0 = time.perf_counter()
+            rows = hist.export_csv(os.path.join(workdir, "history.csv"))
+            out.update(csv_s=time.perf_counter() - t0, csv_rows=rows)
+        return out
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="울림 기록 링 버퍼 비용")
+    ap.add_argument("--sizes", default="10000,1000000")
+    args = ap.parse_args(argv)
+    print(f"{'records':>9} {'append':>9} {'history':>10} {'range':>10} {'csv':>10}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n)
+        print(f"{n:>9} {r['append_us']:>7.2f}us {r['history_s']*1e3:>8.1f}ms {r['range_s']*1e3:>8.1f}ms "
+              f"{r['csv_s']*1e3:>8.1f}ms")
+
+if __name__ == "__main__":
+    main()
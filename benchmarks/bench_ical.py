@@ -0,0 +1,74 @@
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import tracemalloc
+
+from store_calendaralarmclock import JournalStore, SqliteStore
+from ical_calendaralarmclock import export_ics, import_ics, iter_alarms
+from benchmarks.gen_alarms import generate_alarms
+
+# .ics 내보내기/가져오기 처리량
+#   export: 알람 n 개 -> .ics 파일
+#   parse: 파일 -> 알람 dict(저장 없이). 스트리밍이라 최대 메모리는 파일 크기와 무관해야 한다
+#   import_*: 파일 -> 저장소(BATCH 개씩 add_many)
+
+def _parse_peak(path, limit=20000):
+    # 앞부분 limit 개까지만 tracemalloc 으로 최대 메모리 측정(전체는 너무 느림)
+    tracemalloc.start()
+    try:
+        with open(path, encoding="utf-8", newline="") as f:
+            for i, _ in enumerate(iter_alarms(f)):
+                if i >= limit:
+                    break
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run(n, seed=0, batch=1000, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_ical_")
+    try:
+        path = os.path.join(workdir, "alarms.ics")
+        alarms = generate_alarms(n, seed)
+        t0 = time.perf_counter()
+        st = export_ics(alarms, path)
+        export_s = time.perf_counter() - t0
+        size = os.path.getsize(path)
+        out = {"alarms": n, "file_mb": size / 1e6, "exported": st["alarms"], "export_s": export_s,
+               "export_per_s": st["alarms"] / export_s if export_s else 0.0}
+        t0 = time.perf_counter()
+        with open(path, encoding="utf-8", newline="") as f:
+            parsed = sum(1 for _ in iter_alarms(f))
+        parse_s = time.perf_counter() - t0
+        out.update(parsed=parsed, parse_s=parse_s, parse_mb_per_s=size / 1e6 / parse_s if parse_s else 0.0,
+                   parse_peak_kb=_parse_peak(path) / 1024)
+        for name, store in (("journal", JournalStore(os.path.join(workdir, "import.json"))),
+                            ("sqlite", SqliteStore(os.path.join(workdir, "import.db")))):
+            try:
+                store.ensure()
+                store.load()
+                t0 = time.perf_counter()
+                import_ics(path, store.add_many, batch)
+                dt = time.perf_counter() - t0
+                out[f"import_{name}_s"] = dt
+                out[f"import_{name}_per_s"] = parsed / dt if dt else 0.0
+            finally:
+                store.close()
+        return out
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=".ics 가져오기/내보내기 처리량")
+    ap.add_argument("--sizes", default="1000,100000")
+    ap.add_argument("--batch", type=int, default=1000)
+    args = ap.parse_args(argv)
+    print(f"{'alarms':>8} {'file':>8} {'export/s':>10} {'parse MB/s':>11} {'peak':>8} {'journal/s':>10} {'sqlite/s':>10}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n, batch=args.batch)
+        print(f"{n:>8} {r['file_mb']:>6.1f}MB {r['export_per_s']:>10.0f} {r['parse_mb_per_s']:>11.1f} "
+              f"{r['parse_peak_kb']:>6.0f}KB {r['import_journal_per_s']:>10.0f} {r['import_sqlite_per_s']:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+# 시작 비용: python -X importtime 출력을 읽어 모듈별 import 시간을 모으고, CLI list 를 새 프로세스로 실행한다
+#   import_<모듈>_s : 그 모듈을 불러오는 데 든 시간(하위 import 포함, 인터프리터 자체 시작 제외)
+#   cli_list_s      : python -m cli_calendaralarmclock list 전체 실행 시간 - 빈 인터프리터 시작 시간
+# 목표: cli_list_s < 50ms. 매번 새 프로세스라 .pyc 는 있고 모듈은 캐시되지 않은 상태(cold import)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ("core_calendaralarmclock", "store_calendaralarmclock", "cli_calendaralarmclock",
+           "engine_calendaralarmclock", "AlarmMusicPlayerFile", "app_calendaralarmclock", "win_calendaralarmclock")
+# CLI 가 불러오면 안 되는 모듈
+HEAVY = ("tkinter", "kivy", "asyncio", "sqlite3", "http", "wave", "multiprocessing", "AlarmMusicPlayerFile")
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def parse_importtime(text):
+    # -> [(모듈, 자체 us, 누적 us, 깊이)]
+    out = []
+    for line in text.splitlines():
+        m = _LINE.match(line)
+        if m:
+            out.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return out
+
+def _run(args, env=None):
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, env=env)
+    return time.perf_counter() - t0, p
+
+def import_cost(module):
+    _, p = _run(["-X", "importtime", "-c", f"import {module}"])
+    rows = parse_importtime(p.stderr)
+    if p.returncode != 0:
+        return None, rows
+    top = [r for r in rows if r[0] == module]
+    return (top[-1][2] * 1e-6 if top else None), rows
+
+def run(repeat=5, workdir=None):
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_import_")
+    try:
+        out = {}
+        for mod in MODULES:
+            best, rows = None, []
+            for _ in range(repeat):
+                cost, rows = import_cost(mod)
+                if cost is not None:
+                    best = cost if best is None else min(best, cost)
+            if best is None:
+                out[f"import_{mod}"] = "불러올 수 없음(의존성 없음)"
+                continue
+            out[f"import_{mod}_s"] = best
+            if mod == "cli_calendaralarmclock":
+                out["cli_heavy_imports"] = sorted({r[0] for r in rows if r[0].split(".")[0] in HEAVY})
+                out["cli_top_imports"] = [f"{r[0]} {r[2] / 1000:.1f}ms" for r in
+                                          sorted((r for r in rows if r[3] == 1), key=lambda r: -r[2])[:5]]
+        env = dict(os.environ, CALENDARALARM_STORE=os.path.join(workdir, "alarms.json"))
+        base = min(_run(["-c", "pass"], env)[0] for _ in range(repeat))
+        full = min(_run(["-m", "cli_calendaralarmclock", "list"], env)[0] for _ in range(repeat))
+        out.update(python_startup_s=base, cli_list_total_s=full, cli_list_s=full - base,
+                   cli_list_target_met=full - base < 0.050)
+        return out
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="모듈 import 시간 / CLI 시작 시간")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args(argv)
+    r = run(args.repeat)
+    for k, v in r.items():
+        if isinstance(v, float):
+            print(f"{k:<40} {v * 1e3:8.1f}ms")
+        else:
+            print(f"{k:<40} {v}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import time
+from datetime import datetime, timedelta
+
+from core_calendaralarmclock import compile_alarm, should_trigger
+from benchmarks.gen_alarms import generate_alarms
+
+# 틱당 판정 비용: 기존 dict 해석 방식 vs 컴파일된 AlarmRule
+
+def legacy_should_trigger(alarm, now):
+    # 컴파일 도입 이전 should_trigger (비교 기준용으로 그대로 보존)
+    if not alarm.get("enabled", True):
+        return False
+    ps = alarm.get("period_start") or alarm.get("start_date")
+    pe = alarm.get("period_end")
+    if ps:
+        try:
+            if now < datetime.fromisoformat(ps):
+                return False
+        except Exception:
+            return False
+    if pe:
+        try:
+            if now > datetime.fromisoformat(pe):
+                return False
+        except Exception:
+            return False
+    times = alarm.get("times", [])
+    if not times:
+        return False
+    if not any(now.strftime("%H:%M:%S").startswith(t) for t in times):
+        return False
+    if alarm.get("last_triggered") == now.strftime("%Y-%m-%d %H:%M:%S"):
+        return False
+    rt = alarm.get("recurrence", "daily")
+    if rt == "daily":
+        return True
+    if rt == "weekly":
+        return now.weekday() in alarm.get("weekdays", [])
+    if rt == "monthly":
+        return alarm.get("day_of_month") == now.day
+    if rt == "yearly":
+        return alarm.get("month") == now.month and alarm.get("day") == now.day
+    if rt == "interval":
+        interval = max(1, int(alarm.get("interval_days", 1)))
+        start = alarm.get("period_start") or alarm.get("start_date")
+        if not start:
+            return True
+        try:
+            delta = (now.date() - datetime.fromisoformat(start).date()).days
+            if delta < 0:
+                return False
+            pos = (delta % interval) + 1
+            offsets = alarm.get("interval_offsets")
+            if offsets:
+                return int(pos) in [int(x) for x in offsets]
+            return pos == 1
+        except Exception:
+            return False
+    return False
+
+def _per_tick(fn, ticks):
+    best = float("inf")
+    for now in ticks:
+        t0 = time.perf_counter()
+        fn(now)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def run(n, ticks=5, seed=0):
+    alarms = generate_alarms(n, seed)
+    start = datetime(2025, 3, 3, 9, 0, 0)
+    tick_list = [start + timedelta(seconds=i) for i in range(ticks)]
+
+    t0 = time.perf_counter()
+    rules = [compile_alarm(a) for a in alarms]
+    compile_s = time.perf_counter() - t0
+    pairs = list(zip(alarms, rules))
+
+    legacy = _per_tick(lambda now: [legacy_should_trigger(a, now) for a in alarms], tick_list)
+    compiled = _per_tick(lambda now: [should_trigger(a, now, r) for a, r in pairs], tick_list)
+    # 결과가 같아야 의미가 있다 (초 단위로 정규화된 times 기준)
+    for now in tick_list:
+        assert [legacy_should_trigger(a, now) for a in alarms] == [should_trigger(a, now, r) for a, r in pairs]
+    return {"alarms": n, "compile_s": compile_s, "legacy_tick_s": legacy, "compiled_tick_s": compiled,
+            "speedup": legacy / compiled if compiled else float("inf")}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="알람 판정 틱당 비용 비교")
+    ap.add_argument("--sizes", default="10000,100000")
+    ap.add_argument("--ticks", type=int, default=5)
+    args = ap.parse_args(argv)
+    print(f"{'alarms':>8} {'compile':>10} {'legacy/tick':>12} {'compiled/tick':>14} {'speedup':>8}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n, args.ticks)
+        print(f"{r['alarms']:>8} {r['compile_s']*1e3:>8.1f}ms {r['legacy_tick_s']*1e3:>10.1f}ms "
+              f"{r['compiled_tick_s']*1e3:>12.1f}ms {r['speedup']:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
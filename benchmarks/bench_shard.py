@@ -0,0 +1,69 @@
+import os
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+
+from shard_calendaralarmclock import ShardedScheduler
+from benchmarks.gen_alarms import generate_alarms
+
+# 분산 스케줄러: 알람 n 개를 작업 프로세스에 나눠 올린 뒤 같은 초에 fire 개가 울릴 때
+#   reset_s   : 조정자가 전체 목록을 나눠 보내는 시간
+#   ready_s   : 모든 프로세스가 자기 몫을 컴파일/스케줄링하고 첫 결과를 보낼 때까지
+#   lag_*_s   : 예정 시각 -> 조정자 pop_due 에서 꺼낸 시각
+#   rebalance : 한 버킷에 몰리게 추가/삭제했을 때 옮긴 알람 수
+
+def _quantile(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(q * len(xs)))] if xs else None
+
+def run(n, workers=None, fire=1000, seed=0):
+    alarms = generate_alarms(n, seed)
+    hot = alarms[:fire]
+    for a in hot:
+        a["enabled"] = False  # 목표 시각을 정한 뒤 켠다
+    sched = ShardedScheduler(workers)
+    got = threading.Event()
+    sched.start(got.set)
+    try:
+        t0 = time.perf_counter()
+        sched.reset(alarms, catch_up=False)
+        reset_s = time.perf_counter() - t0
+        sched.wait_ready()
+        ready_s = time.perf_counter() - t0
+        target = (datetime.now() + timedelta(seconds=2)).replace(microsecond=0)
+        ids = set()
+        for a in hot:
+            for k in ("period_start", "period_end"):
+                a.pop(k, None)
+            a.update(recurrence="daily", times=[target.strftime("%H:%M:%S")], enabled=True)
+            sched.update(a)
+            ids.add(a["id"])
+        lags = []
+        while datetime.now() < target + timedelta(seconds=2) and len(lags) < len(ids):
+            got.wait(0.2)
+            got.clear()
+            now = datetime.now()
+            lags += [(now - t).total_seconds() for a, t in sched.pop_due(now) if a["id"] in ids and t == target]
+        st = sched.stats()
+        return {"alarms": n, "workers": st["workers"], "reset_s": reset_s, "ready_s": ready_s, "fired": len(lags),
+                "lag_p50_s": _quantile(lags, 0.5), "lag_p99_s": _quantile(lags, 0.99),
+                "lag_max_s": max(lags) if lags else None, "duplicates": st["duplicates"],
+                "load_min": min(st["load"]), "load_max": max(st["load"]), "moved": st["moved"]}
+    finally:
+        sched.stop()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="분산 스케줄러 발생 지연")
+    ap.add_argument("--sizes", default="10000,100000")
+    ap.add_argument("--workers", type=int, default=os.cpu_count())
+    ap.add_argument("--fire", type=int, default=1000, help="같은 초에 울릴 알람 수")
+    args = ap.parse_args(argv)
+    print(f"{'alarms':>8} {'workers':>7} {'ready':>8} {'p50':>8} {'p99':>8} {'max':>8} {'fired':>6} {'load':>13}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n, args.workers, args.fire)
+        print(f"{n:>8} {r['workers']:>7} {r['ready_s']:>7.2f}s {r['lag_p50_s']*1e3:>6.1f}ms {r['lag_p99_s']*1e3:>6.1f}ms "
+              f"{r['lag_max_s']*1e3:>6.1f}ms {r['fired']:>6} {r['load_min']:>6}-{r['load_max']}")
+
+if __name__ == "__main__":
+    main()
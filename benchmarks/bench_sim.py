@@ -0,0 +1,36 @@
+import os
+import time
+import argparse
+from datetime import datetime, timedelta
+
+from sim_calendaralarmclock import run as simulate_run
+from benchmarks.gen_alarms import generate_alarms
+
+# 가상 시계 시뮬레이션 처리량: 알람 n 개를 days 일 동안 실제 스케줄러로 돌렸을 때
+#   sim_s       : 전체 시간(결과 파일은 쓰지 않고 회차만 센다)
+#   fires_per_s : 초당 처리한 울림 회차 수
+# jobs > 1 이면 알람을 나눠 프로세스 여러 개로 돌린다(프로세스 시작 시간 포함)
+
+def run(n, days=30, seed=0, jobs=1):
+    alarms = generate_alarms(n, seed)
+    start = datetime(2026, 1, 1)
+    t0 = time.perf_counter()
+    fires = simulate_run(alarms, start, start + timedelta(days=days), jobs=jobs)
+    sim_s = time.perf_counter() - t0
+    return {"alarms": n, "days": days, "jobs": jobs, "fires": fires, "sim_s": sim_s,
+            "fires_per_s": fires / sim_s if sim_s else 0.0}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="가상 시계 시뮬레이션 처리량")
+    ap.add_argument("--sizes", default="10000,100000")
+    ap.add_argument("--days", type=int, default=30)
+    ap.add_argument("--jobs", type=int, default=1, help="나눠 돌릴 프로세스 수(0 이면 CPU 수)")
+    args = ap.parse_args(argv)
+    jobs = args.jobs or os.cpu_count()
+    print(f"{'alarms':>8} {'days':>5} {'jobs':>4} {'fires':>10} {'time':>9} {'fires/s':>10}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n, args.days, jobs=jobs)
+        print(f"{n:>8} {r['days']:>5} {r['jobs']:>4} {r['fires']:>10} {r['sim_s']:>8.1f}s {r['fires_per_s']:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from store_calendaralarmclock import JournalStore, SqliteStore
+from benchmarks.gen_alarms import generate_alarms, generate_alarm
+
+# 저장소별 load / save(알람 1개 추가) / toggle 지연 비교
+# json = 기존 방식(변경마다 alarms.json 전체를 indent=2 로 다시 씀)
+
+def _avg(fn, repeat):
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - t0) / repeat
+
+def bench_json(path, alarms, repeat):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(alarms, f, ensure_ascii=False, indent=2)
+
+    def load(_):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(_):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(alarms, f, ensure_ascii=False, indent=2)
+
+    def toggle(i):
+        a = alarms[i % len(alarms)]
+        a["enabled"] = not a.get("enabled", True)
+        save(i)
+
+    return {"load_s": _avg(load, 1), "save_s": _avg(save, repeat), "toggle_s": _avg(toggle, repeat)}
+
+def bench_store(store, alarms, repeat, rng_seed=1):
+    import random
+    rng = random.Random(rng_seed)
+    store.save_all(alarms)
+    res = {"load_s": _avg(lambda _: store.load(force=True), 1)}
+    # 파일이 그대로일 때 다시 부르는 load(signature 비교만)
+    res["load_cached_s"] = _avg(lambda _: store.load(), repeat)
+    live = store.load()
+    res["save_s"] = _avg(lambda _: store.add(generate_alarm(rng)), repeat)
+    res["toggle_s"] = _avg(lambda i: store.set_enabled(live[i % len(live)]["id"],
+                                                       not live[i % len(live)].get("enabled", True)), repeat)
+    if isinstance(store, SqliteStore):
+        # 시작 시 전체 대신 곧 울릴 알람만 읽는 경우
+        res["load_due_1h_s"] = _avg(lambda _: store.load_due(datetime.now() + timedelta(hours=1)), 1)
+    store.close()
+    return res
+
+def run(n, repeat=20, workdir=None):
+    alarms = generate_alarms(n)
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_store_")
+    try:
+        out = {"alarms": n}
+        out["json"] = bench_json(os.path.join(workdir, "legacy.json"), [dict(a) for a in alarms], repeat)
+        out["journal"] = bench_store(JournalStore(os.path.join(workdir, "alarms.json")), [dict(a) for a in alarms], repeat)
+        out["sqlite"] = bench_store(SqliteStore(os.path.join(workdir, "alarms.db")), [dict(a) for a in alarms], repeat)
+        return out
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="저장소 load/save/toggle 지연 비교")
+    ap.add_argument("--sizes", default="1000,100000", help="예: 1000,100000,1000000")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args(argv)
+    print(f"{'alarms':>8} {'store':>8} {'load':>10} {'save':>10} {'toggle':>10} {'load_due':>10}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n, args.repeat)
+        for name in ("json", "journal", "sqlite"):
+            m = r[name]
+            due = f"{m['load_due_1h_s']*1e3:>8.1f}ms" if "load_due_1h_s" in m else f"{'-':>10}"
+            print(f"{n:>8} {name:>8} {m['load_s']*1e3:>8.1f}ms {m['save_s']*1e3:>8.2f}ms "
+                  f"{m['toggle_s']*1e3:>8.2f}ms {due}")
+
+if __name__ == "__main__":
+    main()
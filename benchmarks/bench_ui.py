@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from store_calendaralarmclock import JournalStore
+from engine_calendaralarmclock import ChangeEvent
+from benchmarks.gen_alarms import generate_alarms
+
+# Tk 화면 갱신 비용: 앱 시작 / refresh_list / 변경 1건 반영 / draw_calendar / 달 이동
+# 창은 숨긴 채(withdraw) 측정한다. 리눅스에서 $DISPLAY 가 없으면 Xvfb 가 있을 때만 띄워서 쓰고, 없으면 건너뛴다
+
+_xvfb = None
+
+def _tk_root():
+    global _xvfb
+    import tkinter as tk
+    try:
+        return tk.Tk()
+    except tk.TclError:
+        if _xvfb is not None or not sys.platform.startswith("linux") or not shutil.which("Xvfb"):
+            return None
+    display = ":%d" % (90 + os.getpid() % 10)
+    _xvfb = subprocess.Popen(["Xvfb", display, "-nolisten", "tcp"],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    for _ in range(50):
+        time.sleep(0.1)
+        try:
+            return tk.Tk()
+        except tk.TclError:
+            pass
+    return None
+
+def _timed(root, fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        root.update_idletasks()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def run(n, repeat=3, seed=0, workdir=None):
+    os.environ.setdefault("CALENDARALARM_AUDIO", "null")
+    root = _tk_root()
+    if root is None:
+        return {"alarms": n, "skipped": "Tk 화면을 만들 수 없음($DISPLAY 없음, Xvfb 없음)"}
+    root.withdraw()
+    import win_calendaralarmclock as win
+    workdir = workdir or tempfile.mkdtemp(prefix="bench_ui_")
+    app = None
+    try:
+        store = JournalStore(os.path.join(workdir, "alarms.json"))
+        store.save_all(generate_alarms(n, seed))
+        # 앱은 모듈 전역 store 를 쓰므로 측정용 저장소로 바꿔 끼운다
+        win.store = store
+        t0 = time.perf_counter()
+        app = win.AlarmApp(root)
+        root.update_idletasks()
+        out = {"alarms": n, "startup_s": time.perf_counter() - t0}
+        out["refresh_list_s"] = _timed(root, app.refresh_list, repeat)
+        # 알람 하나가 바뀌었을 때 목록 반영(보이는 줄만 다시 씀)
+        a = app.alarms[len(app.alarms) // 2]
+        out["list_change_s"] = _timed(root, lambda: app.alarm_list.apply(ChangeEvent("toggled", a["id"], a)), repeat)
+        out["draw_calendar_s"] = _timed(root, app.draw_calendar, repeat)
+        out["next_month_s"] = _timed(root, app.go_next_month, repeat)
+        return out
+    finally:
+        if app is not None:
+            app.engine.stop()
+            app.executor.shutdown()
+        root.destroy()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Tk 목록/달력 갱신 비용")
+    ap.add_argument("--sizes", default="1000,10000")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    print(f"{'alarms':>8} {'startup':>10} {'refresh':>10} {'calendar':>10} {'next_mon':>10}")
+    for n in (int(x) for x in args.sizes.split(",")):
+        r = run(n, args.repeat)
+        if "skipped" in r:
+            print(f"{n:>8} 건너뜀: {r['skipped']}")
+            continue
+        print(f"{n:>8} {r['startup_s']*1e3:>8.1f}ms {r['refresh_list_s']*1e3:>8.1f}ms "
+              f"{r['draw_calendar_s']*1e3:>8.1f}ms {r['next_month_s']*1e3:>8.1f}ms")
+
+if __name__ == "__main__":
+    main()
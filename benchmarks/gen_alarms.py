@@ -0,0 +1,44 @@
+import random
+import uuid
+from datetime import datetime, timedelta
+
+# 벤치마크용 가상 알람 생성기 (alarms.json 과 같은 dict 형식)
+
+RECURRENCE_WEIGHTS = (("daily", 35), ("weekly", 30), ("monthly", 15), ("yearly", 5), ("interval", 15))
+
+def _rand_time(rng):
+    return f"{rng.randrange(24):02d}:{rng.randrange(0, 60, 5):02d}:00"
+
+def generate_alarm(rng, base=None):
+    base = base or datetime(2025, 1, 1)
+    kinds, weights = zip(*RECURRENCE_WEIGHTS)
+    rec = rng.choices(kinds, weights)[0]
+    alarm = {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "name": f"알람{rng.randrange(1_000_000)}",
+        "recurrence": rec,
+        "times": sorted({_rand_time(rng) for _ in range(rng.choice((1, 1, 2, 3)))}),
+        "enabled": rng.random() < 0.9,
+        "last_triggered": "",
+    }
+    if rec == "weekly":
+        alarm["weekdays"] = sorted(rng.sample(range(7), rng.randint(1, 5)))
+    elif rec == "monthly":
+        alarm["day_of_month"] = rng.randint(1, 31)
+    elif rec == "yearly":
+        alarm["month"] = rng.randint(1, 12)
+        alarm["day"] = rng.randint(1, 28)
+    elif rec == "interval":
+        alarm["interval_days"] = rng.randint(2, 7)
+        alarm["interval_offsets"] = sorted(rng.sample(range(1, alarm["interval_days"] + 1), rng.randint(1, 2)))
+    # 기간 지정(간격 반복은 시작일이 기준이라 대부분 지정)
+    if rec == "interval" or rng.random() < 0.3:
+        start = base + timedelta(days=rng.randint(-180, 180), hours=rng.randint(0, 23))
+        alarm["period_start"] = start.strftime("%Y-%m-%d %H:%M:%S")
+        if rng.random() < 0.5:
+            alarm["period_end"] = (start + timedelta(days=rng.randint(7, 365))).strftime("%Y-%m-%d %H:%M:%S")
+    return alarm
+
+def generate_alarms(n, seed=0, base=None):
+    rng = random.Random(seed)
+    return [generate_alarm(rng, base) for _ in range(n)]
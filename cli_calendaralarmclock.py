@@ -0,0 +1,249 @@
+import os
+import sys
+import heapq
+from datetime import datetime
+
+from core_calendaralarmclock import compile_alarm, parse_time_token, alarm_key
+from store_calendaralarmclock import open_store, alarm_tags
+
+# 화면 없는 명령줄 도구. 코어/저장소만 불러온다(tkinter/Kivy/오디오/asyncio 없음)
+#   python -m cli_calendaralarmclock list
+#   python -m cli_calendaralarmclock add 출근 --times 07:30 --recurrence weekly --weekdays 0,1,2,3,4
+#   python -m cli_calendaralarmclock check --at "2025-11-03 07:30:00"
+#   python -m cli_calendaralarmclock next --count 5
+#   python -m cli_calendaralarmclock import calendar.ics
+#   python -m cli_calendaralarmclock holidays --year 2026
+#   python -m cli_calendaralarmclock history --alarm <id> --csv out.csv
+#   python -m cli_calendaralarmclock bulk disable --tag 야간조
+#   python -m cli_calendaralarmclock bulk delete-expired
+# 앱이 켜져 있어도 된다. 저장 파일이 바뀌면 앱 쪽 감시(StoreWatcher)가 다시 읽는다
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alarms.json")
+REC_NAMES = {"daily": "매일", "weekly": "매주", "monthly": "매월", "yearly": "매년", "interval": "간격"}
+WEEKDAY_NAMES = "월화수목금토일"
+
+def _parse_at(text):
+    try:
+        return datetime.fromisoformat(text.strip())
+    except ValueError:
+        raise SystemExit(f"시각 형식이 잘못되었습니다(YYYY-MM-DD HH:MM[:SS]): {text}")
+
+def _int_list(text):
+    try:
+        return [int(x) for x in text.replace("&", ",").split(",") if x.strip()]
+    except ValueError:
+        raise SystemExit(f"숫자 목록(콤마 구분)이어야 합니다: {text}")
+
+def _describe(alarm):
+    rec = alarm.get("recurrence", "daily")
+    out = REC_NAMES.get(rec, rec)
+    if rec == "weekly":
+        out += "(" + "".join(WEEKDAY_NAMES[d] for d in alarm.get("weekdays") or [] if 0 <= d <= 6) + ")"
+    elif rec == "monthly":
+        out += f"({alarm.get('day_of_month')}일)"
+    elif rec == "yearly":
+        out += f"({alarm.get('month')}/{alarm.get('day')})"
+    elif rec == "interval":
+        out += f"({alarm.get('interval_days')}일마다 {alarm.get('interval_offsets') or [1]})"
+    if alarm.get("exclude_calendars"):
+        out += " -" + ",".join(alarm["exclude_calendars"])
+    return out
+
+def cmd_list(store, args):
+    now = datetime.now()
+    alarms = store.load()
+    if args.tag:
+        alarms = [store.get(i) for i in store.tag_ids(args.tag)]
+    for a in alarms:
+        enabled = a.get("enabled", True)
+        if args.enabled and not enabled:
+            continue
+        nf = compile_alarm(a).next_fire(now) if enabled else None
+        print(f"{str(a.get('id', ''))[:8]:<8} {'●' if enabled else '○'} {a.get('name', ''):<16} "
+              f"{_describe(a):<20} {','.join(a.get('times', [])):<20} {str(nf or '-'):<19} "
+              f"{' '.join('#' + t for t in alarm_tags(a))}".rstrip())
+    return 0
+
+def cmd_add(store, args):
+    times = [parse_time_token(t) for t in args.times.split(",") if t.strip()]
+    if not times or None in times:
+        raise SystemExit(f"시각 형식이 잘못되었습니다(HH:MM[:SS], 콤마 구분): {args.times}")
+    alarm = {"name": args.name, "recurrence": args.recurrence, "times": times,
+             "enabled": not args.disabled, "last_triggered": ""}
+    if args.weekdays:
+        alarm["weekdays"] = _int_list(args.weekdays)
+    if args.day_of_month is not None:
+        alarm["day_of_month"] = args.day_of_month
+    if args.month is not None:
+        alarm["month"], alarm["day"] = args.month, args.day
+    if args.interval_days is not None:
+        alarm["interval_days"] = args.interval_days
+        alarm["interval_offsets"] = _int_list(args.offsets) if args.offsets else [1]
+    if args.start:
+        alarm["period_start"] = str(_parse_at(args.start))
+    if args.end:
+        alarm["period_end"] = str(_parse_at(args.end))
+    if args.music:
+        alarm["music_file"] = os.path.abspath(args.music)
+    if args.tags:
+        alarm["tags"] = list(alarm_tags({"tags": args.tags}))
+    if args.priority is not None:
+        alarm["priority"] = args.priority
+    if args.exclude:
+        alarm["exclude_calendars"] = [n.strip() for n in args.exclude.split(",") if n.strip()]
+    alarm_key(alarm)
+    if args.warn and compile_alarm(alarm).next_fire(datetime.now()) is None:
+        print("경고: 이 알람은 앞으로 울릴 일이 없습니다", file=sys.stderr)
+    store.load()
+    store.add(alarm)
+    print(alarm["id"])
+    return 0
+
+def cmd_check(store, args):
+    # 그 시각에 울릴 알람(마지막 울림 기록은 보지 않음). 하나라도 있으면 0, 없으면 1
+    at = _parse_at(args.at).replace(microsecond=0)
+    hits = [a for a in store.load() if compile_alarm(a).matches(at)]
+    for a in hits:
+        print(f"{a.get('id', '')}\t{a.get('name', '')}")
+    return 0 if hits else 1
+
+def cmd_next(store, args):
+    # 모든 알람의 다음 회차를 시간순으로 count 개
+    after = _parse_at(args.after) if args.after else datetime.now()
+    alarms = store.load()
+    rules = [compile_alarm(a) for a in alarms]
+    heap = []
+    for i, rule in enumerate(rules):
+        t = rule.next_fire(after)
+        if t is not None:
+            heap.append((t, i))
+    heapq.heapify(heap)
+    for _ in range(args.count):
+        if not heap:
+            break
+        t, i = heapq.heappop(heap)
+        print(f"{t}\t{alarms[i].get('name', '')}\t{alarms[i].get('id', '')}")
+        nxt = rules[i].next_fire(t)
+        if nxt is not None:
+            heapq.heappush(heap, (nxt, i))
+    return 0
+
+def cmd_import(store, args):
+    import ical_calendaralarmclock as ical
+    store.load()
+    print(ical.summary("가져왔습니다", ical.import_ics(args.path, store.add_many, args.batch)))
+    return 0
+
+def cmd_holidays(store, args):
+    # 휴일 달력 목록과 그해 제외되는 날 수
+    from holiday_calendaralarmclock import CALENDARS
+    year = args.year or datetime.now().year
+    for name in CALENDARS.names():
+        cal = CALENDARS.get(name)
+        print(f"{name:<16} {bin(cal.year_bits(year)).count('1'):>4}일  {cal.title}")
+    return 0
+
+def cmd_history(store, args):
+    # 울림 기록(logCalendarAlarmClock). 표준 출력 또는 --csv 파일로
+    from logCalendarAlarmClock import FireHistory, history_path
+    path = history_path(args.store)
+    if not os.path.exists(path):
+        print(f"울림 기록이 없습니다: {path}", file=sys.stderr)
+        return 1
+    filters = {"alarm_id": args.alarm, "start": _parse_at(args.since) if args.since else None,
+               "end": _parse_at(args.until) if args.until else None}
+    with FireHistory(path) as hist:
+        n = hist.export_csv(args.csv or sys.stdout, store.load(), **filters)
+    if args.csv:
+        print(f"{n}줄을 {args.csv} 로 내보냈습니다")
+    return 0
+
+def cmd_bulk(store, args):
+    # 태그 단위 켜기/끄기/삭제, 기간 끝난 알람 삭제. 해당 알람만 골라 한 번에 기록한다
+    # (앱이 켜져 있으면 저장 파일 감시로 반영된다. 앱 안에서는 API 의 POST /bulk 를 쓰면 바로 반영)
+    store.load()
+    if args.action == "delete-expired":
+        n = len(store.delete_many(store.expired_ids()))
+    elif not args.tag:
+        raise SystemExit("--tag 가 필요합니다")
+    elif args.action == "delete":
+        n = len(store.delete_many(store.tag_ids(args.tag)))
+    else:
+        n = len(store.set_enabled_many(store.tag_ids(args.tag), args.action == "enable"))
+    print(f"{n}개 알람을 바꿨습니다")
+    return 0
+
+def cmd_tags(store, args):
+    store.load()
+    for tag, n in store.tags().items():
+        print(f"{tag:<20} {n}")
+    return 0
+
+def build_parser():
+    import argparse
+    ap = argparse.ArgumentParser(prog="cli_calendaralarmclock", description="캘린더 알람 명령줄 도구")
+    ap.add_argument("--store", default=os.environ.get("CALENDARALARM_STORE") or DATA_FILE,
+                    help="alarms.json / *.db 경로")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("list", help="알람 목록과 다음 울림 시각")
+    p.add_argument("--enabled", action="store_true", help="사용 중인 알람만")
+    p.add_argument("--tag", help="이 태그가 붙은 알람만")
+    p.set_defaults(func=cmd_list)
+    p = sub.add_parser("add", help="알람 추가(새 id 출력)")
+    p.add_argument("name")
+    p.add_argument("--times", required=True, help="HH:MM[:SS], 콤마 구분")
+    p.add_argument("--recurrence", default="daily", choices=list(REC_NAMES))
+    p.add_argument("--weekdays", help="매주: 0=월 ... 6=일, 콤마 구분")
+    p.add_argument("--day-of-month", type=int, help="매월: 날짜")
+    p.add_argument("--month", type=int, help="매년: 월")
+    p.add_argument("--day", type=int, help="매년: 일")
+    p.add_argument("--interval-days", type=int, help="간격: 주기(일)")
+    p.add_argument("--offsets", help="간격: 주기 안의 활성일(1부터), 콤마 구분")
+    p.add_argument("--start", help="기간 시작 YYYY-MM-DD[ HH:MM:SS] (간격 반복의 기준일)")
+    p.add_argument("--end", help="기간 끝")
+    p.add_argument("--music", help="알람 음악(WAV) 파일")
+    p.add_argument("--exclude", help="제외 달력 이름(holidays.json), 콤마 구분")
+    p.add_argument("--tags", help="태그, 콤마 구분(예: 야간조,본사)")
+    p.add_argument("--priority", type=int, help="알림 우선순위(클수록 우선). 같이 울린 알람 중 이 알람의 소리를 낸다")
+    p.add_argument("--disabled", action="store_true", help="꺼진 상태로 추가")
+    p.add_argument("--no-check", dest="warn", action="store_false", help="울릴 일 없는 알람 경고 생략")
+    p.set_defaults(func=cmd_add)
+    p = sub.add_parser("check", help="지정 시각에 울릴 알람(있으면 종료 코드 0)")
+    p.add_argument("--at", required=True, help="YYYY-MM-DD HH:MM[:SS]")
+    p.set_defaults(func=cmd_check)
+    p = sub.add_parser("next", help="다가오는 울림 시각")
+    p.add_argument("--count", type=int, default=10)
+    p.add_argument("--after", help="이 시각 이후(기본: 지금)")
+    p.set_defaults(func=cmd_next)
+    p = sub.add_parser("import", help=".ics 파일 가져오기")
+    p.add_argument("path")
+    p.add_argument("--batch", type=int, default=1000, help="한 번에 저장할 알람 수")
+    p.set_defaults(func=cmd_import)
+    p = sub.add_parser("holidays", help="휴일 달력과 그해 제외되는 날 수")
+    p.add_argument("--year", type=int, help="연도(기본: 올해)")
+    p.set_defaults(func=cmd_holidays)
+    p = sub.add_parser("history", help="울림/다시 알림/끄기 기록")
+    p.add_argument("--alarm", help="알람 id")
+    p.add_argument("--since", help="예정 시각 이후 YYYY-MM-DD[ HH:MM:SS]")
+    p.add_argument("--until", help="예정 시각 이전")
+    p.add_argument("--csv", help="CSV 파일로 저장")
+    p.set_defaults(func=cmd_history)
+    p = sub.add_parser("tags", help="태그별 알람 수")
+    p.set_defaults(func=cmd_tags)
+    p = sub.add_parser("bulk", help="태그 단위 켜기/끄기/삭제, 기간 끝난 알람 삭제")
+    p.add_argument("action", choices=["enable", "disable", "delete", "delete-expired"])
+    p.add_argument("--tag", help="대상 태그(delete-expired 제외)")
+    p.set_defaults(func=cmd_bulk)
+    return ap
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    store = open_store(args.store)
+    try:
+        store.ensure()
+        return args.func(store, args)
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
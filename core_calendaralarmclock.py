@@ -0,0 +1,515 @@
+import functools
+import heapq
+import os
+import logging
+import threading
+import calendar
+from datetime import datetime, timedelta, time as dtime
+
+from holiday_calendaralarmclock import CALENDARS
+
+# 알람 판정/스케줄링 핵심 로직 (GUI 의존성 없음)
+
+# 다음 발생일 탐색 한도(일). 매년 2/29 같은 경우도 8년 안에는 반드시 나온다
+MAX_SCAN_DAYS = 366 * 8
+
+EPOCH = datetime(1970, 1, 1)
+ONE_DAY = timedelta(days=1)
+EPOCH_ORD = EPOCH.toordinal()
+DAY = 86400
+
+def to_seconds(dt):
+    # naive 현지 시각 -> 1970-01-01 기준 초 (시간대 변환 없음)
+    return (dt.toordinal() - EPOCH_ORD) * DAY + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+def from_seconds(s):
+    return EPOCH + timedelta(seconds=int(s))
+
+def parse_time_token(tok):
+    tok = tok.strip()
+    if not tok:
+        return None
+    parts = tok.split(":")
+    try:
+        if len(parts) == 2:
+            return f"{int(parts[0]):02d}:{int(parts[1]):02d}:00"
+        if len(parts) == 3:
+            return f"{int(parts[0]):02d}:{int(parts[1]):02d}:{int(parts[2]):02d}"
+    except Exception:
+        return None
+    return None
+
+def time_matches_spec(now, spec):
+    cur = now.strftime("%H:%M:%S")
+    return cur.startswith(spec)
+
+# 반복 종류 (AlarmRule.kind)
+DAILY, WEEKLY, MONTHLY, YEARLY, INTERVAL = range(5)
+NEVER = -1
+RECURRENCE_KINDS = {"daily": DAILY, "weekly": WEEKLY, "monthly": MONTHLY, "yearly": YEARLY, "interval": INTERVAL}
+
+def time_spec_seconds(spec):
+    # "HH:MM" / "HH:MM:SS" -> 자정 기준 초, 해석 불가하면 None
+    return _spec_seconds(spec) if isinstance(spec, str) else None
+
+@functools.lru_cache(maxsize=4096)
+def _spec_seconds(spec):
+    tok = parse_time_token(spec)
+    if not tok:
+        return None
+    h, m, s = (int(x) for x in tok.split(":"))
+    if h > 23 or m > 59 or s > 59:
+        return None
+    return h * 3600 + m * 60 + s
+
+@functools.lru_cache(maxsize=4096)
+def _tod_parts(tods):
+    # 같은 시간 목록을 가진 규칙끼리 (초 튜플, 집합, timedelta 튜플)을 공유한다(모두 불변)
+    return tods, frozenset(tods), tuple(timedelta(seconds=s) for s in tods)
+
+class AlarmRule:
+    # 알람 dict를 미리 해석해 둔 불변 규칙.
+    # 기간은 datetime, 시간은 자정 기준 초, 요일/간격내 활성일은 비트마스크로 보관한다.
+    # excl 은 제외 달력 묶음(holiday_calendaralarmclock.Exclusion), 없으면 None
+    __slots__ = ("kind", "start", "end", "tods", "tod_set", "tod_deltas", "wmask", "dom", "month", "day",
+                 "interval", "start_ord", "offmask", "excl")
+
+    def __init__(self, kind, start=None, end=None, tods=(), wmask=0, dom=0, month=0, day=0,
+                 interval=1, start_ord=None, offmask=1, excl=None):
+        setattr_ = object.__setattr__
+        setattr_(self, "kind", kind if tods else NEVER)
+        setattr_(self, "start", start)
+        setattr_(self, "end", end)
+        tods, tod_set, tod_deltas = _tod_parts(tuple(tods))
+        setattr_(self, "tods", tods)
+        setattr_(self, "tod_set", tod_set)
+        setattr_(self, "tod_deltas", tod_deltas)
+        setattr_(self, "wmask", wmask)
+        setattr_(self, "dom", dom)
+        setattr_(self, "month", month)
+        setattr_(self, "day", day)
+        setattr_(self, "interval", interval)
+        setattr_(self, "start_ord", start_ord)
+        setattr_(self, "offmask", offmask)
+        setattr_(self, "excl", excl)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AlarmRule은 변경할 수 없습니다. compile_alarm()으로 다시 만드세요.")
+
+    def date_matches(self, d):
+        # 제외 달력에 든 날은 반복 규칙과 상관없이 건너뛴다(비트 하나 검사)
+        if self.excl is not None and self.excl.excluded(d):
+            return False
+        kind = self.kind
+        if kind == DAILY:
+            return True
+        if kind == WEEKLY:
+            return bool(self.wmask >> d.weekday() & 1)
+        if kind == MONTHLY:
+            return d.day == self.dom
+        if kind == YEARLY:
+            return d.month == self.month and d.day == self.day
+        if kind == INTERVAL:
+            if self.start_ord is None:
+                return True
+            delta = d.toordinal() - self.start_ord
+            return delta >= 0 and bool(self.offmask >> (delta % self.interval) & 1)
+        return False
+
+    def matches(self, now):
+        # should_trigger 와 같은 판정(마지막 울림 중복 검사 제외)
+        if self.kind == NEVER:
+            return False
+        if now.hour * 3600 + now.minute * 60 + now.second not in self.tod_set:
+            return False
+        if self.start is not None and now < self.start:
+            return False
+        if self.end is not None and now > self.end:
+            return False
+        return self.date_matches(now)
+
+    def next_date(self, d):
+        # d 이후(포함) 반복 규칙에 맞는 첫 날짜, 없으면 None
+        kind = self.kind
+        if kind == DAILY:
+            return d
+        if kind == WEEKLY:
+            wd = d.weekday()
+            for k in range(7):
+                if self.wmask >> ((wd + k) % 7) & 1:
+                    return d + timedelta(days=k)
+            return None
+        if kind == MONTHLY:
+            y, m = d.year, d.month
+            for _ in range(13):
+                if self.dom <= calendar.monthrange(y, m)[1] and (y, m, self.dom) >= (d.year, d.month, d.day):
+                    return d.replace(year=y, month=m, day=self.dom)
+                y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+            return None
+        if kind == YEARLY:
+            for y in range(d.year, d.year + 9):
+                try:
+                    cand = d.replace(year=y, month=self.month, day=self.day)
+                except ValueError:
+                    continue
+                if cand >= d:
+                    return cand
+            return None
+        if kind == INTERVAL:
+            if self.start_ord is None:
+                return d
+            delta = max(0, d.toordinal() - self.start_ord)
+            pos = delta % self.interval
+            # 간격 내 다음 활성 위치까지(한 바퀴 돌아서 포함) 찾기
+            for k in range(self.interval):
+                if self.offmask >> ((pos + k) % self.interval) & 1:
+                    return d.fromordinal(self.start_ord + delta + k)
+            return None
+        return None
+
+    def next_fire(self, after):
+        # after 보다 늦은(초 단위) 첫 알람 시각, 더 이상 울릴 일이 없으면 None
+        if self.kind == NEVER:
+            return None
+        ps, pe = self.start, self.end
+        if after.microsecond:
+            after = after.replace(microsecond=0)
+        d = after.date()
+        if ps and ps.date() > d:
+            d = ps.date()
+        # 스케줄러/시뮬레이션에서 회차마다 불리므로 매일 반복은 next_date 호출 없이, 시각 오프셋은 미리 만든 것 사용
+        daily = self.kind == DAILY and self.excl is None
+        pe_date = pe.date() if pe else None
+        for _ in range(MAX_SCAN_DAYS):
+            if not daily:
+                d = self.next_date(d)
+                if d is None:
+                    return None
+            if pe_date is not None and d > pe_date:
+                return None
+            if self.excl is not None and self.excl.excluded(d):
+                d += ONE_DAY
+                continue
+            base = datetime.combine(d, dtime())
+            for td in self.tod_deltas:
+                t = base + td
+                if t <= after or (ps and t < ps):
+                    continue
+                if pe and t > pe:
+                    return None
+                return t
+            d += ONE_DAY
+        return None
+
+    def fires_between(self, after, until):
+        # (after, until] 구간의 모든 알람 시각. 틱이 밀려 건너뛴 초도 여기서 잡힌다
+        t = self.next_fire(after)
+        while t is not None and t <= until:
+            yield t
+            t = self.next_fire(t)
+
+NEVER_RULE = AlarmRule(NEVER)
+
+def compile_alarm(alarm):
+    # 알람 dict -> AlarmRule. 알람이 바뀔 때만 다시 호출하면 된다
+    if not alarm.get("enabled", True):
+        return NEVER_RULE
+    kind = RECURRENCE_KINDS.get(alarm.get("recurrence", "daily"), NEVER)
+    try:
+        ps = alarm.get("period_start") or alarm.get("start_date")
+        pe = alarm.get("period_end")
+        start = datetime.fromisoformat(ps) if ps else None
+        end = datetime.fromisoformat(pe) if pe else None
+    except (TypeError, ValueError):
+        return NEVER_RULE
+    excl = CALENDARS.exclusion(alarm["exclude_calendars"]) if alarm.get("exclude_calendars") else None
+    tods = sorted({s for s in map(time_spec_seconds, alarm.get("times", [])) if s is not None})
+    if kind == WEEKLY:
+        wmask = 0
+        for w in alarm.get("weekdays", []):
+            if isinstance(w, int) and 0 <= w <= 6:
+                wmask |= 1 << w
+        return AlarmRule(kind, start, end, tods, wmask=wmask, excl=excl)
+    if kind == MONTHLY:
+        dom = alarm.get("day_of_month")
+        if not isinstance(dom, int) or not 1 <= dom <= 31:
+            return NEVER_RULE
+        return AlarmRule(kind, start, end, tods, dom=dom, excl=excl)
+    if kind == YEARLY:
+        m, d = alarm.get("month"), alarm.get("day")
+        try:
+            datetime(2000, m, d)  # 윤년 기준으로 존재하는 날짜인지
+        except (TypeError, ValueError):
+            return NEVER_RULE
+        return AlarmRule(kind, start, end, tods, month=m, day=d, excl=excl)
+    if kind == INTERVAL:
+        # 간격내 활성일(1 기반) -> 비트(0 기반), 지정 없으면 첫날만
+        offmask = 0
+        try:
+            interval = max(1, int(alarm.get("interval_days", 1)))
+            for x in alarm.get("interval_offsets") or [1]:
+                x = int(x)
+                if 1 <= x <= interval:
+                    offmask |= 1 << (x - 1)
+        except (TypeError, ValueError):
+            return NEVER_RULE
+        if not offmask:
+            return NEVER_RULE
+        start_ord = start.toordinal() if start else None
+        return AlarmRule(kind, start, end, tods, interval=interval, start_ord=start_ord, offmask=offmask,
+                         excl=excl)
+    return AlarmRule(kind, start, end, tods, excl=excl)
+
+def should_trigger(alarm, now, rule=None):
+    # rule 을 넘기면(스케줄러 캐시) 알람 dict를 다시 해석하지 않는다
+    if rule is None:
+        rule = compile_alarm(alarm)
+    if not rule.matches(now):
+        return False
+    return alarm.get("last_triggered") != now.strftime("%Y-%m-%d %H:%M:%S")
+
+def next_fire_time(alarm, after):
+    return compile_alarm(alarm).next_fire(after)
+
+class SystemClock:
+    # 실제 시각. 스케줄러/엔진은 datetime.now() 대신 clock.now() 를 부른다
+    virtual = False
+
+    def now(self):
+        return datetime.now()
+
+class VirtualClock:
+    # 시뮬레이션/시험용 시계. set/advance 로만 움직이고 기다리지 않는다
+    virtual = True
+
+    def __init__(self, start):
+        self._now = start
+
+    def now(self):
+        return self._now
+
+    def set(self, t):
+        self._now = t
+
+    def advance(self, seconds):
+        self._now += timedelta(seconds=seconds)
+
+SYSTEM_CLOCK = SystemClock()
+
+def alarm_key(alarm):
+    # id 없는 예전 알람에는 id를 부여(다음 저장 시 반영)
+    aid = alarm.get("id")
+    if not aid:
+        import uuid
+        aid = alarm["id"] = str(uuid.uuid4())
+    return aid
+
+class DeadlineScheduler:
+    # 알람별 다음 발생 시각을 힙으로 관리하고 가장 이른 시각까지 잠든다.
+    # 시계 변경 등에 대비해 최대 MAX_WAIT 초마다는 깨어나 확인한다.
+    # 깨어날 때마다 (지난 확인 시각, 지금] 구간에 든 회차를 모두 울리되,
+    # 절전/최대 절전 복귀처럼 크게 밀린 경우는 catchup 이내의 회차만 소급한다.
+    MAX_WAIT = 30.0
+    CATCHUP = timedelta(minutes=5)
+
+    def __init__(self, on_fire=None, catchup=None, clock=None):
+        self.on_fire = on_fire
+        self.catchup = self.CATCHUP if catchup is None else catchup
+        self.clock = clock or SYSTEM_CLOCK
+        self._cond = threading.Condition()
+        self._heap = []       # (deadline, id) - 오래된 항목은 꺼낼 때 버린다
+        self._entries = {}    # id -> (alarm, rule, deadline)
+        self._fired = {}      # id -> 마지막으로 울린 예정 시각(중복 방지 기준)
+        self._running = True
+        self.last_tick = None
+        self.skipped = 0      # catchup 을 넘겨 밀린 회차를 건너뛴 횟수
+
+    @staticmethod
+    def _resume_point(now):
+        return now.replace(microsecond=0) - timedelta(seconds=1)
+
+    def _start_after(self, alarm, after):
+        # 이미 울린 예정 시각 이전으로는 되돌아가지 않는다
+        fired = self._fired.get(alarm.get("id"))
+        if fired is not None and fired > after:
+            after = fired
+        last = alarm.get("last_triggered")
+        if last:
+            try:
+                after = max(after, datetime.fromisoformat(last))
+            except ValueError:
+                pass
+        return after
+
+    def _schedule(self, alarm, after, rule=None):
+        # rule 이 없으면(새 알람/변경된 알람) 그때만 컴파일한다
+        key = alarm_key(alarm)
+        try:
+            if rule is None:
+                rule = compile_alarm(alarm)
+            deadline = rule.next_fire(after)
+        except Exception:
+            logging.exception("다음 알람 시각 계산 실패: %s", alarm.get("name"))
+            rule, deadline = NEVER_RULE, None
+        self._entries[key] = (alarm, rule, deadline)
+        if deadline is not None:
+            heapq.heappush(self._heap, (deadline, key))
+
+    def _drop_stale(self):
+        heap, entries = self._heap, self._entries
+        while heap:
+            deadline, key = heap[0]
+            entry = entries.get(key)
+            if entry is not None and entry[2] == deadline:
+                return
+            heapq.heappop(heap)
+        if len(heap) > 2 * len(entries) + 64:
+            self._heap = [(e[2], k) for k, e in entries.items() if e[2] is not None]
+            heapq.heapify(self._heap)
+
+    def reset(self, alarms, catch_up=False, recompile=False):
+        # 전체 목록 교체. 내용이 같은 알람은 기존 deadline을 재사용한다
+        # catch_up=True(앱 시작 시)면 꺼져 있던 동안 catchup 이내에 놓친 회차도 울린다
+        # recompile=True(휴일 달력 변경 등)면 내용이 같아도 다시 계산한다
+        now = self.clock.now()
+        base = now - self.catchup if catch_up else self._resume_point(now)
+        with self._cond:
+            old = {} if recompile else self._entries
+            self._entries = {}
+            self._heap = []
+            for a in alarms:
+                prev = old.get(alarm_key(a))
+                if prev is not None and prev[0] == a:
+                    self._entries[a["id"]] = (a, prev[1], prev[2])
+                    if prev[2] is not None:
+                        self._heap.append((prev[2], a["id"]))
+                else:
+                    self._schedule(a, self._start_after(a, base))
+            heapq.heapify(self._heap)
+            self._fired = {k: v for k, v in self._fired.items() if k in self._entries}
+            self._cond.notify_all()
+
+    def update(self, alarm):
+        # 추가/토글 등으로 바뀐 알람 하나만 다시 계산
+        with self._cond:
+            self._schedule(alarm, self._start_after(alarm, self._resume_point(self.clock.now())))
+            self._cond.notify_all()
+
+    def update_many(self, alarms):
+        # 일괄 변경: 잠금/깨우기 한 번에 여러 알람을 다시 계산
+        with self._cond:
+            base = self._resume_point(self.clock.now())
+            for a in alarms:
+                self._schedule(a, self._start_after(a, base))
+            self._cond.notify_all()
+
+    def rebind(self, alarms):
+        # 울림 기록(last_triggered)만 바뀐 새 알람 객체로 바꿔 끼운다. 규칙/다음 회차는 그대로 둔다
+        with self._cond:
+            entries = self._entries
+            for a in alarms:
+                e = entries.get(a.get("id"))
+                if e is not None:
+                    entries[a["id"]] = (a, e[1], e[2])
+
+    def remove(self, key):
+        self.remove_many((key,))
+
+    def remove_many(self, keys):
+        with self._cond:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._fired.pop(key, None)
+            self._cond.notify_all()
+
+    def rules_for(self, alarms):
+        # 스케줄러가 들고 있는 컴파일 결과 재사용(없는 알람만 새로 컴파일)
+        with self._cond:
+            entries = self._entries
+            out = []
+            for a in alarms:
+                e = entries.get(a.get("id"))
+                out.append(e[1] if e is not None and e[0] is a else compile_alarm(a))
+        return out
+
+    def next_deadline(self):
+        with self._cond:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def pop_due(self, now):
+        # now 까지 울릴 (alarm, 예정 시각) 목록을 꺼내고 각 알람의 다음 회차를 다시 잡는다.
+        # (last_tick, now] 안의 회차는 모두 울리고, catchup 보다 오래된 회차는 건너뛴다.
+        # 울린 회차 다음부터 다시 잡으므로 같은 구간에 회차가 여럿이어도 하나씩 다 나온다
+        due = []
+        with self._cond:
+            # 가상 시계는 다음 회차로 바로 건너뛰는 것이 정상이라 알리지 않는다
+            if self.last_tick is not None and now - self.last_tick > self.catchup and not self.clock.virtual:
+                logging.info("시계가 %s 건너뜀(절전 복귀 또는 시각 변경)", now - self.last_tick)
+            cutoff = now.replace(microsecond=0) - self.catchup
+            skipped = 0
+            heap, entries, fired = self._heap, self._entries, self._fired
+            heappop, heappush = heapq.heappop, heapq.heappush
+            while heap and heap[0][0] <= now:
+                deadline, key = heappop(heap)
+                entry = entries.get(key)
+                if entry is None or entry[2] != deadline:
+                    continue
+                if deadline < cutoff:
+                    skipped += 1
+                    self._schedule(entry[0], max(deadline, cutoff - timedelta(seconds=1)), entry[1])
+                    continue
+                due.append((entry[0], deadline))
+                fired[key] = deadline
+                # 다음 회차: _schedule 과 같지만 회차마다 불리므로 키/규칙을 다시 찾지 않는다
+                try:
+                    nd = entry[1].next_fire(deadline)
+                except Exception:
+                    self._schedule(entry[0], deadline, entry[1])
+                    continue
+                entries[key] = (entry[0], entry[1], nd)
+                if nd is not None:
+                    heappush(heap, (nd, key))
+            self.last_tick = now
+        if skipped:
+            self.skipped += skipped
+            logging.warning("%s 이상 지난 알람 회차를 건너뜁니다(%d건)", self.catchup, skipped)
+        return due
+
+    def run(self):
+        # 스레드용 루프. asyncio 에서는 engine_calendaralarmclock 이 pop_due 를 직접 쓴다
+        while True:
+            with self._cond:
+                while self._running:
+                    self._drop_stale()
+                    now = self.clock.now()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    timeout = self.MAX_WAIT
+                    if self._heap:
+                        timeout = min(timeout, (self._heap[0][0] - now).total_seconds())
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                due = self.pop_due(now)
+            for alarm, deadline in due:
+                try:
+                    self.on_fire(alarm, deadline)
+                except Exception:
+                    logging.exception("스케줄러 오류")
+
+def catchup_from_env(default=DeadlineScheduler.CATCHUP):
+    # CALENDARALARM_CATCHUP=초 로 소급 범위 조정 (0 이면 밀린 회차는 울리지 않음)
+    val = os.environ.get("CALENDARALARM_CATCHUP")
+    if not val:
+        return default
+    try:
+        return timedelta(seconds=max(0, int(val)))
+    except ValueError:
+        logging.warning("CALENDARALARM_CATCHUP 값이 잘못되었습니다: %r", val)
+        return default
@@ -0,0 +1,253 @@
+import os
+import time
+import queue
+import logging
+import threading
+
+from metrics_calendaralarmclock import METRICS
+
+# 알람 발생 후속 작업(팝업/비프/음악) 처리
+# - FireExecutor: 고정 개수 작업 스레드 + 제한된 큐. submit 은 절대 기다리지 않는다(가득 차면 거절 후 집계)
+# - AudioChannel: 소리는 스레드 하나에서 순서대로만 재생(동시에 여러 소리가 겹치지 않게)
+# - FireCoalescer: 짧은 시간(window) 안에 울린 회차들을 모아 한 번에 넘긴다 -> 팝업/알림 하나, 소리 한 번
+#   window 는 CALENDARALARM_COALESCE_MS(기본 500ms, 0 이면 모으지 않고 회차마다 바로)
+# - 묶음에서 어떤 소리를 낼지는 lead_event 가 우선순위 규칙으로 정한다
+
+_STOP = object()
+
+COALESCE_WINDOW = 0.5
+# 태그 -> 우선순위. 알람에 priority(정수)가 있으면 그 값이 먼저다
+PRIORITY_TAGS = {"긴급": 10, "urgent": 10, "중요": 5, "important": 5}
+
+def coalesce_window_from_env():
+    text = (os.environ.get("CALENDARALARM_COALESCE_MS") or "").strip()
+    if not text:
+        return COALESCE_WINDOW
+    try:
+        return max(0.0, float(text) / 1000.0)
+    except ValueError:
+        logging.warning("CALENDARALARM_COALESCE_MS 형식이 잘못되었습니다: %s", text)
+        return COALESCE_WINDOW
+
+def alarm_priority(alarm):
+    p = alarm.get("priority")
+    if p is not None:
+        try:
+            return int(p)
+        except (TypeError, ValueError):
+            pass
+    tags = alarm.get("tags") or ()
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return max((PRIORITY_TAGS.get(str(t).strip().lower(), 0) for t in tags), default=0)
+
+def _lead_key(event):
+    a = event.alarm
+    # 우선순위 높은 것 > 음악이 지정된 것 > 먼저 예정된 것 > 이름순
+    return (-alarm_priority(a), not a.get("music_file"), event.scheduled, str(a.get("name", "")))
+
+def lead_event(events):
+    # 묶음의 대표 회차(이 알람의 소리를 낸다)
+    return min(events, key=_lead_key)
+
+def batch_lines(events, limit=15, fmt=None):
+    # 알림에 적을 줄들. 대표 회차가 맨 앞, 나머지는 우선순위 순. limit 을 넘으면 "외 N개"
+    fmt = fmt or (lambda a: str(a.get("name") or "알람"))
+    ordered = sorted(events, key=_lead_key)
+    lines = [fmt(e.alarm) for e in ordered[:limit]]
+    if len(ordered) > limit:
+        lines.append(f"... 외 {len(ordered) - limit}개")
+    return lines
+
+class FireCoalescer:
+    # add(event) 는 엔진 스레드에서 불린다(기다리지 않음). 묶음의 첫 회차부터 window 초 뒤
+    # on_batch(events, first_at) 를 타이머 스레드에서 부른다. first_at 은 첫 회차를 받은 perf_counter 값
+    def __init__(self, on_batch, window=None):
+        self.on_batch = on_batch
+        self.window = coalesce_window_from_env() if window is None else max(0.0, float(window))
+        self._lock = threading.Lock()
+        self._pending = []
+        self._first_at = None
+        self._timer = None
+        self._closed = False
+        self.batches = 0
+        self.coalesced = 0   # 묶여서 따로 알리지 않은 회차 수
+
+    def add(self, event):
+        now = time.perf_counter()
+        if self.window <= 0:
+            if not self._closed:
+                self._deliver([event], now)
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.append(event)
+            if self._timer is not None:
+                return
+            self._first_at = now
+            self._timer = threading.Timer(self.window, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            events, first_at = self._pending, self._first_at
+            self._pending, self._first_at = [], None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if events:
+            self._deliver(events, first_at)
+
+    def _deliver(self, events, first_at):
+        self.batches += 1
+        self.coalesced += len(events) - 1
+        try:
+            self.on_batch(events, first_at)
+        except Exception:
+            logging.exception("알림 묶음 처리 실패: %d건", len(events))
+
+    def close(self):
+        # 모아 둔 회차는 버린다(종료 중 팝업을 띄우지 않게)
+        with self._lock:
+            self._closed = True
+            self._pending = []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+class AudioChannel:
+    def __init__(self, maxsize=16):
+        self._q = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.played = 0
+        self.dropped = 0
+        self.failed = 0
+        self._thread = threading.Thread(target=self._run, name="alarm-audio", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args):
+        try:
+            self._q.put_nowait((fn, args))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                n = self.dropped
+            if n == 1 or n % 100 == 0:
+                logging.warning("오디오 대기열이 가득 차 소리를 건너뜁니다(누적 %d)", n)
+            return False
+
+    def _run(self):
+        while True:
+            job = self._q.get()
+            if job is _STOP:
+                return
+            fn, args = job
+            try:
+                fn(*args)
+                with self._lock:
+                    self.played += 1
+            except Exception:
+                with self._lock:
+                    self.failed += 1
+                logging.exception("소리 재생 실패")
+
+    def pending(self):
+        return self._q.qsize()
+
+    def shutdown(self, timeout=2.0):
+        # 남은 소리는 버리고 종료
+        try:
+            while True:
+                self._q.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._q.put_nowait(_STOP)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+class FireExecutor:
+    def __init__(self, workers=2, maxsize=256, audio_maxsize=16):
+        self._q = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.audio = AudioChannel(audio_maxsize)
+        # 대기열 지표
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+        self._workers = [threading.Thread(target=self._run, name=f"alarm-fire-{i}", daemon=True)
+                         for i in range(workers)]
+        for t in self._workers:
+            t.start()
+        METRICS.gauge("alarm_fire_queue_depth", "알람 후속 작업 대기열 길이", self._q.qsize)
+        METRICS.gauge("alarm_fire_rejected_total", "대기열이 가득 차 거절한 작업 수", lambda: self.rejected)
+        METRICS.gauge("alarm_audio_dropped_total", "오디오 대기열이 가득 차 건너뛴 소리 수", lambda: self.audio.dropped)
+
+    def submit(self, fn, *args):
+        if self._closed:
+            return False
+        try:
+            self._q.put_nowait((time.monotonic(), fn, args))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+                n = self.rejected
+            if n == 1 or n % 100 == 0:
+                logging.warning("알람 처리 대기열이 가득 찼습니다(거절 누적 %d)", n)
+            return False
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._q.qsize())
+        return True
+
+    def _run(self):
+        while True:
+            job = self._q.get()
+            if job is _STOP:
+                return
+            queued_at, fn, args = job
+            wait = time.monotonic() - queued_at
+            try:
+                fn(*args)
+                ok = True
+            except Exception:
+                ok = False
+                logging.exception("알람 처리 실패")
+            with self._lock:
+                self.total_wait += wait
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+
+    def stats(self):
+        with self._lock:
+            done = self.completed + self.failed
+            return {
+                "submitted": self.submitted, "completed": self.completed, "failed": self.failed,
+                "rejected": self.rejected, "queue_depth": self._q.qsize(), "max_depth": self.max_depth,
+                "avg_wait_s": self.total_wait / done if done else 0.0,
+                "audio_pending": self.audio.pending(), "audio_played": self.audio.played,
+                "audio_dropped": self.audio.dropped, "audio_failed": self.audio.failed,
+            }
+
+    def shutdown(self, timeout=2.0):
+        # 새 작업은 받지 않고, 대기 중인 작업을 마친 뒤 작업 스레드를 끝낸다
+        self._closed = True
+        deadline = time.monotonic() + timeout
+        for _ in self._workers:
+            try:
+                self._q.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for t in self._workers:
+            t.join(max(0.0, deadline - time.monotonic()))
+        self.audio.shutdown(max(0.0, deadline - time.monotonic()))
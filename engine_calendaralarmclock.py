@@ -0,0 +1,541 @@
+import os
+import sys
+import signal
+import asyncio
+import logging
+import threading
+from collections import namedtuple
+
+from core_calendaralarmclock import DeadlineScheduler, SYSTEM_CLOCK, alarm_key, catchup_from_env, parse_time_token
+from store_calendaralarmclock import open_store, StoreWatcher
+from holiday_calendaralarmclock import CALENDARS
+from logCalendarAlarmClock import open_history, FIRE
+from shard_calendaralarmclock import ShardedScheduler, shards_from_env
+from metrics_calendaralarmclock import METRICS, configure_from_env, loop_profiler
+from leader_calendaralarmclock import LeaderLock, elect_from_env, lock_path
+
+# 헤드리스 알람 엔진 (GUI 의존성 없음)
+# - asyncio 이벤트 루프 하나에서 스케줄러(DeadlineScheduler.pop_due)를 돌리고 저장소 변경을 처리한다
+# - add/remove/toggle/subscribe 는 코루틴. 다른 스레드(Tk/Kivy)에서는 engine.call(engine.add(...)) 처럼 부른다
+# - 알람이 울리면 FireEvent 를 구독자(콜백 또는 asyncio.Queue)에 전달한다. 콜백은 엔진 루프 스레드에서 호출된다
+# - 목록이 바뀌면(added/removed/toggled/fired/reloaded) ChangeEvent 를 changes=True 구독자에게 전달한다
+# - engine.alarms 는 저장소의 현재 스냅샷(AlarmSnapshot, 읽기 전용). 어느 스레드에서나 잠금/복사 없이 읽는다.
+#   ChangeEvent.version 은 그 변경이 반영된 스냅샷 버전 -> 받는 쪽은 버전이 이어지면 변경분만 반영하고,
+#   건너뛴 버전이 있으면(큐가 넘쳐 버려진 경우 등) 스냅샷 전체로 다시 그린다
+# - 다른 프로세스가 저장 파일을 바꾸면 StoreWatcher 가 알려 1초 안에 다시 읽는다(CALENDARALARM_WATCH=0 이면 끔)
+# - 휴일 달력 파일(holidays.json)은 루프가 깰 때마다(최대 MAX_WAIT 초) 바뀌었는지 보고 다음 울림 시각을 다시 계산한다
+# - 울린 회차는 저장 파일 옆 링 버퍼(logCalendarAlarmClock.FireHistory)에도 남는다. 다시 알림/끄기는 record() 로
+# - api(또는 CALENDARALARM_API)를 주면 같은 루프에서 로컬 HTTP/JSON API 를 띄운다(api_calendaralarmclock)
+# - shards(또는 CALENDARALARM_SHARDS)를 주면 스케줄 계산을 작업 프로세스들로 나눈다(ShardedScheduler)
+# - 같은 저장 파일을 여는 인스턴스가 여럿이면 잠금을 잡은 하나(리더)만 알람을 울리고 저장한다(leader_calendaralarmclock).
+#   나머지(팔로워)는 읽기 전용: 변경 코루틴은 ReadOnlyError, 리더가 쓴 변경은 저널에 붙은 줄만 읽어 반영한다.
+#   리더가 끝나면 1초 안에 팔로워 하나가 넘겨받아 놓친 회차를 소급하고 울리기 시작한다(elect=False 면 선출 안 함)
+# - clock 으로 시각 출처를 바꿀 수 있다(core.VirtualClock: 시험/시뮬레이션). 분산 스케줄러와는 함께 쓸 수 없다
+# - 단독 실행: python -m engine_calendaralarmclock serve
+
+FireEvent = namedtuple("FireEvent", "alarm scheduled fired_at")
+
+class ReadOnlyError(RuntimeError):
+    # 팔로워 인스턴스에서 알람을 바꾸려 함(리더 인스턴스에서 바꿔야 한다)
+    pass
+
+class BatchError(ValueError):
+    # apply_batch 의 잘못된 항목(index 번째). 이 경우 묶음 전체를 반영하지 않는다
+    def __init__(self, index, message):
+        super().__init__(f"{index}번 항목: {message}")
+        self.index = index
+# kind: added / removed / toggled / fired / reloaded (reloaded 는 alarm_id, alarm 이 None)
+# version: 변경 후 저장소 스냅샷 버전(같은 틱에 울린 회차들처럼 한 번에 기록된 변경은 같은 버전)
+ChangeEvent = namedtuple("ChangeEvent", "kind alarm_id alarm version", defaults=(None,))
+# 다른 인스턴스가 쓴 변경을 받을 때 이보다 많으면 알람별 이벤트 대신 reloaded 하나로
+REMOTE_EVENTS = 64
+REMOTE_KINDS = {"add": "added", "delete": "removed", "toggle": "toggled", "fired": "fired"}
+
+TICK = METRICS.histogram("alarm_tick_seconds", "스케줄러 한 바퀴(pop_due + 발생 처리) 소요 시간")
+FIRE_LAG = METRICS.histogram("alarm_fire_lag_seconds", "예정 시각 대비 실제 발생 지연")
+FIRED = METRICS.counter("alarm_fired_total", "울린 알람 회차 수")
+SKIPPED = METRICS.counter("alarm_skipped_total", "소급 범위를 넘겨 회차를 건너뛴 횟수")
+DROPPED = METRICS.counter("alarm_subscriber_dropped_total", "구독 큐가 가득 차 버린 이벤트 수")
+
+class AlarmEngine:
+    QUEUE_SIZE = 256  # 큐 구독자당 대기 이벤트 상한(넘치면 버리고 집계)
+
+    def __init__(self, store, catchup=None, shards=None, api=None, clock=None, elect=None):
+        self.store = store
+        self.elect = elect_from_env() if elect is None else elect
+        self.leader_lock = None
+        self.is_leader = True   # 선출 전/선출하지 않으면 리더
+        catchup = catchup_from_env() if catchup is None else catchup
+        shards = shards_from_env() if shards is None else shards
+        if shards and clock is not None:
+            raise ValueError("clock 은 분산 스케줄러(shards)와 함께 쓸 수 없습니다")
+        self.clock = clock or SYSTEM_CLOCK
+        self.sharded = bool(shards)
+        self.scheduler = ShardedScheduler(shards, catchup) if shards else DeadlineScheduler(catchup=catchup, clock=self.clock)
+        self.loop = None
+        self._thread = None
+        self._wake = None
+        self._stopped = None
+        self._callbacks = {"fire": [], "change": []}
+        self._queues = {"fire": [], "change": []}
+        self.fired = 0
+        self.dropped = 0
+        self.profiler = loop_profiler()  # CALENDARALARM_PROFILE 지정 시에만
+        self.watch = os.environ.get("CALENDARALARM_WATCH", "1").strip().lower() not in ("0", "false", "no", "off")
+        self.watcher = None
+        self.history = None
+        # 로컬 HTTP/JSON API 주소("127.0.0.1:8765", "8765", "unix:/경로"). 없으면 띄우지 않는다
+        self.api = os.environ.get("CALENDARALARM_API") if api is None else api
+        self.api_server = None
+
+    # --- 실행 ---
+    async def serve_forever(self, ready=None):
+        # 엔진 루프 본체. start() 는 이것을 별도 스레드에서 돌린다
+        configure_from_env()
+        self.loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopped = asyncio.Event()
+        self.store.ensure()
+        if self.elect and getattr(self.store, "path", None):
+            self.leader_lock = LeaderLock(lock_path(self.store.path))
+            self.is_leader = self.leader_lock.try_acquire()
+            if not self.is_leader:
+                owner = self.leader_lock.owner() or {}
+                logging.info("다른 인스턴스(pid %s)가 알람을 담당합니다 - 읽기 전용으로 시작", owner.get("pid", "?"))
+                self.leader_lock.wait(lambda: asyncio.run_coroutine_threadsafe(self._promote(), self.loop))
+        # 작업 프로세스만 달력을 쓰더라도 변경 감지는 여기서 하므로 미리 읽어 둔다
+        CALENDARS.load()
+        if getattr(self.store, "path", None):
+            self.history = open_history(self.store.path)
+        if self.sharded:
+            # 팔로워는 작업 프로세스가 보내오는 회차를 모으지 않는다(넘겨받은 뒤 다시 울리지 않게)
+            self.scheduler.collect = self.is_leader
+            # 작업 프로세스가 울릴 회차를 보내오면 루프를 깨운다
+            self.scheduler.start(lambda: self.loop.call_soon_threadsafe(self._wake.set))
+        # 꺼져 있던 동안 놓친 회차도 소급 범위 안이면 울린다
+        self.scheduler.reset(self.store.load(), catch_up=True)
+        logging.info("알람 엔진 시작: 알람 %d개, 다음 울림 %s", len(self.alarms), self.next_deadline() or "-")
+        task = asyncio.ensure_future(self._run())
+        # 팔로워는 리더가 쓴 변경을 받아야 하므로 항상 감시한다
+        if self.watch or not self.is_leader:
+            self.watcher = StoreWatcher(self.store, self._on_disk_change).start()
+        if self.api:
+            from api_calendaralarmclock import ApiServer
+            try:
+                self.api_server = await ApiServer(self, self.api).start()
+            except (OSError, ValueError):
+                logging.exception("API 서버를 띄우지 못했습니다: %s", self.api)
+        if ready is not None:
+            ready.set()
+        try:
+            await self._stopped.wait()
+        finally:
+            if self.api_server is not None:
+                await self.api_server.close()
+                self.api_server = None
+            if self.watcher is not None:
+                self.watcher.stop()
+                self.watcher = None
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            if self.sharded:
+                self.scheduler.stop()
+            if self.profiler is not None:
+                self.profiler.dump()
+            if self.history is not None:
+                self.history.close()
+            if self.leader_lock is not None:
+                self.leader_lock.release()
+                self.leader_lock = None
+            METRICS.flush()
+
+    def start(self):
+        # GUI 앱용: 엔진 루프를 데몬 스레드에서 시작하고 준비될 때까지 기다린다
+        ready = threading.Event()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.serve_forever(ready)),
+                                        name="alarm-engine", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self, timeout=2.0):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._stopped.set)
+        except RuntimeError:
+            return
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def call(self, coro, timeout=10.0):
+        # 다른 스레드에서 엔진 코루틴을 실행하고 결과를 기다린다
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def record(self, alarm_id, scheduled, outcome):
+        # 다시 알림/끄기 등 사용자 반응 기록(어느 스레드에서나). 링 버퍼 쓰기 한 번이라 바로 반환한다
+        if self.history is not None:
+            self.history.append(alarm_id, scheduled, outcome)
+
+    def _on_disk_change(self):
+        # 감시 스레드에서 호출 -> 엔진 루프에서 reload()
+        try:
+            asyncio.run_coroutine_threadsafe(self.reload(), self.loop)
+        except RuntimeError:
+            pass
+
+    def _tick(self):
+        sched = self.scheduler
+        skipped = sched.skipped
+        due = sched.pop_due(self.clock.now())
+        if due:
+            self._fire_many(due)
+        if sched.skipped != skipped:
+            SKIPPED.inc(sched.skipped - skipped)
+
+    async def _run(self):
+        sched = self.scheduler
+        prof = self.profiler
+        while True:
+            # 팔로워는 울리지 않는다(리더가 울리고 기록한 것을 reload 로 받는다)
+            if self.is_leader:
+                with TICK.time():
+                    if prof is not None:
+                        with prof:
+                            self._tick()
+                    else:
+                        self._tick()
+            if CALENDARS.changed_on_disk():
+                await self.reload()
+            timeout = sched.MAX_WAIT
+            # 분산 스케줄러는 회차가 도착할 때 깨워 주므로 기다릴 시각을 따로 계산하지 않는다.
+            # 팔로워는 울리지 않으므로 예정 시각에 깨지 않는다(지난 예정 시각에 맞추면 계속 돈다).
+            # next_deadline 은 지난 힙 항목 정리를 겸하므로 팔로워도 부른다
+            nxt = None if self.sharded else sched.next_deadline()
+            if nxt is not None and self.is_leader:
+                timeout = max(0.0, min(timeout, (nxt - self.clock.now()).total_seconds()))
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire_many(self, due):
+        # 한 틱에 울린 회차들. 울림 기록은 저장 한 번(새 스냅샷 하나), 이벤트는 회차마다
+        fired = [(alarm["id"], scheduled.strftime("%Y-%m-%d %H:%M:%S")) for alarm, scheduled in due]
+        try:
+            self.store.mark_fired_many(fired)
+        except Exception:
+            logging.exception("울림 기록 저장 실패: %d건", len(fired))
+        version = self.store.version
+        # 알람 dict 는 고치지 않는다. 저장소가 만든 새 dict(last_triggered 반영)로 스케줄러 쪽도 바꿔 끼운다
+        alarms = [self.store.get(alarm["id"]) or alarm for alarm, _ in due]
+        self.scheduler.rebind(alarms)
+        for alarm, (_, scheduled) in zip(alarms, due):
+            self.fired += 1
+            event = FireEvent(alarm, scheduled, self.clock.now())
+            if self.history is not None:
+                self.history.append(alarm["id"], scheduled, FIRE, event.fired_at)
+            FIRED.inc()
+            FIRE_LAG.observe((event.fired_at - scheduled).total_seconds())
+            self._publish(event)
+            self._publish(ChangeEvent("fired", alarm["id"], alarm, version), "change")
+
+    def _publish(self, event, channel="fire"):
+        for cb in list(self._callbacks[channel]):
+            try:
+                cb(event)
+            except Exception:
+                logging.exception("알람 구독 콜백 오류")
+        for q in list(self._queues[channel]):
+            try:
+                q.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                DROPPED.inc()
+                if self.dropped == 1 or self.dropped % 100 == 0:
+                    logging.warning("구독 큐가 가득 차 알람 이벤트를 버립니다(누적 %d)", self.dropped)
+
+    async def _promote(self):
+        # 리더가 끝나 잠금을 넘겨받음(잠금 대기 스레드 -> 엔진 루프). 남은 변경을 반영하고
+        # 리더가 없던 동안 놓친 회차는 소급 범위 안이면 울린다
+        self.store.take_over()
+        self.is_leader = True
+        if self.sharded:
+            # 팔로워였던 동안의 회차는 버리고, 작업 프로세스들도 넘겨받은 목록(울림 기록 포함)으로 다시 잡는다
+            self.scheduler.clear_due()
+            self.scheduler.collect = True
+        self.scheduler.reset(self.store.snapshot(), catch_up=True)
+        self._wake.set()
+        logging.info("알람 담당 인스턴스가 되었습니다: 알람 %d개, 다음 울림 %s", len(self.alarms), self.next_deadline() or "-")
+        self._publish(ChangeEvent("reloaded", None, None, self.store.version), "change")
+
+    def _check_writable(self):
+        if not self.is_leader:
+            raise ReadOnlyError("다른 인스턴스가 알람을 담당하고 있어 읽기 전용입니다")
+
+    def _remote_changed(self, recs):
+        # 다른 인스턴스가 쓴 기록(store.refresh 결과) 반영: 바뀐 알람만 다시 스케줄하고 알람별 변경 이벤트로 알린다
+        if len(recs) > REMOTE_EVENTS or any(rec.get("op") not in REMOTE_KINDS for rec in recs):
+            ids = set()
+            for rec in recs:
+                ids.update(rec.get("ids") or (rec["alarm"].get("id") if rec.get("op") == "add" else rec.get("id"),))
+            current = {i: self.store.get(i) for i in ids}
+            self._bulk_changed([a for a in current.values() if a is not None],
+                               [i for i, a in current.items() if a is None])
+            return
+        version = self.store.version
+        for rec in recs:
+            aid = rec["alarm"].get("id") if rec.get("op") == "add" else rec.get("id")
+            alarm = self.store.get(aid)
+            if alarm is None:
+                self.scheduler.remove(aid)
+                self._publish(ChangeEvent("removed", aid, None, version), "change")
+            else:
+                self.scheduler.update(alarm)
+                self._publish(ChangeEvent(REMOTE_KINDS[rec["op"]], aid, alarm, version), "change")
+        self._wake.set()
+
+    def _changed(self, kind, alarm_id, alarm=None):
+        if kind == "removed":
+            self.scheduler.remove(alarm_id)
+        else:
+            self.scheduler.update(alarm)
+        self._wake.set()
+        self._publish(ChangeEvent(kind, alarm_id, alarm, self.store.version), "change")
+
+    # --- 공개 코루틴 ---
+    async def add(self, alarm):
+        self._check_writable()
+        alarm_key(alarm)
+        alarm.setdefault("last_triggered", "")
+        self.store.add(alarm)
+        self._changed("added", alarm["id"], alarm)
+        return alarm["id"]
+
+    async def add_many(self, alarms):
+        # 일괄 추가(가져오기). 저장은 한 번, 구독자에게는 reloaded 하나만 알린다
+        self._check_writable()
+        for a in alarms:
+            alarm_key(a)
+            a.setdefault("last_triggered", "")
+        self.store.add_many(alarms)
+        self._bulk_changed(alarms)
+        return len(alarms)
+
+    async def apply_batch(self, ops):
+        # 여러 변경을 한 묶음으로. 모두 검사한 뒤 저장은 한 번(한 트랜잭션), 구독자(화면)에게는 reloaded 하나만 알린다
+        #   {"op": "create", "alarm": {...}}             새 알람(id 없으면 부여)
+        #   {"op": "update", "id": ..., "fields": {...}} 일부 필드만 바꿈
+        #   {"op": "delete", "id": ...}
+        #   {"op": "toggle", "id": ..., "enabled": bool} enabled 가 없으면 뒤집기
+        # 잘못된 항목이 하나라도 있으면 아무것도 바꾸지 않고 BatchError. 항목별 결과 목록을 돌려준다
+        self._check_writable()
+        state = {}   # 이번 묶음에서 바뀐 id -> 알람(삭제면 None)
+        recs, results = [], []
+
+        def current(i, aid):
+            alarm = state[aid] if aid in state else self.store.get(aid)
+            if alarm is None:
+                raise BatchError(i, f"알람이 없습니다: {aid}")
+            return alarm
+
+        for i, op in enumerate(ops):
+            if not isinstance(op, dict):
+                raise BatchError(i, "항목은 객체여야 합니다")
+            kind, aid = op.get("op"), op.get("id")
+            if kind in ("create", "update"):
+                src = op.get("alarm") if kind == "create" else op.get("fields")
+                if not isinstance(src, dict):
+                    raise BatchError(i, "alarm/fields 는 객체여야 합니다")
+                if kind == "create":
+                    alarm = dict(src)
+                    aid = alarm_key(alarm)
+                    if (state[aid] if aid in state else self.store.get(aid)) is not None:
+                        raise BatchError(i, f"이미 있는 id 입니다: {aid}")
+                    alarm.setdefault("last_triggered", "")
+                    alarm.setdefault("enabled", True)
+                else:
+                    alarm = {**current(i, aid), **src, "id": aid}
+                times = alarm.get("times")
+                if not isinstance(times, list) or not all(isinstance(t, str) and parse_time_token(t) for t in times):
+                    raise BatchError(i, "times 는 HH:MM[:SS] 문자열 목록이어야 합니다")
+                alarm["times"] = [parse_time_token(t) for t in times]
+                state[aid] = alarm
+                recs.append({"op": "add", "alarm": alarm})
+            elif kind == "delete":
+                current(i, aid)
+                state[aid] = None
+                recs.append({"op": "delete", "id": aid})
+            elif kind == "toggle":
+                alarm = current(i, aid)
+                enabled = op.get("enabled")
+                enabled = not alarm.get("enabled", True) if enabled is None else bool(enabled)
+                state[aid] = {**alarm, "enabled": enabled}
+                recs.append({"op": "toggle", "id": aid, "enabled": enabled})
+            else:
+                raise BatchError(i, f"알 수 없는 op: {kind!r}")
+            results.append({"op": kind, "id": aid})
+        if not recs:
+            return results
+        self.store.apply_batch(recs)
+        # 저장소가 들고 있는 알람 객체(목록과 공유)로 스케줄
+        self._bulk_changed([self.store.get(aid) or a for aid, a in state.items() if a is not None],
+                           [aid for aid, a in state.items() if a is None])
+        return results
+
+    # --- 태그/일괄 변경 ---
+    async def set_tag_enabled(self, tag, enabled):
+        # 태그가 붙은 알람을 한꺼번에 켜거나 끈다(상태가 바뀌는 것만 한 번에 기록). 바뀐 개수를 돌려준다
+        self._check_writable()
+        ids = self.store.set_enabled_many(self.store.tag_ids(tag), enabled)
+        self._bulk_changed([self.store.get(i) for i in ids])
+        return len(ids)
+
+    async def delete_tag(self, tag):
+        self._check_writable()
+        ids = self.store.delete_many(self.store.tag_ids(tag))
+        self._bulk_changed((), ids)
+        return len(ids)
+
+    async def delete_expired(self, now=None):
+        # 기간(period_end)이 끝난 알람을 한 번에 삭제
+        self._check_writable()
+        ids = self.store.delete_many(self.store.expired_ids(now))
+        self._bulk_changed((), ids)
+        return len(ids)
+
+    async def save_all(self):
+        # 지금 목록 전체를 다시 저장(종료 직전). 엔진 루프에서 돌아 다른 쓰기/압축과 겹치지 않는다
+        self._check_writable()
+        self.store.save_all(self.store.snapshot())
+
+    def _bulk_changed(self, updated, removed=()):
+        # 일괄 변경 반영: 스케줄러에는 묶어서, 구독자에게는 reloaded 하나만
+        if not updated and not removed:
+            return
+        if removed:
+            self.scheduler.remove_many(removed)
+        if updated:
+            self.scheduler.update_many(updated)
+        self._wake.set()
+        self._publish(ChangeEvent("reloaded", None, None, self.store.version), "change")
+
+    async def remove(self, alarm_id):
+        self._check_writable()
+        self.store.delete(alarm_id)
+        self._changed("removed", alarm_id)
+
+    async def toggle(self, alarm_id, enabled=None):
+        # enabled 를 주지 않으면 반대로 뒤집는다. 바뀐 알람(없으면 None)을 돌려준다
+        self._check_writable()
+        alarm = self.get(alarm_id)
+        if alarm is None:
+            return None
+        if enabled is None:
+            enabled = not alarm.get("enabled", True)
+        self.store.set_enabled(alarm_id, enabled)
+        # 저장소가 새 dict 로 바꿔 끼웠으므로 다시 가져온다
+        alarm = self.store.get(alarm_id)
+        self._changed("toggled", alarm_id, alarm)
+        return alarm
+
+    async def reload(self, force=False):
+        # 다른 프로세스가 파일(저장 파일/휴일 달력)을 바꿨을 때만 다시 읽어 스케줄을 맞춘다. 다시 읽었으면 True
+        holidays = CALENDARS.refresh()
+        if not force and not holidays and not self.store.changed_on_disk():
+            return False
+        if force:
+            alarms = self.store.load(force=True)
+        else:
+            # 저널에 새로 붙은 기록만 읽을 수 있으면 그 알람들만 반영한다
+            recs = self.store.refresh()
+            if recs is not None and not holidays:
+                self._remote_changed(recs)
+                return True
+            alarms = self.store.snapshot()
+        # 휴일이 바뀌면 내용이 같은 알람도 다음 울림 시각이 달라진다
+        self.scheduler.reset(alarms, recompile=holidays)
+        self._wake.set()
+        self._publish(ChangeEvent("reloaded", None, None, alarms.version), "change")
+        return True
+
+    async def subscribe(self, callback=None, maxsize=None, changes=False):
+        # callback 을 주면 이벤트마다 호출, 아니면 asyncio.Queue 를 만들어 돌려준다
+        # changes=True 면 울림 대신 목록 변경(ChangeEvent)을 받는다
+        channel = "change" if changes else "fire"
+        if callback is not None:
+            self._callbacks[channel].append(callback)
+            return callback
+        q = asyncio.Queue(maxsize=self.QUEUE_SIZE if maxsize is None else maxsize)
+        self._queues[channel].append(q)
+        return q
+
+    async def unsubscribe(self, handle):
+        for subs in (*self._callbacks.values(), *self._queues.values()):
+            if handle in subs:
+                subs.remove(handle)
+
+    # --- 조회(어느 스레드에서나) ---
+    @property
+    def alarms(self):
+        # 지금 스냅샷. 들고 있는 동안 바뀌지 않으며 변경은 다음 스냅샷에 나온다
+        return self.store.snapshot()
+
+    def get(self, alarm_id):
+        return self.store.snapshot().get(alarm_id)
+
+    def rules_for(self, alarms):
+        return self.scheduler.rules_for(alarms)
+
+    def next_deadline(self):
+        return self.scheduler.next_deadline()
+
+def _log_event(event):
+    a = event.alarm
+    logging.info("알람: %s (%s, 예정 %s)", a.get("name"), a.get("recurrence"), event.scheduled)
+
+async def _serve(engine):
+    loop = asyncio.get_running_loop()
+    # 종료 신호를 받으면 엔진을 멈춘다(Windows 는 add_signal_handler 미지원 -> KeyboardInterrupt 로 종료)
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, engine.stop)
+        except (NotImplementedError, RuntimeError):
+            pass
+    await engine.subscribe(_log_event)
+    await engine.serve_forever()
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(prog="engine_calendaralarmclock", description="캘린더 알람 헤드리스 엔진")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("serve", help="화면 없이 알람 엔진 실행(울리면 로그 출력)")
+    p.add_argument("--store", default=os.environ.get("CALENDARALARM_STORE")
+                   or os.path.join(os.path.dirname(os.path.abspath(__file__)), "alarms.json"),
+                   help="alarms.json / *.db 경로")
+    p.add_argument("--metrics-file", help="메트릭을 Prometheus 텍스트 형식으로 주기 기록할 파일")
+    p.add_argument("--metrics-port", type=int, help="127.0.0.1:포트/metrics 로 메트릭 제공")
+    p.add_argument("--profile", help="스케줄러 루프 cProfile 결과(.prof) 저장 경로")
+    p.add_argument("--shards", type=int, help="스케줄 계산을 나눌 작업 프로세스 수(기본: CALENDARALARM_SHARDS, 없으면 나누지 않음)")
+    p.add_argument("--api", help="로컬 HTTP/JSON API 주소: 포트, 127.0.0.1:포트 또는 unix:/경로 (기본: CALENDARALARM_API)")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    METRICS.configure(textfile=args.metrics_file, port=args.metrics_port)
+    engine = AlarmEngine(open_store(args.store), shards=args.shards, api=args.api)
+    if args.profile:
+        engine.profiler = loop_profiler(args.profile)
+    try:
+        asyncio.run(_serve(engine))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+import logging
+from array import array
+from datetime import datetime, timedelta, date
+
+from core_calendaralarmclock import (compile_alarm, to_seconds, from_seconds, EPOCH_ORD, DAY,
+                                     DAILY, WEEKLY, MONTHLY, YEARLY, INTERVAL, NEVER)
+
+# 기간 질의: "A~B 사이에 어떤 알람이 언제 울리는가"
+# numpy 가 있으면 알람 x 날짜 행렬로 한 번에 계산하고, 없으면 알람별로 다음 날짜를 건너뛰며 계산한다.
+
+# numpy optional
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# numpy 경로에서 한 번에 만드는 (알람 x 날짜) 행렬 크기 상한
+BLOCK_CELLS = 1 << 22
+
+# numpy 경로의 반복 종류별 인자 3칸(안 쓰는 칸은 0)
+_PARAMS = {
+    DAILY: lambda r: (0, 0, 0),
+    WEEKLY: lambda r: (r.wmask, 0, 0),
+    MONTHLY: lambda r: (r.dom, 0, 0),
+    YEARLY: lambda r: (r.month, r.day, 0),
+    INTERVAL: lambda r: (r.interval, r.offmask, -1 if r.start_ord is None else r.start_ord),
+}
+
+def _ceil_seconds(dt):
+    return to_seconds(dt) + (1 if dt.microsecond else 0)
+
+def _bounds(start, end):
+    # [start, end) 에 들어가는 정수 초 범위(양끝 포함)
+    return _ceil_seconds(start), to_seconds(end) - (0 if end.microsecond else 1)
+
+class Occurrences:
+    # expand_occurrences 결과. alarm_index[i] 번째 알람이 seconds[i] 에 울린다 (순서는 보장하지 않음)
+    __slots__ = ("alarms", "start", "end", "alarm_index", "seconds", "day_counts")
+
+    def __init__(self, alarms, start, end, alarm_index, seconds, day_counts):
+        self.alarms = alarms
+        self.start = start
+        self.end = end
+        self.alarm_index = alarm_index
+        self.seconds = seconds
+        self.day_counts = day_counts  # 시작일부터 날짜별로 울리는 알람 개수(같은 알람은 하루 1개로 셈)
+
+    def __len__(self):
+        return len(self.seconds)
+
+    def __iter__(self):
+        # (시각, 알람) 을 시간순으로(같은 시각은 알람 목록 순서대로)
+        if np is not None and isinstance(self.seconds, np.ndarray):
+            order = np.lexsort((self.alarm_index, self.seconds))
+        else:
+            order = sorted(range(len(self.seconds)), key=lambda i: (self.seconds[i], self.alarm_index[i]))
+        for i in order:
+            yield from_seconds(self.seconds[i]), self.alarms[int(self.alarm_index[i])]
+
+    def per_day(self):
+        first = self.start.date()
+        return {first + timedelta(days=i): int(n) for i, n in enumerate(self.day_counts) if n}
+
+def _excluded_days(excl, first, ndays, cache):
+    # 제외 달력 묶음 -> 질의 날짜별 제외 여부(bool 배열). 같은 묶음은 한 번만 만든다
+    days = cache.get(excl)
+    if days is None:
+        days = cache[excl] = np.fromiter((excl.excluded(date.fromordinal(o)) for o in range(first, first + ndays)),
+                                         dtype=bool, count=ndays)
+    return days
+
+def _day_span(start, end):
+    first = start.toordinal()
+    last = (end - timedelta(microseconds=1)).toordinal()
+    return first, max(0, last - first + 1)
+
+def _expand_python(rules, indices, start, end, out_idx, out_sec, counts):
+    first, ndays = _day_span(start, end)
+    lo, hi = _bounds(start, end)
+    for i in indices:
+        rule = rules[i]
+        if rule.kind == NEVER:
+            continue
+        ps = max(lo, _ceil_seconds(rule.start)) if rule.start else lo
+        pe = min(hi, to_seconds(rule.end)) if rule.end else hi
+        if ps > pe:
+            continue
+        d = from_seconds(ps).date()
+        last_day = from_seconds(pe).date()
+        while True:
+            d = rule.next_date(d)
+            if d is None or d > last_day:
+                break
+            if rule.excl is not None and rule.excl.excluded(d):
+                d += timedelta(days=1)
+                continue
+            base = (d.toordinal() - EPOCH_ORD) * DAY
+            hit = False
+            for tod in rule.tods:
+                s = base + tod
+                if ps <= s <= pe:
+                    if out_idx is not None:
+                        out_idx.append(i)
+                        out_sec.append(s)
+                    hit = True
+            if hit:
+                counts[d.toordinal() - first] += 1
+            d += timedelta(days=1)
+
+def _expand_numpy(rules, indices, start, end, out_idx, out_sec, counts):
+    first, ndays = _day_span(start, end)
+    lo, hi = _bounds(start, end)
+    ords = np.arange(first, first + ndays, dtype=np.int64)
+    weekday = (ords - 1) % 7  # 0001-01-01 은 월요일
+    d64 = (ords - EPOCH_ORD).astype("datetime64[D]")
+    m64 = d64.astype("datetime64[M]")
+    month = m64.astype(np.int64) % 12 + 1
+    dom = (d64 - m64.astype("datetime64[D]")).astype(np.int64) + 1
+    # 요일 비트마스크(0~127) x 요일 -> 해당 요일 포함 여부
+    week_table = (np.arange(128)[:, None] >> np.arange(7)[None, :]) & 1 == 1
+
+    # (반복 종류, 시간 개수) 별로 묶으면 시간 목록을 (쌍 x 시간) 행렬로 바로 펼칠 수 있다
+    groups = {}
+    for i in indices:
+        r = rules[i]
+        if r.kind != NEVER:
+            groups.setdefault((r.kind, len(r.tods)), []).append(i)
+    day_base = (ords - EPOCH_ORD) * DAY
+    day_last = day_base + (DAY - 1)
+    excl_days = {}
+    block = max(1, BLOCK_CELLS // max(1, ndays))
+    for (kind, ntod), members in groups.items():
+        for b in range(0, len(members), block):
+            part = members[b:b + block]
+            sel = np.asarray(part, dtype=np.int64)
+            rs = [rules[i] for i in part]
+            # 알람별 값을 한 번에 표로: 유효 구간(초) 2칸 + 반복 인자 3칸 + 시간 ntod 칸
+            table = np.array([(_ceil_seconds(r.start) if r.start and r.start > start else lo,
+                               to_seconds(r.end) if r.end and r.end < end else hi,
+                               *_PARAMS[kind](r), *r.tods) for r in rs], dtype=np.int64)
+            ps, pe, p0, p1, p2 = (table[:, k:k + 1] for k in range(5))
+            if kind == DAILY:
+                mask = np.ones((len(rs), ndays), dtype=bool)
+            elif kind == WEEKLY:
+                mask = week_table[p0[:, 0]][:, weekday]
+            elif kind == MONTHLY:
+                mask = dom[None, :] == p0
+            elif kind == YEARLY:
+                mask = (month[None, :] == p0) & (dom[None, :] == p1)
+            else:
+                # p0 간격, p1 활성일 비트, p2 시작일(없으면 -1: 매일)
+                delta = ords[None, :] - np.where(p2 < 0, first, p2)
+                mask = ((p1 >> (delta % p0)) & 1 == 1) & (delta >= 0)
+                mask[p2[:, 0] < 0] = True
+            for j, r in enumerate(rs):
+                if r.excl is not None:
+                    mask[j] &= ~_excluded_days(r.excl, first, ndays, excl_days)
+            np.maximum(ps, lo, out=ps)
+            np.minimum(pe, hi, out=pe)
+            # 유효 구간 밖의 날은 지우고, 구간 경계에 걸친 날(알람마다 많아야 이틀)만 시각별로 따로 자른다
+            partial = np.flatnonzero((ps > day_base[0]) | (pe < day_last[-1]))
+            if len(partial):
+                pps, ppe = ps[partial], pe[partial]
+                sub = mask[partial] & (day_last[None, :] >= pps) & (day_base[None, :] <= ppe)
+                edge = sub & ((day_base[None, :] < pps) | (day_last[None, :] > ppe))
+                mask[partial] = sub & ~edge
+                erows, ecols = np.nonzero(edge)
+                erows = partial[erows]
+                if len(erows):
+                    secs = day_base[ecols][:, None] + table[erows, 5:]
+                    keep = (secs >= ps[erows]) & (secs <= pe[erows])
+                    counts += np.bincount(ecols[keep.any(axis=1)], minlength=ndays)
+                    if out_idx is not None:
+                        out_idx.append(np.repeat(sel[erows], ntod)[keep.ravel()])
+                        out_sec.append(secs[keep])
+            # 나머지 날은 그날 시각이 모두 구간 안: 개수는 열 합계, 시각은 (알람, 날짜) 쌍에 시간 열을 하나씩 더한다
+            counts += np.count_nonzero(mask, axis=0)
+            if out_idx is None:
+                continue
+            # 모든 날 울리는 알람은 쌍을 찾을 필요 없이 (알람 x 날짜) 행렬을 그대로 편다
+            full = mask.all(axis=1)
+            if full.any():
+                dense = table[full]
+                idx = np.repeat(sel[full], ndays)
+                for k in range(ntod):
+                    out_idx.append(idx)
+                    out_sec.append((day_base[None, :] + dense[:, 5 + k:6 + k]).ravel())
+                mask[full] = False
+            rows, cols = np.nonzero(mask)
+            if not len(rows):
+                continue
+            idx, base = sel[rows], day_base[cols]
+            for k in range(ntod):
+                out_idx.append(idx)
+                out_sec.append(base + table[:, 5 + k][rows])
+
+def expand_occurrences(alarms, start, end, rules=None, instants=True):
+    # [start, end) 사이 모든 알람 발생 시각. rules 를 넘기면(스케줄러 캐시 등) 다시 컴파일하지 않는다.
+    # rules 는 규칙 목록 또는 알람 목록 -> 규칙 목록 함수(DeadlineScheduler.rules_for 등).
+    # instants=False 면 날짜별 개수(day_counts)만 계산하고 시각 배열은 비워 둔다
+    if rules is None:
+        rules = [compile_alarm(a) for a in alarms]
+    elif callable(rules):
+        rules = rules(alarms)
+    if end <= start:
+        return Occurrences(alarms, start, end, array("q"), array("q"), [])
+    _, ndays = _day_span(start, end)
+    if np is None:
+        idx, secs, counts = array("q"), array("q"), [0] * ndays
+        _expand_python(rules, range(len(rules)), start, end, idx if instants else None, secs, counts)
+        return Occurrences(alarms, start, end, idx, secs, counts)
+    # 64칸을 넘는 간격 비트마스크는 int64에 담기지 않아 파이썬 경로로 처리
+    wide = [i for i, r in enumerate(rules) if r.kind == INTERVAL and r.interval > 62]
+    wide_set = set(wide)
+    narrow = [i for i in range(len(rules)) if i not in wide_set] if wide else range(len(rules))
+    idx_parts, sec_parts = [], []
+    counts = np.zeros(ndays, dtype=np.int64)
+    _expand_numpy(rules, narrow, start, end, idx_parts if instants else None, sec_parts, counts)
+    if wide:
+        idx, secs, extra = array("q"), array("q"), [0] * ndays
+        _expand_python(rules, wide, start, end, idx if instants else None, secs, extra)
+        idx_parts.append(np.frombuffer(idx, dtype=np.int64))
+        sec_parts.append(np.frombuffer(secs, dtype=np.int64))
+        counts += np.asarray(extra, dtype=np.int64)
+    if idx_parts:
+        idx_all, sec_all = np.concatenate(idx_parts), np.concatenate(sec_parts)
+    else:
+        idx_all, sec_all = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return Occurrences(alarms, start, end, idx_all, sec_all, counts)
+
+def month_day_counts(alarms, year, month, rules=None):
+    # 달력 표시용: {일(day): 그날 울리는 알람 수}
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    try:
+        occ = expand_occurrences(alarms, start, end, rules, instants=False)
+    except Exception:
+        logging.exception("알람 발생일 계산 실패")
+        return {}
+    return {d.day: n for d, n in occ.per_day().items()}
+
+def _month_bounds(year, month):
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+class MonthCountCache:
+    # 달력용 달별 {일: 알람 수} 캐시.
+    # 알람 하나가 바뀌면 캐시된 달마다 그 알람의 이전/이후 규칙 몫만 빼고 더한다(해당 없는 달은 그대로).
+    # 툴팁용 날짜별 알람 목록은 마우스를 올릴 때 계산해 같은 달 항목에 둔다.
+    MAX_MONTHS = 24
+
+    def __init__(self, rules_for=None):
+        self.rules_for = rules_for   # 알람 목록 -> 규칙 목록(스케줄러 캐시 재사용), 없으면 직접 컴파일
+        self._months = {}            # (년, 월) -> {"counts": {일: n}, "days": {일: [줄, ...]}}
+        self._rules = {}             # id -> 캐시에 반영된 규칙
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self._months.clear()
+        self._rules.clear()
+
+    def _rules_list(self, alarms):
+        if not self._rules:
+            rules = self.rules_for(alarms) if self.rules_for else [compile_alarm(a) for a in alarms]
+            self._rules = {a.get("id"): r for a, r in zip(alarms, rules)}
+            return rules
+        out = []
+        for a in alarms:
+            r = self._rules.get(a.get("id"))
+            if r is None:
+                r = self._rules[a.get("id")] = compile_alarm(a)
+            out.append(r)
+        return out
+
+    def get(self, alarms, year, month):
+        key = (year, month)
+        entry = self._months.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            start, end = _month_bounds(year, month)
+            try:
+                occ = expand_occurrences(alarms, start, end, self._rules_list(alarms), instants=False)
+                counts = {d.day: n for d, n in occ.per_day().items()}
+            except Exception:
+                logging.exception("알람 발생일 계산 실패")
+                counts = {}
+            entry = {"counts": counts, "days": {}}
+            while len(self._months) >= self.MAX_MONTHS:
+                self._months.pop(next(iter(self._months)))
+        else:
+            self.hits += 1
+        self._months[key] = entry  # 최근 사용 순서 유지
+        return entry["counts"]
+
+    def day_alarms(self, alarms, year, month, day, limit=15):
+        # 그날 울리는 알람을 시간순으로 "HH:MM 제목" 줄 목록으로
+        entry = self._months.get((year, month))
+        if entry is not None and day in entry["days"]:
+            return entry["days"][day]
+        start = datetime(year, month, day)
+        rules = self._rules_list(alarms)
+        lines, seen = [], 0
+        for t, a in expand_occurrences(alarms, start, start + timedelta(days=1), rules):
+            seen += 1
+            if len(lines) < limit:
+                lines.append(f"{t:%H:%M} {a.get('name', '(이름없음)')}")
+        if seen > limit:
+            lines.append(f"... 외 {seen - limit}건")
+        if entry is not None:
+            entry["days"][day] = lines
+        return lines
+
+    def apply(self, kind, alarm_id, alarm=None):
+        # 엔진 변경 이벤트 반영. 개수가 바뀐 (년, 월) 목록을 돌려준다(reloaded 는 캐시를 비우기만 함)
+        if kind == "reloaded":
+            self.clear()
+            return []
+        if kind == "fired" or alarm_id is None:
+            return []
+        old = self._rules.get(alarm_id)
+        new = compile_alarm(alarm) if kind != "removed" and alarm is not None else None
+        if new is None:
+            self._rules.pop(alarm_id, None)
+        else:
+            # 캐시가 비어 있어도 저장한다(_rules_list 는 없는 규칙만 새로 컴파일)
+            self._rules[alarm_id] = new
+        changed = []
+        for (year, month), entry in self._months.items():
+            start, end = _month_bounds(year, month)
+            delta = {}
+            for rule, sign in ((old, -1), (new, 1)):
+                if rule is None or rule.kind == NEVER:
+                    continue
+                occ = expand_occurrences([alarm or {}], start, end, [rule], instants=False)
+                for d, n in occ.per_day().items():
+                    delta[d.day] = delta.get(d.day, 0) + sign * n
+            delta = {d: n for d, n in delta.items() if n}
+            if not delta:
+                continue
+            counts = entry["counts"]
+            for d, n in delta.items():
+                counts[d] = counts.get(d, 0) + n
+                if counts[d] <= 0:
+                    del counts[d]
+                entry["days"].pop(d, None)
+            changed.append((year, month))
+        return changed
@@ -0,0 +1,207 @@
+import os
+import json
+import logging
+import threading
+from datetime import date
+
+# 휴일/제외 달력: 이름 붙은 날짜 모음. 알람의 exclude_calendars 에 이름을 적으면 그날은 울리지 않는다
+# - 파일(기본: 이 폴더의 holidays.json, CALENDARALARM_HOLIDAYS 로 변경)에서 읽는다
+#     {"공휴일": {"title": "대한민국 공휴일",
+#                 "yearly": ["01-01", "03-01", "05-05", "06-06", "08-15", "10-03", "10-09", "12-25"],
+#                 "dates": ["2026-02-16~2026-02-18", "2026-05-24", "2026-09-24~2026-09-26"]},
+#      "휴가": ["2026-08-03~2026-08-07"]}
+#   yearly 는 매년 같은 날(MM-DD), dates 는 하루(YYYY-MM-DD) 또는 기간(시작~끝, 양끝 포함)
+# - 달력마다 연도별로 366비트 정수(1월 1일 = 0번 비트)로 컴파일해 두고,
+#   알람이 참조하는 달력 묶음(Exclusion)은 그 합집합 비트열을 연도별로 캐시한다 -> 틱마다 비트 하나만 본다
+# - 같은 달력 묶음은 한 Exclusion 객체를 같이 쓴다. 파일을 다시 읽으면 객체는 그대로 두고 캐시만 비운다
+
+HOLIDAY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "holidays.json")
+
+def _parse_date(text):
+    return date.fromisoformat(text.strip())
+
+class ExclusionCalendar:
+    def __init__(self, name, title=None):
+        self.name = name
+        self.title = title or name
+        self.yearly = frozenset()   # (월, 일)
+        self.ranges = ()            # (시작 ordinal, 끝 ordinal) 양끝 포함
+        self._years = {}            # 연도 -> 비트열
+
+    def set(self, spec):
+        # spec: {"title", "yearly", "dates"} 또는 날짜 목록. 잘못된 항목은 경고하고 건너뛴다
+        if isinstance(spec, list):
+            spec = {"dates": spec}
+        if not isinstance(spec, dict):
+            raise ValueError(f"달력 형식이 잘못되었습니다: {self.name}")
+        yearly, ranges = set(), []
+        for tok in spec.get("yearly") or []:
+            try:
+                m, d = (int(x) for x in str(tok).split("-"))
+                date(2000, m, d)  # 윤년 기준으로 존재하는 날짜인지
+            except ValueError:
+                logging.warning("휴일 달력 %s: 매년 날짜가 잘못되었습니다: %r", self.name, tok)
+                continue
+            yearly.add((m, d))
+        for tok in spec.get("dates") or []:
+            try:
+                first, _, last = str(tok).partition("~")
+                a = _parse_date(first).toordinal()
+                b = _parse_date(last).toordinal() if last else a
+            except ValueError:
+                logging.warning("휴일 달력 %s: 날짜가 잘못되었습니다: %r", self.name, tok)
+                continue
+            ranges.append((min(a, b), max(a, b)))
+        self.title = spec.get("title") or self.name
+        self.yearly = frozenset(yearly)
+        self.ranges = tuple(sorted(ranges))
+        self._years = {}
+
+    def clear(self):
+        self.yearly, self.ranges, self._years = frozenset(), (), {}
+
+    def year_bits(self, year):
+        bits = self._years.get(year)
+        if bits is None:
+            bits = 0
+            jan1 = date(year, 1, 1).toordinal()
+            dec31 = date(year, 12, 31).toordinal()
+            for m, d in self.yearly:
+                try:
+                    bits |= 1 << (date(year, m, d).toordinal() - jan1)
+                except ValueError:  # 평년의 2/29
+                    pass
+            for a, b in self.ranges:
+                a, b = max(a, jan1), min(b, dec31)
+                if a <= b:
+                    bits |= ((1 << (b - a + 1)) - 1) << (a - jan1)
+            self._years[year] = bits
+        return bits
+
+class Exclusion:
+    # 달력 여러 개의 합집합. excluded(d) 는 연도 캐시를 찾은 뒤 비트 하나만 검사한다
+    __slots__ = ("calendars", "_years")
+
+    def __init__(self, calendars):
+        self.calendars = tuple(calendars)
+        self._years = {}  # 연도 -> (1월 1일 ordinal, 비트열)
+
+    def year(self, year):
+        ent = self._years.get(year)
+        if ent is None:
+            bits = 0
+            for cal in self.calendars:
+                bits |= cal.year_bits(year)
+            ent = self._years[year] = (date(year, 1, 1).toordinal(), bits)
+        return ent
+
+    def excluded(self, d):
+        ent = self._years.get(d.year) or self.year(d.year)
+        return ent[1] >> (d.toordinal() - ent[0]) & 1 == 1
+
+    def clear(self):
+        self._years = {}
+
+class CalendarRegistry:
+    # 이름 -> ExclusionCalendar. 처음 필요할 때 파일을 읽는다.
+    # 파일에 없는 이름도 빈 달력으로 만들어 두었다가, 나중에 파일에 생기면 그대로 채운다
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("CALENDARALARM_HOLIDAYS") or HOLIDAY_FILE
+        self._lock = threading.RLock()
+        self._calendars = {}
+        self._exclusions = {}  # 정렬된 이름 묶음 -> Exclusion
+        self._loaded = False
+        self._sig = None
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def load(self):
+        with self._lock:
+            sig = self._signature()
+            data = {}
+            if sig is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                    if not isinstance(data, dict):
+                        raise ValueError("최상위는 {이름: 달력} 이어야 합니다")
+                except (OSError, ValueError) as e:
+                    logging.error("휴일 달력 파일을 읽지 못했습니다(%s): %s", self.path, e)
+                    data = {}
+            for name, cal in self._calendars.items():
+                if name not in data:
+                    cal.clear()
+            for name, spec in data.items():
+                cal = self._calendars.get(name) or self._calendars.setdefault(name, ExclusionCalendar(name))
+                try:
+                    cal.set(spec)
+                except ValueError as e:
+                    logging.warning("%s", e)
+                    cal.clear()
+            for ex in self._exclusions.values():
+                ex.clear()
+            self._loaded, self._sig = True, sig
+            return len(data)
+
+    def _ensure(self):
+        if not self._loaded:
+            self.load()
+
+    def changed_on_disk(self):
+        # 한 번도 읽지 않았으면(휴일을 쓰는 알람이 없으면) 확인할 것도 없다
+        return self._loaded and self._signature() != self._sig
+
+    def refresh(self):
+        # 파일이 바뀌었으면 다시 읽고 True. 규칙 객체는 그대로 두므로 다음 울림 시각만 다시 계산하면 된다
+        with self._lock:
+            if not self.changed_on_disk():
+                return False
+            n = self.load()
+        logging.info("휴일 달력 다시 읽음: %d개 (%s)", n, self.path)
+        return True
+
+    def names(self):
+        with self._lock:
+            self._ensure()
+            return sorted(n for n, c in self._calendars.items() if c.yearly or c.ranges)
+
+    def get(self, name):
+        with self._lock:
+            self._ensure()
+            cal = self._calendars.get(name)
+            if cal is None:
+                logging.warning("휴일 달력이 없습니다: %s (%s)", name, self.path)
+                cal = self._calendars[name] = ExclusionCalendar(name)
+            return cal
+
+    def exclusion(self, names):
+        # 알람의 exclude_calendars -> 공유 Exclusion, 이름이 없으면 None
+        if isinstance(names, str):
+            names = [names]
+        key = tuple(sorted({str(n).strip() for n in names or () if str(n).strip()}))
+        if not key:
+            return None
+        with self._lock:
+            ex = self._exclusions.get(key)
+            if ex is None:
+                ex = self._exclusions[key] = Exclusion(self.get(n) for n in key)
+            return ex
+
+    def union(self):
+        # 달력 화면 음영용: 파일에 있는 모든 달력
+        names = self.names()
+        return self.exclusion(names) if names else None
+
+    def titles_on(self, d):
+        with self._lock:
+            self._ensure()
+            cals = list(self._calendars.values())
+        y = d.toordinal() - date(d.year, 1, 1).toordinal()
+        return [c.title for c in cals if c.year_bits(d.year) >> y & 1]
+
+CALENDARS = CalendarRegistry()
@@ -0,0 +1,515 @@
+import os
+import re
+import sys
+import uuid
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from core_calendaralarmclock import compile_alarm, time_spec_seconds
+
+# iCalendar(.ics) 가져오기/내보내기 (GUI 의존성 없음)
+# - 가져오기: 파일을 줄 단위로 읽어 VEVENT 하나씩 알람 dict 로 바꾼다(파일 전체를 메모리에 올리지 않음)
+#   RRULE FREQ/INTERVAL/BYDAY/BYMONTHDAY/BYMONTH/UNTIL/COUNT -> recurrence/weekdays/day_of_month/interval_days/period_end
+#   VALARM TRIGGER(시작 기준 상대 시간)는 알람 시각으로, 없으면 DTSTART 시각에 울린다
+# - 내보내기: 알람 하나 -> VEVENT 하나(시각이 여러 개면 VALARM 여러 개)로 한 줄씩 써 나간다
+#   python -m ical_calendaralarmclock import calendar.ics --store alarms.json
+#   python -m ical_calendaralarmclock export alarms.ics --store alarms.json
+
+BATCH = 1000  # 가져오기 때 한 번에 저장하는 알람 수
+MAX_COUNT = 10000  # RRULE COUNT 끝 시각을 회차별로 따라가는 상한(넘으면 끝 없이 가져온다)
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")  # datetime.weekday() 순서
+PRODID = "-//CalendarAlarmClock//KO"
+X_ENABLED = "X-CALENDARALARM-ENABLED"
+X_MUSIC = "X-CALENDARALARM-MUSIC"
+X_EXCLUDE = "X-CALENDARALARM-EXCLUDE"  # 제외 달력 이름(콤마 구분)
+
+_DURATION = re.compile(r"([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+class Unsupported(ValueError):
+    # 알람 필드로 옮길 수 없는 일정(건너뛰고 이유별로 센다)
+    pass
+
+# --- 읽기 ---
+def unfold(lines):
+    # 접힌 줄(공백/탭으로 시작) 이어 붙이기
+    cur = None
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if cur is not None:
+                cur += line[1:]
+            continue
+        if cur:
+            yield cur
+        cur = line
+    if cur:
+        yield cur
+
+def parse_line(line):
+    # "NAME;PARAM=값;PARAM=\"a:b\":값" -> (NAME, {PARAM: 값}, 값)
+    i = line.find(":")
+    if i >= 0 and '"' not in line[:i]:
+        # 대부분의 줄: 따옴표 없는 매개변수
+        head, value = line[:i], line[i + 1:]
+        if ";" not in head:
+            return head.upper(), {}, value
+        parts = head.split(";")
+        return parts[0].upper(), {k.upper(): v for k, _, v in (p.partition("=") for p in parts[1:])}, value
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"':
+            quoted = not quoted
+        elif ch == ":" and not quoted:
+            head, value = line[:i], line[i + 1:]
+            break
+    else:
+        return line.upper(), {}, ""
+    parts = head.split(";")
+    params = {}
+    for p in parts[1:]:
+        k, _, v = p.partition("=")
+        params[k.upper()] = v.strip('"')
+    return parts[0].upper(), params, value
+
+def unescape(text):
+    if "\\" not in text:
+        return text
+    out, i = [], 0
+    while i < len(text):
+        ch = text[i]
+        if ch == "\\" and i + 1 < len(text):
+            nxt = text[i + 1]
+            out.append("\n" if nxt in "nN" else nxt)
+            i += 2
+            continue
+        out.append(ch)
+        i += 1
+    return "".join(out)
+
+def iter_events(lines):
+    # VEVENT 마다 {"props": {이름: (params, 값)}, "alarms": [{이름: (params, 값)}]} 를 내보낸다.
+    # 같은 속성이 여러 번 나오면 첫 번째만 쓴다. VEVENT 밖(VTIMEZONE 등)은 건너뛴다
+    ev = alarm = None
+    other = 0  # VEVENT 안의 알 수 없는 하위 구성요소 깊이
+    for line in unfold(lines):
+        name, params, value = parse_line(line)
+        if name == "BEGIN":
+            kind = value.strip().upper()
+            if ev is None:
+                if kind == "VEVENT":
+                    ev = {"props": {}, "alarms": []}
+            elif kind == "VALARM" and alarm is None and not other:
+                alarm = {}
+            else:
+                other += 1
+        elif name == "END":
+            if ev is None:
+                continue
+            if other:
+                other -= 1
+            elif alarm is not None:
+                ev["alarms"].append(alarm)
+                alarm = None
+            else:
+                yield ev
+                ev = None
+        elif ev is not None and not other:
+            target = alarm if alarm is not None else ev["props"]
+            target.setdefault(name, (params, value))
+
+def parse_dt(params, value):
+    # DATE / DATE-TIME -> (naive 현지 시각, 종일 여부). Z(UTC)와 TZID 는 현지 시각으로 바꾼다
+    value = value.strip()
+    if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+        return datetime(int(value[0:4]), int(value[4:6]), int(value[6:8])), True
+    utc = value.endswith("Z")
+    if len(value) < 15 or value[8] != "T":
+        raise ValueError(value)
+    dt = datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]),
+                  int(value[9:11]), int(value[11:13]), int(value[13:15]))
+    tz = None
+    if utc:
+        tz = timezone.utc
+    elif params.get("TZID"):
+        try:
+            from zoneinfo import ZoneInfo
+            tz = ZoneInfo(params["TZID"])
+        except Exception:
+            tz = None  # 모르는 시간대는 현지 시각으로 취급
+    if tz is not None:
+        dt = dt.replace(tzinfo=tz).astimezone().replace(tzinfo=None)
+    return dt, False
+
+def parse_duration(value):
+    m = _DURATION.match(value.strip().upper())
+    if not m:
+        raise Unsupported("DURATION 형식")
+    sign, w, d, h, mi, s = m.groups()
+    td = timedelta(weeks=int(w or 0), days=int(d or 0), hours=int(h or 0), minutes=int(mi or 0), seconds=int(s or 0))
+    return -td if sign == "-" else td
+
+def parse_rrule(value):
+    rule = {}
+    for part in value.split(";"):
+        k, _, v = part.partition("=")
+        if k:
+            rule[k.strip().upper()] = v.strip()
+    return rule
+
+def _trigger_offsets(ev, start, all_day):
+    # VALARM TRIGGER -> DTSTART 기준 상대 시간 목록(소리/표시 구분 없이 모두)
+    props = ev["props"]
+    offsets = []
+    for alarm in ev["alarms"]:
+        if "TRIGGER" not in alarm:
+            continue
+        params, value = alarm["TRIGGER"]
+        if params.get("VALUE", "").upper() == "DATE-TIME":
+            try:
+                offsets.append(parse_dt(params, value)[0] - start)
+            except ValueError:
+                raise Unsupported("TRIGGER 형식")
+            continue
+        off = parse_duration(value)
+        if params.get("RELATED", "").upper() == "END":
+            if "DTEND" in props:
+                try:
+                    off += parse_dt(*props["DTEND"])[0] - start
+                except ValueError:
+                    raise Unsupported("DTEND 형식")
+            elif "DURATION" in props:
+                off += parse_duration(props["DURATION"][1])
+        offsets.append(off)
+    if not offsets:
+        # 알림 설정이 없는 종일 일정은 아침 9시에
+        offsets.append(timedelta(hours=9) if all_day else timedelta(0))
+    return offsets
+
+def _shift_weekdays(days, delta):
+    return sorted({(d + delta) % 7 for d in days})
+
+def _rule_fields(rrule, start, delta):
+    # RRULE -> 반복 필드 목록(BYMONTHDAY 가 여러 개면 알람도 여러 개). delta: VALARM 으로 날짜가 밀린 일수
+    freq = rrule.get("FREQ", "").upper()
+    try:
+        n = max(1, int(rrule.get("INTERVAL", "1")))
+    except ValueError:
+        raise Unsupported("INTERVAL 형식")
+    byday = [d.strip().upper() for d in rrule.get("BYDAY", "").split(",") if d.strip()]
+    if freq == "DAILY":
+        if byday:
+            raise Unsupported("DAILY+BYDAY")
+        if n == 1:
+            return [{"recurrence": "daily"}]
+        return [{"recurrence": "interval", "interval_days": n, "interval_offsets": [1]}]
+    if freq == "WEEKLY":
+        if any(d[-2:] not in WEEKDAYS or len(d) != 2 for d in byday):
+            raise Unsupported("WEEKLY BYDAY 형식")
+        days = [WEEKDAYS.index(d) for d in byday] or [start.weekday()]
+        if n == 1:
+            return [{"recurrence": "weekly", "weekdays": _shift_weekdays(days, delta)}]
+        # 격주 이상: 시작일부터 7n 일 주기. 시작 주에서 시작일보다 앞선 요일은 다음 활성 주로 넘어간다
+        # (활성일은 원래 시작일 기준. 시작일도 같은 만큼 밀리므로 delta 는 따로 더하지 않는다)
+        w0 = start.weekday()
+        offs = sorted((d - w0 + 1) if d >= w0 else (7 * n - (w0 - d) + 1) for d in days)
+        return [{"recurrence": "interval", "interval_days": 7 * n, "interval_offsets": offs}]
+    if n != 1:
+        raise Unsupported(f"{freq} INTERVAL>1")
+    if byday:
+        raise Unsupported(f"{freq}+BYDAY")
+    if freq == "MONTHLY":
+        try:
+            doms = [int(x) for x in rrule.get("BYMONTHDAY", "").split(",") if x.strip()] or [start.day]
+        except ValueError:
+            raise Unsupported("BYMONTHDAY 형식")
+        out = []
+        for d in doms:
+            if not 1 <= d + delta <= 31:
+                raise Unsupported("BYMONTHDAY 범위")
+            out.append({"recurrence": "monthly", "day_of_month": d + delta})
+        return out
+    if freq == "YEARLY":
+        try:
+            month = int(rrule.get("BYMONTH") or start.month)
+            day = int(rrule.get("BYMONTHDAY") or start.day)
+            d = datetime(2000, month, day) + timedelta(days=delta)  # 윤년 기준
+        except ValueError:
+            raise Unsupported("YEARLY BYMONTH/BYMONTHDAY 형식")
+        return [{"recurrence": "yearly", "month": d.month, "day": d.day}]
+    raise Unsupported(f"FREQ={freq or '-'}")
+
+def _fmt(dt):
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+def _alarm_id(uid, key, single):
+    # UID 가 UUID 이고 알람 하나로 바뀌면 그대로(내보낸 파일을 다시 가져와도 같은 알람), 아니면 UID 에서 파생
+    if uid and single:
+        try:
+            return str(uuid.UUID(uid))
+        except ValueError:
+            pass
+    if uid:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"ics:{uid}#{key}"))
+    return str(uuid.uuid4())
+
+def event_to_alarms(ev):
+    # VEVENT -> 알람 dict 목록. 옮길 수 없으면 Unsupported
+    props = ev["props"]
+    if "DTSTART" not in props:
+        raise Unsupported("DTSTART 없음")
+    if props.get("STATUS", ({}, ""))[1].strip().upper() == "CANCELLED" and X_ENABLED not in props:
+        raise Unsupported("취소된 일정")
+    try:
+        start, all_day = parse_dt(*props["DTSTART"])
+    except ValueError:
+        raise Unsupported("DTSTART 형식")
+    rrule = parse_rrule(props["RRULE"][1]) if "RRULE" in props else None
+    until = count = None
+    if rrule:
+        if "UNTIL" in rrule:
+            try:
+                until, until_date = parse_dt({}, rrule["UNTIL"])
+            except ValueError:
+                raise Unsupported("UNTIL 형식")
+            if until_date:
+                until += timedelta(days=1, seconds=-1)  # 그날 끝까지
+        if "COUNT" in rrule:
+            try:
+                count = int(rrule["COUNT"])
+            except ValueError:
+                raise Unsupported("COUNT 형식")
+    # 알림 시각을 날짜 이동량별로 묶는다(전날 알림 등은 요일/날짜를 옮긴 별도 알람)
+    groups = {}
+    for off in _trigger_offsets(ev, start, all_day):
+        t = start + off
+        groups.setdefault((t.date() - start.date()).days, []).append((off, t))
+    base = {
+        "name": unescape(props.get("SUMMARY", ({}, ""))[1]).strip() or "알람",
+        "enabled": props.get(X_ENABLED, ({}, "TRUE"))[1].strip().upper() != "FALSE",
+        "last_triggered": "",
+    }
+    if X_MUSIC in props:
+        base["music_file"] = unescape(props[X_MUSIC][1])
+    if X_EXCLUDE in props:
+        names = [unescape(n).strip() for n in re.split(r"(?<!\\),", props[X_EXCLUDE][1])]
+        base["exclude_calendars"] = [n for n in names if n]
+    if "CATEGORIES" in props:
+        # 일정 분류 -> 알람 태그
+        tags = [unescape(n).strip() for n in re.split(r"(?<!\\),", props["CATEGORIES"][1])]
+        base["tags"] = list(dict.fromkeys(t for t in tags if t))
+    uid = props.get("UID", ({}, ""))[1].strip()
+    variants = []
+    for delta, items in sorted(groups.items()):
+        day = datetime.combine((start + timedelta(days=delta)).date(), datetime.min.time())
+        times = sorted({t.strftime("%H:%M:%S") for _, t in items})
+        if rrule is None:
+            # 한 번만: 그날 첫 시각 ~ 마지막 시각
+            first = day + timedelta(seconds=time_spec_seconds(times[0]))
+            last = day + timedelta(seconds=time_spec_seconds(times[-1]))
+            variants.append(({"recurrence": "daily"}, times, first, last))
+            continue
+        end = until + max(off for off, _ in items) if until is not None else None
+        for fields in _rule_fields(rrule, start, delta):
+            variants.append((fields, times, day, end))
+    out = []
+    for key, (fields, times, ps, pe) in enumerate(variants):
+        alarm = dict(base, id=_alarm_id(uid, key, len(variants) == 1), times=times, **fields)
+        alarm["period_start"] = _fmt(ps)
+        if pe is not None:
+            alarm["period_end"] = _fmt(pe)
+        if count is not None and count * len(times) <= MAX_COUNT:
+            # COUNT 번째 발생 시각을 끝으로(너무 크면 수백 년 뒤라 끝 없이 둔다)
+            rule = compile_alarm(dict(alarm, enabled=True))
+            t = ps - timedelta(seconds=1)
+            for _ in range(count * len(times)):
+                nxt = rule.next_fire(t)
+                if nxt is None:
+                    break
+                t = nxt
+            if t >= ps:
+                alarm["period_end"] = _fmt(t)
+        out.append(alarm)
+    return out
+
+def iter_alarms(lines, stats=None):
+    # 줄 -> 알람 dict (건너뛴 일정은 stats["skipped"] 에 이유별로)
+    stats = stats if stats is not None else {}
+    skipped = stats.setdefault("skipped", Counter())
+    for ev in iter_events(lines):
+        stats["events"] = stats.get("events", 0) + 1
+        try:
+            yield from event_to_alarms(ev)
+        except (Unsupported, ValueError, OverflowError) as e:
+            # 일정 하나가 잘못돼도 나머지는 계속 가져온다
+            skipped[str(e) if isinstance(e, Unsupported) else "일정 형식"] += 1
+
+def import_ics(path, add_many, batch=BATCH):
+    # add_many(list) 를 batch 개씩 호출(store.add_many 또는 엔진 경유). 통계 dict 반환
+    stats = {"events": 0, "alarms": 0, "skipped": Counter()}
+    buf = []
+    with open(path, "r", encoding="utf-8-sig", errors="replace", newline="") as f:
+        for alarm in iter_alarms(f, stats):
+            buf.append(alarm)
+            if len(buf) >= batch:
+                add_many(buf)
+                stats["alarms"] += len(buf)
+                buf = []
+    if buf:
+        add_many(buf)
+        stats["alarms"] += len(buf)
+    return stats
+
+# --- 쓰기 ---
+def escape(text):
+    return (text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+def fold(line):
+    # 75 옥텟마다 접기(UTF-8 문자 중간에서 자르지 않는다)
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line + "\r\n"
+    out, chunk, size, limit = [], [], 0, 75
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > limit:
+            out.append("".join(chunk))
+            chunk, size, limit = [], 0, 74  # 다음 줄은 앞의 공백 1바이트 제외
+        chunk.append(ch)
+        size += n
+    out.append("".join(chunk))
+    return "\r\n ".join(out) + "\r\n"
+
+def _ics_dt(dt):
+    return dt.strftime("%Y%m%dT%H%M%S")
+
+def _rrule(alarm):
+    rec = alarm.get("recurrence", "daily")
+    if rec == "daily":
+        parts = ["FREQ=DAILY"]
+    elif rec == "weekly":
+        parts = ["FREQ=WEEKLY", "BYDAY=" + ",".join(WEEKDAYS[d] for d in sorted(set(alarm.get("weekdays") or [])))]
+    elif rec == "monthly":
+        parts = ["FREQ=MONTHLY", f"BYMONTHDAY={alarm['day_of_month']}"]
+    elif rec == "yearly":
+        parts = ["FREQ=YEARLY", f"BYMONTH={alarm['month']}", f"BYMONTHDAY={alarm['day']}"]
+    else:
+        parts = ["FREQ=DAILY", f"INTERVAL={max(1, int(alarm.get('interval_days', 1)))}"]
+    pe = alarm.get("period_end")
+    if pe:
+        parts.append("UNTIL=" + _ics_dt(datetime.fromisoformat(pe)))
+    return ";".join(parts)
+
+def alarm_to_events(alarm, stamp):
+    # 알람 -> VEVENT 줄 목록(간격 반복의 활성일이 여러 개면 활성일마다 VEVENT 하나)
+    probe = dict(alarm, enabled=True)
+    times = sorted({s for s in map(time_spec_seconds, alarm.get("times", [])) if s is not None})
+    if not times:
+        raise Unsupported("시각 없음")
+    if probe.get("recurrence") == "interval" and not (alarm.get("period_start") or alarm.get("start_date")):
+        # 기준일 없는 간격 반복은 매일 울린다(compile_alarm 과 같게)
+        variants = [dict(probe, recurrence="daily")]
+    elif probe.get("recurrence") == "interval":
+        # 간격 밖 활성일은 스케줄러가 울리지 않으므로 버린다(compile_alarm 과 같게)
+        interval = max(1, int(alarm.get("interval_days", 1)))
+        offsets = sorted({x for x in map(int, alarm.get("interval_offsets") or [1]) if 1 <= x <= interval})
+        if not offsets:
+            raise Unsupported("울릴 일 없음")
+        # 활성일마다 시작일을 옮겨 INTERVAL 만 남긴다
+        variants = [dict(probe, interval_offsets=[1], period_start=_fmt(
+            datetime.fromisoformat(alarm.get("period_start") or alarm["start_date"]).replace(hour=0, minute=0, second=0)
+            + timedelta(days=x - 1))) for x in offsets]
+    else:
+        variants = [probe]
+    lines = []
+    for k, a in enumerate(variants):
+        rule = compile_alarm(a)
+        ps = a.get("period_start") or a.get("start_date")
+        origin = datetime.fromisoformat(ps) if ps else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        first = rule.next_fire(origin - timedelta(seconds=1))
+        if first is None:
+            raise Unsupported("울릴 일 없음")
+        # DTSTART 는 그날 첫 시각, 나머지 시각은 VALARM 상대 시간으로
+        day = datetime.combine(first.date(), datetime.min.time())
+        dtstart = day + timedelta(seconds=times[0])
+        uid = alarm.get("id") or str(uuid.uuid4())
+        lines += ["BEGIN:VEVENT", f"UID:{uid}" + (f"-{k}" if len(variants) > 1 else ""), f"DTSTAMP:{stamp}",
+                  f"DTSTART:{_ics_dt(dtstart)}", "SUMMARY:" + escape(alarm.get("name") or "알람"),
+                  "RRULE:" + _rrule(a)]
+        if not alarm.get("enabled", True):
+            lines.append(f"{X_ENABLED}:FALSE")
+        if alarm.get("music_file"):
+            lines.append(f"{X_MUSIC}:" + escape(alarm["music_file"]))
+        if alarm.get("tags"):
+            lines.append("CATEGORIES:" + ",".join(escape(t) for t in alarm["tags"]))
+        if alarm.get("exclude_calendars"):
+            lines.append(f"{X_EXCLUDE}:" + ",".join(escape(n) for n in alarm["exclude_calendars"]))
+        for s in times:
+            lines += ["BEGIN:VALARM", "ACTION:AUDIO", f"TRIGGER:PT{s - times[0]}S", "END:VALARM"]
+        lines.append("END:VEVENT")
+    return lines
+
+def iter_ics(alarms, stats=None):
+    # 알람 목록 -> .ics 텍스트 조각(접힌 줄 단위)
+    stats = stats if stats is not None else {}
+    skipped = stats.setdefault("skipped", Counter())
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n" + fold(f"PRODID:{PRODID}")
+    for alarm in alarms:
+        try:
+            lines = alarm_to_events(alarm, stamp)
+        except (Unsupported, KeyError, TypeError, ValueError) as e:
+            skipped[str(e) if isinstance(e, Unsupported) else "알람 형식"] += 1
+            continue
+        stats["alarms"] = stats.get("alarms", 0) + 1
+        yield "".join(map(fold, lines))
+    yield "END:VCALENDAR\r\n"
+
+def export_ics(alarms, path):
+    stats = {"alarms": 0, "skipped": Counter()}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        for chunk in iter_ics(alarms, stats):
+            f.write(chunk)
+    os.replace(tmp, path)
+    return stats
+
+def summary(verb, stats):
+    skipped = stats["skipped"]
+    msg = f"{stats['alarms']}개 알람을 {verb}"
+    if "events" in stats:
+        msg = f"일정 {stats['events']}개 -> " + msg
+    if skipped:
+        msg += " (건너뜀: " + ", ".join(f"{k} {v}" for k, v in skipped.most_common()) + ")"
+    return msg
+
+def main(argv=None):
+    import argparse
+    from store_calendaralarmclock import open_store
+    ap = argparse.ArgumentParser(prog="ical_calendaralarmclock", description="iCalendar(.ics) 가져오기/내보내기")
+    ap.add_argument("--store", default=os.environ.get("CALENDARALARM_STORE")
+                    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "alarms.json"),
+                    help="alarms.json / *.db 경로")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("import", help=".ics 의 일정을 알람으로 추가(같은 UID 는 덮어씀)")
+    p.add_argument("path")
+    p.add_argument("--batch", type=int, default=BATCH, help="한 번에 저장할 알람 수")
+    p = sub.add_parser("export", help="알람을 .ics 로 저장")
+    p.add_argument("path")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    store = open_store(args.store)
+    try:
+        store.ensure()
+        if args.cmd == "import":
+            store.load()
+            print(summary("가져왔습니다", import_ics(args.path, store.add_many, args.batch)))
+        else:
+            print(summary(f"{args.path} 로 내보냈습니다", export_ics(store.load(), args.path)))
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
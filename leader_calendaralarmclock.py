@@ -0,0 +1,127 @@
+import os
+import sys
+import json
+import socket
+import logging
+import threading
+from datetime import datetime
+
+# 같은 저장 파일을 여는 여러 인스턴스(Tk 창 여러 개, Tk + Kivy, 엔진 serve) 중 하나만 알람을 울리고 기록한다
+# - 저장 파일 옆 <저장 파일>.lock 에 권고 잠금(리눅스/맥 fcntl.flock, 윈도우 msvcrt.locking)을 건다
+# - 잠금을 잡은 인스턴스가 리더: 스케줄러를 돌리고 저장 파일에 쓴다. 나머지는 팔로워(읽기 전용 화면)
+# - 잠금은 프로세스가 끝나면(비정상 종료 포함) OS 가 푼다. 팔로워는 POLL 초마다 다시 잡아 보고,
+#   잡으면 on_acquired() 로 리더가 된다 -> 리더가 끝난 뒤 1초 안에 넘겨받는다
+# - 잠금 파일 내용은 리더 정보(pid/호스트/시작 시각) JSON. 팔로워 화면/로그 표시용일 뿐 잠금과는 무관
+# CALENDARALARM_ELECT=0 이면 선출하지 않는다(모든 인스턴스가 리더처럼 동작, 예전 방식)
+
+POLL = 0.25
+# 윈도우는 잠근 영역을 다른 프로세스가 읽지 못하므로 내용과 겹치지 않는 먼 위치 1바이트를 잠근다
+_WIN_LOCK_OFFSET = 1 << 30
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+def elect_from_env(default=True):
+    raw = (os.environ.get("CALENDARALARM_ELECT") or "").strip().lower()
+    if not raw:
+        return default
+    return raw not in ("0", "off", "no", "false")
+
+def lock_path(store_path):
+    return os.path.abspath(store_path) + ".lock"
+
+class LeaderLock:
+    def __init__(self, path, poll=POLL):
+        self.path = path
+        self.poll = poll
+        self._fd = None
+        self._held = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def held(self):
+        return self._held
+
+    def _lock(self, fd):
+        # 잠그지 못하면(다른 인스턴스가 잡고 있음) False
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                os.lseek(fd, _WIN_LOCK_OFFSET, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def try_acquire(self):
+        # 한 번 시도. 잡으면 리더 정보를 적고 True
+        if self._held:
+            return True
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not self._lock(self._fd):
+            return False
+        self._held = True
+        info = json.dumps({"pid": os.getpid(), "host": socket.gethostname(),
+                           "since": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                           "argv": os.path.basename(sys.argv[0]) if sys.argv else ""}).encode("utf-8")
+        try:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            os.write(self._fd, info)
+            os.ftruncate(self._fd, len(info))
+        except OSError:
+            logging.exception("리더 정보 기록 실패: %s", self.path)
+        return True
+
+    def owner(self):
+        # 지금 리더 정보(dict). 알 수 없으면 None
+        try:
+            with open(self.path, "rb") as f:
+                return json.loads(f.read(4096) or b"null")
+        except (OSError, ValueError):
+            return None
+
+    def wait(self, on_acquired):
+        # 팔로워: 백그라운드에서 POLL 초마다 잡아 보고, 잡으면 on_acquired() 를 한 번 부른다
+        if self._held or self._thread is not None:
+            return
+        def run():
+            while not self._stop.wait(self.poll):
+                if self.try_acquire():
+                    try:
+                        on_acquired()
+                    except Exception:
+                        logging.exception("리더 전환 처리 실패")
+                    return
+        self._thread = threading.Thread(target=run, name="alarm-leader-wait", daemon=True)
+        self._thread.start()
+
+    def release(self):
+        self._stop.set()
+        t = self._thread
+        if t is not None and t is not threading.current_thread():
+            t.join(self.poll * 4)
+        self._thread = None
+        if self._fd is None:
+            return
+        try:
+            if self._held:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+                elif msvcrt is not None:
+                    os.lseek(self._fd, _WIN_LOCK_OFFSET, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        except OSError:
+            pass
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self._held = False
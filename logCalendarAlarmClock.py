@@ -0,0 +1,239 @@
+import os
+import sys
+import csv
+import mmap
+import struct
+import hashlib
+import logging
+import functools
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from core_calendaralarmclock import EPOCH, to_seconds
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 알람 울림 기록(울림/다시 알림/끄기)을 고정 크기 레코드로 쌓는 링 버퍼 파일
+# - 파일 = 머리(64바이트) + 레코드 capacity 개. mmap 으로 열어 두고 덧붙이기는 레코드 한 칸 쓰기 + 개수 갱신뿐(O(1))
+# - fsync 하지 않는다. 프로세스가 죽어도 쓴 내용은 OS 페이지 캐시에 남고, 닫을 때만 flush 한다
+# - 가득 차면 가장 오래된 기록부터 덮어쓴다. alarms.json 에는 last_triggered 하나만 남는다
+# - 여러 인스턴스가 같은 파일을 열 수 있다(리더 전환). 덧붙일 때마다 파일 잠금(flock) 안에서 개수를 다시 읽는다
+# - 레코드: 알람 id 해시(8) / 예정 시각 ms(8) / 실제 시각 ms(8) / 결과(1) / 여분(7) = 32바이트
+#   시각은 core 의 to_seconds 와 같은 naive 현지 시각 기준(1970-01-01 부터의 밀리초)
+#   python -m logCalendarAlarmClock show --alarm <id> --since "2026-01-01"
+#   python -m logCalendarAlarmClock export history.csv --store alarms.json
+
+MAGIC = b"CALOG001"
+HEADER = struct.Struct("<8sIIQ")       # magic, 레코드 크기, capacity, 지금까지 쓴 개수
+HEADER_SIZE = 64
+RECORD = struct.Struct("<QqqB7x")
+CAPACITY = 65536                       # 기본 2MB
+LOG_DIR = "CalendarAlarmClockLog"
+
+FIRE, SNOOZE, DISMISS = 1, 2, 3
+OUTCOMES = {FIRE: "fire", SNOOZE: "snooze", DISMISS: "dismiss"}
+
+HistoryRecord = namedtuple("HistoryRecord", "id_hash scheduled actual outcome")
+
+@functools.lru_cache(maxsize=65536)
+def id_hash(alarm_id):
+    return int.from_bytes(hashlib.blake2b(str(alarm_id).encode("utf-8"), digest_size=8).digest(), "little")
+
+def _to_ms(dt):
+    return to_seconds(dt) * 1000 + dt.microsecond // 1000
+
+def _from_ms(ms):
+    return EPOCH + timedelta(milliseconds=ms)
+
+def history_path(store_path):
+    # 기본 위치: 저장 파일 옆 CalendarAlarmClockLog/history.bin (CALENDARALARM_HISTORY 로 변경)
+    return os.environ.get("CALENDARALARM_HISTORY") or \
+        os.path.join(os.path.dirname(os.path.abspath(store_path)), LOG_DIR, "history.bin")
+
+class FireHistory:
+    def __init__(self, path, capacity=CAPACITY):
+        self.path = path
+        self._lock = threading.Lock()
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self._file = self._open(capacity)
+        self._mm = mmap.mmap(self._file.fileno(), HEADER_SIZE + self.capacity * RECORD.size)
+        self.count = HEADER.unpack_from(self._mm, 0)[3]
+
+    def _open(self, capacity):
+        # 기존 파일이면 그 capacity 를 따르고, 머리가 깨졌으면 옆으로 치우고 새로 만든다
+        try:
+            f = open(self.path, "r+b")
+        except FileNotFoundError:
+            f = None
+        if f is not None:
+            head = f.read(HEADER.size)
+            if len(head) == HEADER.size:
+                magic, size, cap, _ = HEADER.unpack(head)
+                if magic == MAGIC and size == RECORD.size and cap > 0 \
+                        and os.fstat(f.fileno()).st_size >= HEADER_SIZE + cap * size:
+                    self.capacity = cap
+                    return f
+            f.close()
+            logging.warning("울림 기록 파일이 깨져 새로 만듭니다: %s", self.path)
+            os.replace(self.path, self.path + ".bad")
+        self.capacity = max(1, int(capacity))
+        f = open(self.path, "w+b")
+        f.write(HEADER.pack(MAGIC, RECORD.size, self.capacity, 0).ljust(HEADER_SIZE, b"\0"))
+        f.truncate(HEADER_SIZE + self.capacity * RECORD.size)
+        f.flush()
+        return f
+
+    def close(self):
+        with self._lock:
+            if self._mm is None:
+                return
+            self._mm.flush()
+            self._mm.close()
+            self._file.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    # --- 쓰기 ---
+    def append(self, alarm_id, scheduled, outcome=FIRE, actual=None):
+        actual = datetime.now() if actual is None else actual
+        rec = (id_hash(alarm_id), _to_ms(scheduled), _to_ms(actual), outcome)
+        with self._lock:
+            if self._mm is None:
+                return
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            try:
+                # 다른 프로세스(이전 리더 등)가 그사이 쓴 개수 뒤에 이어 쓴다
+                n = max(self.count, HEADER.unpack_from(self._mm, 0)[3])
+                RECORD.pack_into(self._mm, HEADER_SIZE + (n % self.capacity) * RECORD.size, *rec)
+                # 레코드를 다 쓴 뒤 개수를 올린다(읽는 쪽이 반쯤 쓴 칸을 보지 않도록)
+                self.count = n + 1
+                HEADER.pack_into(self._mm, 0, MAGIC, RECORD.size, self.capacity, n + 1)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+
+    # --- 읽기 ---
+    def _raw(self):
+        # 오래된 것부터 (해시, 예정 ms, 실제 ms, 결과)
+        with self._lock:
+            if self._mm is None:
+                return []
+            # 다른 프로세스가 쓰고 있을 수 있으므로 개수는 파일에서 다시 읽는다
+            n = self.count = max(self.count, HEADER.unpack_from(self._mm, 0)[3])
+            cap = self.capacity
+            if n <= cap:
+                data = self._mm[HEADER_SIZE:HEADER_SIZE + n * RECORD.size]
+            else:
+                cut = HEADER_SIZE + (n % cap) * RECORD.size
+                data = self._mm[cut:HEADER_SIZE + cap * RECORD.size] + self._mm[HEADER_SIZE:cut]
+        return RECORD.iter_unpack(data)
+
+    def records(self, alarm_id=None, start=None, end=None, outcome=None):
+        # 조건에 맞는 기록을 오래된 것부터. start/end 는 예정 시각 기준 [start, end)
+        h = id_hash(alarm_id) if alarm_id is not None else None
+        lo = _to_ms(start) if start is not None else None
+        hi = _to_ms(end) if end is not None else None
+        for rh, sched, actual, oc in self._raw():
+            if h is not None and rh != h:
+                continue
+            if outcome is not None and oc != outcome:
+                continue
+            if lo is not None and sched < lo:
+                continue
+            if hi is not None and sched >= hi:
+                continue
+            yield HistoryRecord(rh, _from_ms(sched), _from_ms(actual), oc)
+
+    def history(self, alarm_id, limit=None):
+        # 알람 하나의 기록, 최근 것이 먼저
+        out = list(self.records(alarm_id))
+        out.reverse()
+        return out[:limit] if limit else out
+
+    def fires_between(self, start, end):
+        # [start, end) 에 예정된 울림 전부
+        return list(self.records(start=start, end=end, outcome=FIRE))
+
+    def export_csv(self, path_or_file, alarms=(), **filters):
+        # alarms 를 주면 해시 대신 id/이름을 함께 적는다. 쓴 줄 수를 돌려준다
+        names = {id_hash(a["id"]): a for a in alarms if a.get("id")}
+        own = isinstance(path_or_file, (str, os.PathLike))
+        f = open(path_or_file, "w", newline="", encoding="utf-8-sig") if own else path_or_file
+        try:
+            w = csv.writer(f)
+            w.writerow(["alarm_id", "name", "scheduled", "actual", "lag_s", "outcome"])
+            n = 0
+            for r in self.records(**filters):
+                a = names.get(r.id_hash)
+                w.writerow([a["id"] if a else f"#{r.id_hash:016x}", a.get("name", "") if a else "",
+                            str(r.scheduled), r.actual.isoformat(sep=" ", timespec="milliseconds"),
+                            f"{(r.actual - r.scheduled).total_seconds():.3f}", OUTCOMES.get(r.outcome, r.outcome)])
+                n += 1
+            return n
+        finally:
+            if own:
+                f.close()
+
+def open_history(store_path, capacity=CAPACITY):
+    # CALENDARALARM_HISTORY=off 면 기록하지 않는다(None)
+    if (os.environ.get("CALENDARALARM_HISTORY") or "").strip().lower() in ("0", "off", "no", "false"):
+        return None
+    try:
+        return FireHistory(history_path(store_path), capacity)
+    except (OSError, ValueError):
+        logging.exception("울림 기록 파일을 열지 못했습니다")
+        return None
+
+def main(argv=None):
+    import argparse
+    from store_calendaralarmclock import open_store
+    ap = argparse.ArgumentParser(prog="logCalendarAlarmClock", description="알람 울림 기록 조회/내보내기")
+    ap.add_argument("--store", default=os.environ.get("CALENDARALARM_STORE")
+                    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "alarms.json"),
+                    help="alarms.json / *.db 경로(기록 파일 위치와 알람 이름 확인용)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    for name, help_ in (("show", "기록 출력"), ("export", "CSV 로 저장")):
+        p = sub.add_parser(name, help=help_)
+        if name == "export":
+            p.add_argument("path")
+        p.add_argument("--alarm", help="알람 id")
+        p.add_argument("--since", help="예정 시각 이후 YYYY-MM-DD[ HH:MM:SS]")
+        p.add_argument("--until", help="예정 시각 이전")
+        p.add_argument("--outcome", choices=list(OUTCOMES.values()))
+    args = ap.parse_args(argv)
+    filters = {"alarm_id": args.alarm,
+               "start": datetime.fromisoformat(args.since) if args.since else None,
+               "end": datetime.fromisoformat(args.until) if args.until else None,
+               "outcome": {v: k for k, v in OUTCOMES.items()}.get(args.outcome)}
+    store = open_store(args.store)
+    try:
+        alarms = store.load() if os.path.exists(args.store) else []
+    finally:
+        store.close()
+    path = history_path(args.store)
+    if not os.path.exists(path):
+        print(f"울림 기록이 없습니다: {path}", file=sys.stderr)
+        return 1
+    with FireHistory(path) as hist:
+        if args.cmd == "export":
+            print(f"{hist.export_csv(args.path, alarms, **filters)}줄을 {args.path} 로 내보냈습니다")
+        else:
+            hist.export_csv(sys.stdout, alarms, **filters)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+import os
+import time
+import atexit
+import logging
+import threading
+
+# 계측(카운터 / HDR 방식 지연 히스토그램) + Prometheus 텍스트 형식 내보내기
+# - 기본은 꺼져 있다. 꺼져 있으면 observe/inc 는 바로 반환하고 time() 은 공용 빈 컨텍스트를 돌려준다
+# - 켜기: CALENDARALARM_METRICS=1, 또는 내보내기 대상 지정
+#     CALENDARALARM_METRICS_FILE=경로   주기적으로 텍스트 파일에 기록(node_exporter textfile 형식)
+#     CALENDARALARM_METRICS_PORT=포트   127.0.0.1:포트/metrics 로 제공
+#     CALENDARALARM_PROFILE=경로.prof  스케줄러 루프를 cProfile 로 기록(종료 시 저장)
+
+SUB_BITS = 5            # 옥타브(2배 구간)당 32칸 -> 상대 오차 약 3%
+SUB = 1 << SUB_BITS
+UNIT = 1e-6             # 히스토그램은 마이크로초 정수로 센다
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+def _bucket(v):
+    # HDR 히스토그램 방식: 작은 값은 그대로, 큰 값은 상위 SUB_BITS+1 비트만 남겨 칸을 정한다
+    if v < 2 * SUB:
+        return v
+    shift = v.bit_length() - SUB_BITS - 1
+    return SUB * shift + (v >> shift)
+
+def _bucket_range(idx):
+    if idx < 2 * SUB:
+        return idx, idx
+    shift = idx // SUB - 1
+    mant = idx - SUB * shift
+    return mant << shift, ((mant + 1) << shift) - 1
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NO_TIMER = _NoTimer()
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+class Counter:
+    def __init__(self, registry, name, help_):
+        self._reg = registry
+        self.name = name
+        self.help = help_
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, n=1):
+        if not self._reg.enabled:
+            return
+        with self._lock:
+            self.value += n
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+class Gauge:
+    # 내보낼 때 fn() 을 불러 값을 읽는다(대기열 길이 등)
+    def __init__(self, registry, name, help_, fn):
+        self._reg = registry
+        self.name = name
+        self.help = help_
+        self.fn = fn
+
+    def render(self):
+        try:
+            value = float(self.fn())
+        except Exception:
+            logging.exception("게이지 %s 읽기 실패", self.name)
+            return []
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {value:g}"]
+
+class Histogram:
+    # 초 단위 값을 마이크로초 정수 칸에 센다. 최대/최소/합은 정확히, 분위수는 칸 범위 안에서 근사
+    def __init__(self, registry, name, help_):
+        self._reg = registry
+        self.name = name
+        self.help = help_
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = {}
+            self.count = 0
+            self.sum = 0.0
+            self.min = None
+            self.max = None
+
+    def observe(self, seconds):
+        if not self._reg.enabled:
+            return
+        v = int(seconds / UNIT) if seconds > 0 else 0
+        idx = _bucket(v)
+        with self._lock:
+            self.counts[idx] = self.counts.get(idx, 0) + 1
+            self.count += 1
+            self.sum += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def time(self):
+        return _Timer(self) if self._reg.enabled else _NO_TIMER
+
+    def quantile(self, q):
+        with self._lock:
+            if not self.count:
+                return None
+            rank = max(1, int(q * self.count + 0.5))
+            seen = 0
+            for idx in sorted(self.counts):
+                seen += self.counts[idx]
+                if seen >= rank:
+                    lo, hi = _bucket_range(idx)
+                    value = (lo + hi) / 2.0 * UNIT
+                    return min(max(value, self.min), self.max)
+        return self.max
+
+    def snapshot(self):
+        out = {"count": self.count, "sum_s": self.sum, "min_s": self.min, "max_s": self.max}
+        for q in QUANTILES:
+            out[f"p{q * 100:g}_s"] = self.quantile(q)
+        return out
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} summary"]
+        for q in QUANTILES:
+            v = self.quantile(q)
+            lines.append(f'{self.name}{{quantile="{q:g}"}} {v if v is not None else "NaN"}')
+        lines.append(f"{self.name}_sum {self.sum}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+class Registry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._exporter = None
+        self._server = None
+        self.textfile = None
+        self.interval = 15.0
+
+    def _get(self, name, factory):
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = factory()
+            return m
+
+    def counter(self, name, help_=""):
+        return self._get(name, lambda: Counter(self, name, help_))
+
+    def histogram(self, name, help_=""):
+        return self._get(name, lambda: Histogram(self, name, help_))
+
+    def gauge(self, name, help_, fn):
+        # 같은 이름으로 다시 등록하면 새 fn 으로 바꾼다
+        g = Gauge(self, name, help_, fn)
+        with self._lock:
+            self._metrics[name] = g
+        return g
+
+    def render(self):
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        lines = []
+        for _, m in metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        with self._lock:
+            metrics = list(self._metrics.items())
+        out = {}
+        for name, m in metrics:
+            if isinstance(m, Histogram):
+                out[name] = m.snapshot()
+            elif isinstance(m, Counter):
+                out[name] = m.value
+        return out
+
+    def write_textfile(self, path=None):
+        path = path or self.textfile
+        if not path:
+            return
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    # --- 내보내기 ---
+    def configure(self, enabled=None, textfile=None, port=None, interval=None):
+        if textfile or port:
+            enabled = True if enabled is None else enabled
+        if enabled is not None:
+            self.enabled = enabled
+        if interval:
+            self.interval = interval
+        if textfile:
+            self.textfile = textfile
+            self._start_textfile()
+        if port:
+            self.serve(int(port))
+
+    def _start_textfile(self):
+        if self._exporter is not None:
+            return
+
+        def loop():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.write_textfile()
+                except Exception:
+                    logging.exception("메트릭 파일 기록 실패")
+
+        self._exporter = threading.Thread(target=loop, name="metrics-textfile", daemon=True)
+        self._exporter.start()
+        atexit.register(self.flush)
+
+    def flush(self):
+        try:
+            self.write_textfile()
+        except Exception:
+            logging.exception("메트릭 파일 기록 실패")
+
+    def serve(self, port, host="127.0.0.1"):
+        # 로컬 전용 HTTP 엔드포인트(GET /metrics)
+        if self._server is not None:
+            return self._server
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 무거워서 켤 때만
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info("메트릭 엔드포인트: http://%s:%d/metrics", host, self._server.server_address[1])
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.flush()
+
+def _env_flag(name):
+    return (os.environ.get(name) or "").strip().lower() in ("1", "true", "yes", "on")
+
+METRICS = Registry(enabled=_env_flag("CALENDARALARM_METRICS"))
+
+def configure_from_env():
+    # 앱/엔진 시작 시 한 번 호출(여러 번 불러도 내보내기는 하나만 뜬다)
+    port = os.environ.get("CALENDARALARM_METRICS_PORT")
+    try:
+        METRICS.configure(textfile=os.environ.get("CALENDARALARM_METRICS_FILE"), port=int(port) if port else None)
+    except (ValueError, OSError):
+        logging.exception("메트릭 내보내기 설정 실패")
+    return METRICS
+
+class LoopProfiler:
+    # 스케줄러 루프의 한 바퀴씩만 cProfile 로 기록(잠들어 있는 시간은 빼고)
+    def __init__(self, path):
+        import cProfile
+        self.path = path
+        self._prof = cProfile.Profile()
+
+    def __enter__(self):
+        self._prof.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._prof.disable()
+        return False
+
+    def dump(self):
+        try:
+            self._prof.dump_stats(self.path)
+            logging.info("프로파일 저장: %s", self.path)
+        except OSError:
+            logging.exception("프로파일 저장 실패")
+
+def loop_profiler(path=None):
+    path = path or os.environ.get("CALENDARALARM_PROFILE")
+    return LoopProfiler(path) if path else None
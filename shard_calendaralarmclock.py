@@ -0,0 +1,331 @@
+import os
+import heapq
+import queue
+import zlib
+import logging
+import threading
+from datetime import datetime
+
+from core_calendaralarmclock import DeadlineScheduler, alarm_key, compile_alarm
+from holiday_calendaralarmclock import CALENDARS
+
+# 여러 프로세스로 나눠 도는 스케줄러 (알람 수십만~백만 개용)
+# - 알람 id 의 crc32 로 NBUCKETS 개 버킷에 나누고, 버킷을 작업 프로세스에 배정한다
+# - 작업 프로세스는 자기 몫으로 DeadlineScheduler 를 돌리고, 울릴 회차를 결과 큐로 보낸다
+# - 조정자(엔진 쪽)는 결과를 모아 pop_due 로 내준다. 버킷 이동 중 양쪽에서 같은 회차가 와도 한 번만 울린다
+# - 추가/삭제로 프로세스 간 알람 수가 벌어지면 버킷 단위로 옮겨 맞춘다
+# DeadlineScheduler 와 같은 메서드(reset/update(_many)/rebind/remove(_many)/pop_due/next_deadline/rules_for/stop)를 제공한다.
+# 사용: CALENDARALARM_SHARDS=8 (auto 면 CPU 수)
+
+NBUCKETS = 1024
+
+def bucket_of(key):
+    # 프로세스마다 달라지는 hash() 대신 crc32
+    return zlib.crc32(key.encode("utf-8")) % NBUCKETS
+
+def shards_from_env(default=None):
+    raw = (os.environ.get("CALENDARALARM_SHARDS") or "").strip().lower()
+    if not raw:
+        return default
+    if raw == "auto":
+        return os.cpu_count() or 1
+    try:
+        return max(0, int(raw)) or None
+    except ValueError:
+        logging.warning("CALENDARALARM_SHARDS 값이 잘못되었습니다: %r", raw)
+        return default
+
+def _worker(shard, inbox, outbox, catchup):
+    # 작업 프로세스 본체. 명령을 받아 반영하고, 다음 회차까지 기다렸다가 울릴 회차를 보낸다
+    sched = DeadlineScheduler(catchup=catchup)
+    reported = None
+    while True:
+        nxt = sched.next_deadline()
+        timeout = sched.MAX_WAIT
+        if nxt is not None:
+            timeout = max(0.0, min(timeout, (nxt - datetime.now()).total_seconds()))
+        try:
+            msg = inbox.get(timeout=timeout)
+        except queue.Empty:
+            msg = None
+        # 쌓인 명령은 한 번에 처리
+        while msg is not None:
+            op = msg[0]
+            if op == "stop":
+                return
+            if op == "reset":
+                # 휴일 달력은 작업 프로세스마다 따로 읽으므로 다시 계산하라는 지시가 오면 파일부터 확인
+                if msg[3]:
+                    CALENDARS.refresh()
+                sched.reset(msg[1], catch_up=msg[2], recompile=msg[3])
+            elif op == "add":
+                for a in msg[1]:
+                    sched.update(a)
+            elif op == "remove":
+                for key in msg[1]:
+                    sched.remove(key)
+            try:
+                msg = inbox.get_nowait()
+            except queue.Empty:
+                msg = None
+        skipped = sched.skipped
+        due = sched.pop_due(datetime.now())
+        nd = sched.next_deadline()
+        if due or sched.skipped != skipped or nd != reported:
+            outbox.put((shard, [(a["id"], t) for a, t in due], sched.skipped - skipped, nd))
+            reported = nd
+
+class ShardedScheduler:
+    MAX_WAIT = DeadlineScheduler.MAX_WAIT
+    REBALANCE_RATIO = 0.05  # 평균 대비 이만큼 넘게 벌어지면 버킷을 옮긴다
+    REBALANCE_MIN = 256     # 작은 목록에서는 이 개수 차이까지는 그냥 둔다
+
+    def __init__(self, workers=None, catchup=None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.catchup = DeadlineScheduler.CATCHUP if catchup is None else catchup
+        self._lock = threading.Lock()
+        self._alarms = {}                                   # id -> 알람(조정자 쪽 원본)
+        self._rules = {}                                    # id -> (alarm, AlarmRule) rules_for 캐시
+        self._buckets = [set() for _ in range(NBUCKETS)]    # 버킷 -> id
+        self._owner = [b % self.workers for b in range(NBUCKETS)]
+        self._load = [0] * self.workers
+        self._fired = {}                                    # id -> 마지막으로 울린 예정 시각(중복 제거)
+        self._due = []
+        self.collect = True      # False 면 도착한 회차를 버린다(팔로워 엔진: 울리는 것은 다른 인스턴스)
+        self._next = [None] * self.workers
+        self._reported = set()   # 한 번이라도 결과를 보낸(=첫 명령을 처리한) 프로세스
+        self._ready = threading.Condition(self._lock)
+        self._procs = []
+        self._inboxes = []
+        self._outbox = None
+        self._reader = None
+        self.wake = None
+        self.last_tick = None
+        self.skipped = 0
+        self.duplicates = 0   # 중복으로 버린 회차
+        self.moved = 0        # 재배치로 옮긴 알람 수
+
+    # --- 프로세스 ---
+    def start(self, wake=None):
+        # wake(): 울릴 회차가 도착하면 결과 읽기 스레드에서 호출(엔진 루프 깨우기)
+        self.wake = wake
+        # Tk/엔진 스레드가 있는 프로세스를 fork 하지 않도록 spawn
+        import multiprocessing
+        ctx = multiprocessing.get_context("spawn")
+        self._outbox = ctx.Queue()
+        self._inboxes = [ctx.Queue() for _ in range(self.workers)]
+        self._procs = [ctx.Process(target=_worker, args=(i, self._inboxes[i], self._outbox, self.catchup),
+                                   name=f"alarm-shard-{i}", daemon=True) for i in range(self.workers)]
+        for p in self._procs:
+            p.start()
+        self._reader = threading.Thread(target=self._read, name="alarm-shard-reader", daemon=True)
+        self._reader.start()
+        logging.info("분산 스케줄러 시작: 작업 프로세스 %d개", self.workers)
+        return self
+
+    def stop(self, timeout=2.0):
+        for q in self._inboxes:
+            q.put(("stop",))
+        for p in self._procs:
+            p.join(timeout)
+            if p.is_alive():
+                p.terminate()
+        if self._outbox is not None:
+            self._outbox.put(None)
+            self._reader.join(timeout)
+        self._procs = []
+
+    def _read(self):
+        while True:
+            msg = self._outbox.get()
+            if msg is None:
+                return
+            shard, due, skipped, nd = msg
+            if not self.collect:
+                due = []
+            with self._lock:
+                self._due.extend(due)
+                self.skipped += skipped
+                self._next[shard] = nd
+                self._reported.add(shard)
+                self._ready.notify_all()
+            if due and self.wake is not None:
+                self.wake()
+
+    def wait_ready(self, timeout=None):
+        # 모든 작업 프로세스가 reset 을 처리하고 첫 결과를 보낼 때까지(벤치마크/시험용)
+        with self._ready:
+            return self._ready.wait_for(lambda: len(self._reported) == self.workers, timeout)
+
+    def _send(self, shard, msg):
+        if self._inboxes:
+            self._inboxes[shard].put(msg)
+
+    # --- 배정 ---
+    def _assign(self):
+        # 큰 버킷부터 가장 적게 가진 프로세스에(LPT)
+        heap = [(0, w) for w in range(self.workers)]
+        for b in sorted(range(NBUCKETS), key=lambda b: -len(self._buckets[b])):
+            n, w = heapq.heappop(heap)
+            self._owner[b] = w
+            heapq.heappush(heap, (n + len(self._buckets[b]), w))
+        self._load = [0] * self.workers
+        for b, keys in enumerate(self._buckets):
+            self._load[self._owner[b]] += len(keys)
+
+    def _plan_moves(self):
+        # 가장 많은 쪽에서 가장 적은 쪽으로, 차이의 절반에 가까운 버킷을 옮긴다
+        moves = []
+        load, owner, buckets = self._load, self._owner, self._buckets
+        limit = max(self.REBALANCE_MIN, len(self._alarms) / self.workers * self.REBALANCE_RATIO)
+        while True:
+            hi = max(range(self.workers), key=load.__getitem__)
+            lo = min(range(self.workers), key=load.__getitem__)
+            gap = load[hi] - load[lo]
+            if gap <= limit:
+                return moves
+            cands = [b for b in range(NBUCKETS) if owner[b] == hi and 0 < len(buckets[b]) < gap]
+            if not cands:
+                return moves
+            b = min(cands, key=lambda b: abs(len(buckets[b]) - gap / 2))
+            owner[b] = lo
+            load[hi] -= len(buckets[b])
+            load[lo] += len(buckets[b])
+            moves.append((hi, lo, [self._alarms[k] for k in buckets[b]]))
+
+    def _rebalance(self):
+        # 집계는 stats() 와 같은 잠금 안에서, 전송은 잠금 밖에서(파이프가 막히면 기다릴 수 있다)
+        with self._lock:
+            moves = self._plan_moves()
+            self.moved += sum(len(items) for _, _, items in moves)
+            load = list(self._load)
+        for src, dst, items in moves:
+            # 옮기는 사이 양쪽에서 같은 회차가 오더라도 pop_due 의 중복 제거가 걸러낸다
+            self._send(src, ("remove", [a["id"] for a in items]))
+            self._send(dst, ("add", items))
+        if moves:
+            logging.info("알람 재배치: 버킷 %d개, 프로세스별 %s", len(moves), load)
+
+    # --- DeadlineScheduler 와 같은 메서드 ---
+    def reset(self, alarms, catch_up=False, recompile=False):
+        with self._lock:
+            self._alarms = {alarm_key(a): a for a in alarms}
+            self._rules = {}
+            self._buckets = [set() for _ in range(NBUCKETS)]
+            for key in self._alarms:
+                self._buckets[bucket_of(key)].add(key)
+            self._fired = {k: v for k, v in self._fired.items() if k in self._alarms}
+            self._assign()
+            parts = [[] for _ in range(self.workers)]
+            for b, keys in enumerate(self._buckets):
+                parts[self._owner[b]].extend(self._alarms[k] for k in keys)
+        for w, part in enumerate(parts):
+            self._send(w, ("reset", part, catch_up, recompile))
+
+    def update(self, alarm):
+        self.update_many((alarm,))
+
+    def update_many(self, alarms):
+        # 작업 프로세스마다 명령 하나로 묶어 보낸다
+        parts, new = {}, False
+        with self._lock:
+            for alarm in alarms:
+                key = alarm_key(alarm)
+                b = bucket_of(key)
+                if key not in self._alarms:
+                    new = True
+                    self._buckets[b].add(key)
+                    self._load[self._owner[b]] += 1
+                self._alarms[key] = alarm
+                self._rules.pop(key, None)
+                parts.setdefault(self._owner[b], []).append(alarm)
+        for w, items in parts.items():
+            self._send(w, ("add", items))
+        if new:
+            self._rebalance()
+
+    def rebind(self, alarms):
+        # 울림 기록만 바뀐 경우: 조정자 쪽 원본만 바꾼다(작업 프로세스는 스스로 다음 회차를 잡는다)
+        with self._lock:
+            for a in alarms:
+                key = a.get("id")
+                if key in self._alarms:
+                    self._alarms[key] = a
+                    e = self._rules.get(key)
+                    if e is not None:
+                        self._rules[key] = (a, e[1])
+
+    def remove(self, key):
+        self.remove_many((key,))
+
+    def remove_many(self, keys):
+        parts = {}
+        with self._lock:
+            for key in keys:
+                if self._alarms.pop(key, None) is None:
+                    continue
+                b = bucket_of(key)
+                self._rules.pop(key, None)
+                self._fired.pop(key, None)
+                self._buckets[b].discard(key)
+                self._load[self._owner[b]] -= 1
+                parts.setdefault(self._owner[b], []).append(key)
+        for w, items in parts.items():
+            self._send(w, ("remove", items))
+        if parts:
+            self._rebalance()
+
+    def clear_due(self):
+        # 아직 꺼내지 않은 회차를 버린다(팔로워였던 동안 쌓인 것 등)
+        with self._lock:
+            self._due = []
+
+    def pop_due(self, now):
+        # 도착한 회차를 예정 시각 순으로. 이미 울린 회차(울림 기록 포함)/삭제·비활성된 알람은 버리고,
+        # DeadlineScheduler.pop_due 처럼 catchup 보다 오래된 회차는 건너뛴다
+        with self._lock:
+            items, self._due = self._due, []
+        out = []
+        cutoff = now.replace(microsecond=0) - self.catchup
+        skipped = 0
+        for key, t in sorted(items, key=lambda x: x[1]):
+            alarm = self._alarms.get(key)
+            if alarm is None or not alarm.get("enabled", True):
+                continue
+            last = self._fired.get(key)
+            if (last is not None and t <= last) or (alarm.get("last_triggered") or "") >= t.strftime("%Y-%m-%d %H:%M:%S"):
+                self.duplicates += 1
+                continue
+            if t < cutoff:
+                skipped += 1
+                continue
+            self._fired[key] = t
+            out.append((alarm, t))
+        if skipped:
+            self.skipped += skipped
+            logging.warning("%s 이상 지난 알람 회차를 건너뜁니다(%d건)", self.catchup, skipped)
+        self.last_tick = now
+        return out
+
+    def next_deadline(self):
+        with self._lock:
+            known = [d for d in self._next if d is not None]
+        return min(known) if known else None
+
+    def rules_for(self, alarms):
+        out = []
+        with self._lock:
+            rules = self._rules
+            for a in alarms:
+                e = rules.get(a.get("id"))
+                if e is None or e[0] is not a:
+                    e = (a, compile_alarm(a))
+                    if a.get("id"):
+                        rules[a["id"]] = e
+                out.append(e[1])
+        return out
+
+    def stats(self):
+        with self._lock:
+            return {"workers": self.workers, "load": list(self._load), "moved": self.moved,
+                    "duplicates": self.duplicates, "skipped": self.skipped}
@@ -0,0 +1,170 @@
+import os
+import sys
+import heapq
+import shutil
+import logging
+import tempfile
+from datetime import datetime
+
+from core_calendaralarmclock import DeadlineScheduler, VirtualClock, compile_alarm, to_seconds, from_seconds
+from store_calendaralarmclock import open_store
+from shard_calendaralarmclock import bucket_of
+
+# 가상 시계 시뮬레이션: 실제 스케줄러(DeadlineScheduler)를 [start, end) 기간 동안 기다리지 않고 돌려 울림 순서를 뽑는다
+# - 시계를 다음 예정 시각으로 바로 옮기고 pop_due 를 부른다 -> 엔진이 그 기간에 울렸을 회차와 같은 순서
+#   (같은 시각은 id 순). 울림 기록(last_triggered)은 기본으로 비우고 시작한다(history=True 면 그대로)
+# - 결과 파일은 한 줄에 "YYYY-MM-DD HH:MM:SS<TAB>알람 id". 회귀 검사용으로 저장해 두고 --check 로 비교한다
+# - --verify 는 같은 기간을 expand_occurrences(날짜 행렬로 따로 계산하는 구현)로 구해 대조한다
+# - --jobs N 이면 알람을 id 버킷으로 N 개 프로세스에 나눠 돌리고 결과를 시간순으로 합친다(알람끼리는 독립)
+#   python -m sim_calendaralarmclock --store alarms.json --start 2026-01-01 --end 2027-01-01 --out fires.tsv
+#   처리량: python -m benchmarks.bench_sim --sizes 100000 --days 365
+
+def simulate(alarms, start, end, catchup=None, history=False):
+    # (알람, 예정 시각) 을 시간순으로 내보내는 생성기
+    clock = VirtualClock(start)
+    sched = DeadlineScheduler(catchup=catchup, clock=clock)
+    if not history:
+        alarms = [{**a, "last_triggered": ""} if a.get("last_triggered") else a for a in alarms]
+    sched.reset(alarms)
+    while True:
+        nxt = sched.next_deadline()
+        if nxt is None or nxt >= end:
+            return
+        clock.set(nxt)
+        yield from sched.pop_due(nxt)
+
+def _write(fires, path):
+    n = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        write = f.write
+        for alarm, t in fires:
+            write(f"{t}\t{alarm['id']}\n")
+            n += 1
+    return n
+
+def _count(fires):
+    n = 0
+    for _ in fires:
+        n += 1
+    return n
+
+def _job(alarms, start, end, catchup, history, path):
+    # 작업 프로세스 하나의 몫. path 가 있으면 결과를 파일로
+    fires = simulate(alarms, start, end, catchup, history)
+    return _write(fires, path) if path else _count(fires)
+
+def run(alarms, start, end, out=None, jobs=1, catchup=None, history=False):
+    # 시뮬레이션을 돌려 울린 회차 수를 돌려준다. out 이 있으면 결과 파일을 쓴다
+    jobs = max(1, int(jobs or 1))
+    if jobs == 1:
+        return _job(alarms, start, end, catchup, history, out)
+    parts = [[] for _ in range(jobs)]
+    for a in alarms:
+        parts[bucket_of(str(a.get("id", ""))) % jobs].append(a)
+    tmp = tempfile.mkdtemp(prefix="sim_") if out else None
+    paths = [os.path.join(tmp, f"part{i}.tsv") if tmp else None for i in range(jobs)]
+    try:
+        # 엔진/GUI 스레드가 있는 프로세스에서도 쓸 수 있게 spawn
+        import multiprocessing
+        with multiprocessing.get_context("spawn").Pool(jobs) as pool:
+            counts = pool.starmap(_job, [(p, start, end, catchup, history, path) for p, path in zip(parts, paths)])
+        if out:
+            # 줄이 "시각<TAB>id" 라 문자열 순서가 곧 (시각, id) 순서
+            files = [open(p, encoding="utf-8") for p in paths]
+            try:
+                with open(out, "w", encoding="utf-8", newline="\n") as f:
+                    f.writelines(heapq.merge(*files))
+            finally:
+                for fp in files:
+                    fp.close()
+        return sum(counts)
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+def verify(alarms, start, end, catchup=None):
+    # 시뮬레이션 결과와 expand_occurrences 결과를 (초, 알람 번호) 목록으로 맞춰 본다.
+    # 다른 회차 목록 [(시각, id, "sim"|"expand")] 을 돌려준다(최대 20개). 빈 목록이면 일치
+    from expand_calendaralarmclock import expand_occurrences
+    pos = {a.get("id"): i for i, a in enumerate(alarms)}
+    got = sorted((to_seconds(t), pos[a["id"]]) for a, t in simulate(alarms, start, end, catchup))
+    occ = expand_occurrences(alarms, start, end, [compile_alarm(a) for a in alarms])
+    want = sorted(zip((int(s) for s in occ.seconds), (int(i) for i in occ.alarm_index)))
+    diff = []
+    a, b = set(got), set(want)
+    for (s, i), side in sorted([(x, "sim") for x in a - b] + [(x, "expand") for x in b - a])[:20]:
+        diff.append((str(from_seconds(s)), alarms[i].get("id"), side))
+    if not diff and len(got) != len(want):
+        diff.append(("-", "-", f"개수 다름 sim={len(got)} expand={len(want)}"))
+    return diff
+
+def check(path, golden):
+    # 두 결과 파일의 첫 차이 (줄 번호, 이전, 이후). 같으면 None
+    with open(golden, encoding="utf-8") as fa, open(path, encoding="utf-8") as fb:
+        n = 0
+        while True:
+            a, b = fa.readline(), fb.readline()
+            n += 1
+            if a != b:
+                return n, a.rstrip("\n") or "(끝)", b.rstrip("\n") or "(끝)"
+            if not a:
+                return None
+
+def _parse_when(text):
+    return datetime.fromisoformat(text.strip())
+
+def main(argv=None):
+    import time
+    import argparse
+    ap = argparse.ArgumentParser(prog="sim_calendaralarmclock", description="가상 시계로 기간 동안의 알람 울림 순서 재생")
+    ap.add_argument("--store", default=os.environ.get("CALENDARALARM_STORE")
+                    or os.path.join(os.path.dirname(os.path.abspath(__file__)), "alarms.json"),
+                    help="alarms.json / *.db 경로")
+    ap.add_argument("--start", required=True, type=_parse_when, help="시작 YYYY-MM-DD[ HH:MM:SS] (포함)")
+    ap.add_argument("--end", required=True, type=_parse_when, help="끝 (제외)")
+    ap.add_argument("--out", help="울림 순서를 쓸 파일(시각<TAB>id)")
+    ap.add_argument("--check", metavar="GOLDEN", help="저장해 둔 결과 파일과 비교(다르면 종료 코드 1)")
+    ap.add_argument("--verify", action="store_true", help="expand_occurrences 결과와 대조(다르면 종료 코드 1)")
+    ap.add_argument("--jobs", type=int, default=1, help="나눠 돌릴 프로세스 수")
+    ap.add_argument("--history", action="store_true", help="저장된 울림 기록(last_triggered) 이후부터")
+    args = ap.parse_args(argv)
+    if args.end <= args.start:
+        ap.error("--end 는 --start 보다 뒤여야 합니다")
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(message)s")
+    store = open_store(args.store)
+    try:
+        alarms = list(store.load())
+    finally:
+        store.close()
+    out = args.out
+    tmp = None
+    if args.check and not out:
+        tmp = tempfile.mkdtemp(prefix="sim_")
+        out = os.path.join(tmp, "fires.tsv")
+    try:
+        t0 = time.perf_counter()
+        n = run(alarms, args.start, args.end, out, args.jobs, history=args.history)
+        elapsed = time.perf_counter() - t0
+        print(f"알람 {len(alarms)}개, {args.start} ~ {args.end}: {n}회 울림, {elapsed:.1f}초 "
+              f"({n / elapsed if elapsed else 0:.0f}회/초)", file=sys.stderr)
+        status = 0
+        if args.check:
+            d = check(out, args.check)
+            if d is not None:
+                print(f"{d[0]}번째 줄부터 다릅니다\n  이전: {d[1]}\n  이후: {d[2]}", file=sys.stderr)
+                status = 1
+            else:
+                print("저장된 결과와 같습니다", file=sys.stderr)
+        if args.verify:
+            diff = verify(alarms, args.start, args.end)
+            for t, aid, side in diff:
+                print(f"  {t}\t{aid}\t{side} 에만 있음", file=sys.stderr)
+            print("expand_occurrences 와 " + ("다릅니다" if diff else "같습니다"), file=sys.stderr)
+            status = status or (1 if diff else 0)
+        return status
+    finally:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,802 @@
+import os
+import sys
+import json
+import logging
+import select
+import struct
+import threading
+from datetime import datetime
+
+from core_calendaralarmclock import compile_alarm, alarm_key, to_seconds, from_seconds
+from metrics_calendaralarmclock import METRICS
+
+# 알람 저장소
+# - AlarmStore: 공통 인터페이스. 메모리 목록을 유지하고 변경 1건을 _persist 로 넘긴다
+# - JournalStore: alarms.json(스냅샷) + 변경 저널(JSONL)
+# - SqliteStore: sqlite3(WAL), enabled/반복종류/다음 울림 시각 인덱스
+# 변경 기록은 모두 "최종 값" 형태(toggle 도 enabled 값 자체를 기록)라서
+# 같은 기록을 다시 적용해도 결과가 같다.
+# 메모리 목록은 copy-on-write: 변경 한 번(일괄 변경도 한 번)마다 버전이 오르고, 그 버전을 처음 읽을 때
+# 새 AlarmSnapshot(읽기 전용 튜플)을 만들어 바꿔 끼운다. 이미 내보낸 알람 dict 는 고치지 않는다(바뀐 알람만 새 dict).
+# 읽는 쪽(엔진/Tk/API)은 snapshot() 을 잡아 두고 잠금이나 복사 없이 읽으면 되고,
+# 스냅샷의 version 으로 변경 이벤트(ChangeEvent.version)와 순서를 맞춘다.
+# 다른 프로세스가 쓴 변경은 refresh() 로 반영한다. JournalStore 는 저널에 새로 붙은 줄만 읽는다
+# (alarms.json 자체가 바뀐 경우 - 압축/전체 저장 - 에만 전체를 다시 읽는다)
+
+def alarm_tags(alarm):
+    # 알람의 태그 목록(공백 제거, 빈 값/중복 제외)
+    tags = alarm.get("tags")
+    if not tags:
+        return ()
+    if isinstance(tags, str):
+        tags = tags.split(",")
+    return tuple(dict.fromkeys(t.strip() for t in tags if isinstance(t, str) and t.strip()))
+
+class AlarmSnapshot(tuple):
+    # 한 버전의 알람 목록(읽기 전용 튜플). 저장소가 바뀌면 이 객체는 그대로 두고 새 스냅샷을 만든다
+    def __new__(cls, alarms=(), version=0):
+        self = super().__new__(cls, alarms)
+        self.version = version
+        self._index = None
+        return self
+
+    def get(self, alarm_id):
+        # id 색인은 처음 찾을 때 만든다(여러 스레드가 동시에 만들어도 결과가 같으므로 잠금 없음)
+        index = self._index
+        if index is None:
+            index = self._index = {a.get("id"): a for a in self}
+        return index.get(alarm_id)
+
+STORE_WRITE = METRICS.histogram("alarm_store_write_seconds", "변경 1건 저장 소요 시간(잠금 대기 포함)")
+STORE_LOAD = METRICS.histogram("alarm_store_load_seconds", "전체 목록 읽기 소요 시간")
+STORE_SAVE_ALL = METRICS.histogram("alarm_store_save_all_seconds", "전체 목록 저장 소요 시간")
+
+class AlarmStore:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._index = {}       # id -> 알람(쓰는 쪽 전용, 잠금 안에서만). 넣은 순서가 곧 목록 순서
+        self._snap = AlarmSnapshot()
+        self._version = 0
+        self._tags = {}        # 태그 -> 알람 id 집합(변경 1건마다 갱신)
+        self._seen = None      # 마지막으로 읽거나 쓴 뒤의 signature()
+        self._loaded = False   # 메모리 목록이 저장 파일 전체와 같은 상태인지(load/save_all 이후)
+
+    # --- 하위 클래스 구현 ---
+    def ensure(self):
+        pass
+
+    def signature(self):
+        # 저장 파일 상태 요약(외부 변경 감지용). None 이면 알 수 없음 -> 항상 바뀐 것으로 본다
+        return None
+
+    def watch_paths(self):
+        # 외부 변경 감시 대상 파일들
+        return []
+
+    def _load_all(self):
+        raise NotImplementedError
+
+    def _persist(self, rec):
+        raise NotImplementedError
+
+    def _replace_all(self, alarms):
+        raise NotImplementedError
+
+    def _persist_many(self, recs):
+        # 여러 변경을 한 번에 기록. 저장 방식별로 한 번의 쓰기/트랜잭션으로 바꿔 쓴다
+        for rec in recs:
+            self._persist(rec)
+
+    def close(self):
+        pass
+
+    # --- 메모리 상태 ---
+    def _tag(self, alarm, add=True):
+        aid = alarm.get("id")
+        for t in alarm_tags(alarm):
+            if add:
+                self._tags.setdefault(t, set()).add(aid)
+            else:
+                ids = self._tags.get(t)
+                if ids is not None:
+                    ids.discard(aid)
+                    if not ids:
+                        del self._tags[t]
+
+    def _rebuild_tags(self):
+        self._tags = {}
+        for a in self._index.values():
+            self._tag(a)
+
+    def _replace(self, alarm_id, **fields):
+        # 공개된 dict 는 고치지 않고 바뀐 필드만 얹은 새 dict 로 교체(목록 위치는 그대로)
+        alarm = self._index.get(alarm_id)
+        if alarm is not None:
+            self._index[alarm_id] = {**alarm, **fields}
+
+    def _drop(self, alarm_id):
+        alarm = self._index.pop(alarm_id, None)
+        if alarm is not None:
+            self._tag(alarm, False)
+
+    def _apply(self, rec):
+        op = rec.get("op")
+        if op == "add":
+            # 넘겨받은 dict 는 이제 저장소 것(이후 고치지 않는다). 같은 id 면 그 자리에서 교체
+            alarm = rec["alarm"]
+            old = self._index.get(alarm.get("id"))
+            if old is not None:
+                self._tag(old, False)
+            self._index[alarm.get("id")] = alarm
+            self._tag(alarm)
+        elif op == "delete":
+            self._drop(rec.get("id"))
+        elif op == "toggle":
+            self._replace(rec.get("id"), enabled=rec.get("enabled", True))
+        elif op == "fired":
+            self._replace(rec.get("id"), last_triggered=rec.get("last_triggered", ""))
+        elif op == "toggle_many":
+            # 일괄 켜기/끄기(태그 단위 등)는 기록 하나에 id 목록으로
+            enabled = rec.get("enabled", True)
+            for aid in rec.get("ids", ()):
+                self._replace(aid, enabled=enabled)
+        elif op == "delete_many":
+            for aid in rec.get("ids", ()):
+                self._drop(aid)
+        else:
+            logging.warning("알 수 없는 변경 기록: %s", op)
+
+    def _publish(self):
+        # 버전만 올린다. 목록 복사는 snapshot() 이 그 버전을 처음 읽을 때 한 번(쓰기가 몰려도 읽을 때 한 번)
+        self._version += 1
+
+    def _log(self, rec):
+        with STORE_WRITE.time(), self._lock:
+            self._apply(rec)
+            self._persist(rec)
+            self._publish()
+            if self._loaded:
+                self._seen = self.signature()
+
+    def _log_many(self, recs):
+        # 여러 변경 = 기록 한 번, 새 버전 하나
+        with STORE_WRITE.time(), self._lock:
+            for rec in recs:
+                self._apply(rec)
+            self._persist_many(recs)
+            self._publish()
+            if self._loaded:
+                self._seen = self.signature()
+
+    def refresh(self):
+        # 다른 프로세스의 변경 반영. 새 기록만 읽어 적용했으면 그 기록 목록, 전체를 다시 읽었으면 None.
+        # 기본 구현은 전체 다시 읽기
+        self.load(force=True)
+        return None
+
+    def take_over(self):
+        # 다른 인스턴스에게서 쓰기를 넘겨받을 때(리더 전환). 남은 변경을 반영하고 끊긴 기록을 정리한다
+        return self.refresh()
+
+    def changed_on_disk(self):
+        # 마지막으로 읽거나 쓴 뒤 다른 프로세스가 저장 파일을 바꿨는지.
+        # 잠금을 잡으므로 자기 쓰기 도중에는 끝날 때까지 기다렸다가 판단한다
+        with self._lock:
+            if not self._loaded:
+                return True
+            sig = self.signature()
+            return sig is None or sig != self._seen
+
+    # --- 공개 API ---
+    def snapshot(self):
+        # 지금 버전의 목록. 이미 만들어 둔 것이면 잠금 없이 돌려주고, 아니면 쓰기가 끝나길 기다렸다가 만든다.
+        # 이후 변경은 새 스냅샷으로 나오므로 들고 있는 동안 바뀌지 않는다
+        snap = self._snap
+        if snap.version == self._version:
+            return snap
+        with self._lock:
+            if self._snap.version != self._version:
+                # 속성 대입 하나라 다른 스레드는 이전 것 아니면 새 것만 본다
+                self._snap = AlarmSnapshot(self._index.values(), self._version)
+            return self._snap
+
+    @property
+    def version(self):
+        return self._version
+
+    def load(self, force=False):
+        # 전체 목록(AlarmSnapshot). 마지막으로 읽거나 쓴 뒤 파일이 그대로면(signature 동일)
+        # 다시 파싱하지 않고 지금 스냅샷을 돌려준다
+        with STORE_LOAD.time(), self._lock:
+            if not force and not self.changed_on_disk():
+                return self.snapshot()
+            alarms = self._load_all()
+            self._seen = self.signature()
+            self._loaded = True
+            # id 없는 예전 알람에도 id 부여(다음 저장 때 반영)
+            self._index = {alarm_key(a): a for a in alarms}
+            self._rebuild_tags()
+            self._publish()
+            return self.snapshot()
+
+    def load_due(self, until):
+        # until 까지 울릴 사용 중 알람만. 기본 구현은 전체를 읽어 계산한다
+        out = []
+        for a in self.load():
+            nf = next_fire_for(a) if a.get("enabled", True) else None
+            if nf is not None and nf <= until:
+                out.append(a)
+        return out
+
+    def add(self, alarm):
+        self._log({"op": "add", "alarm": alarm})
+
+    def add_many(self, alarms):
+        # 일괄 추가(가져오기 등). 같은 id 가 있으면 덮어쓴다
+        self._log_many([{"op": "add", "alarm": a} for a in alarms])
+
+    def delete(self, alarm_id):
+        self._log({"op": "delete", "id": alarm_id})
+
+    def apply_batch(self, recs):
+        # add/delete/toggle 기록 여러 개를 한 번의 쓰기(저널 한 번, sqlite 트랜잭션 하나)로
+        self._log_many(recs)
+
+    def get(self, alarm_id):
+        with self._lock:
+            return self._index.get(alarm_id)
+
+    def mark_fired_many(self, items):
+        # (id, last_triggered) 여러 개 -> 기록 한 번(같은 초에 여러 알람이 울릴 때)
+        self._log_many([{"op": "fired", "id": aid, "last_triggered": last} for aid, last in items])
+
+    # --- 태그/일괄 변경 (해당 알람만 골라 한 번에 기록) ---
+    def tags(self):
+        # {태그: 알람 수}
+        with self._lock:
+            return {t: len(ids) for t, ids in sorted(self._tags.items())}
+
+    def tag_ids(self, tag):
+        with self._lock:
+            return set(self._tags.get(tag, ()))
+
+    def set_enabled_many(self, ids, enabled):
+        # 상태가 실제로 바뀌는 알람만 기록. 바뀐 id 목록을 돌려준다
+        enabled = bool(enabled)
+        with self._lock:
+            index = self._index
+            ids = [i for i in ids if i in index and index[i].get("enabled", True) != enabled]
+            if ids:
+                self._log_many([{"op": "toggle_many", "ids": ids, "enabled": enabled}])
+        return ids
+
+    def delete_many(self, ids):
+        with self._lock:
+            ids = [i for i in ids if i in self._index]
+            if ids:
+                self._log_many([{"op": "delete_many", "ids": ids}])
+        return ids
+
+    def expired_ids(self, now=None):
+        # period_end 가 now 이전인(다시 울릴 일 없는) 알람 id
+        now = now or datetime.now()
+        out = []
+        with self._lock:
+            for a in self._index.values():
+                pe = a.get("period_end")
+                if not pe:
+                    continue
+                try:
+                    if datetime.fromisoformat(pe) < now:
+                        out.append(a.get("id"))
+                except (TypeError, ValueError):
+                    pass
+        return out
+
+    def set_enabled(self, alarm_id, enabled):
+        self._log({"op": "toggle", "id": alarm_id, "enabled": bool(enabled)})
+
+    def mark_fired(self, alarm_id, last_triggered):
+        self._log({"op": "fired", "id": alarm_id, "last_triggered": last_triggered})
+
+    def save_all(self, alarms):
+        # 목록 전체 교체(일괄 편집/종료 시)
+        with STORE_SAVE_ALL.time(), self._lock:
+            self._index = {alarm_key(a): a for a in alarms}
+            self._rebuild_tags()
+            self._replace_all(list(self._index.values()))
+            self._publish()
+            self._seen = self.signature()
+            self._loaded = True
+
+def next_fire_for(alarm, after=None):
+    # 저장용 다음 울림 시각(마지막 울림 이후). 계산 실패/없음이면 None
+    if after is None:
+        after = datetime.now().replace(microsecond=0)
+    last = alarm.get("last_triggered")
+    if last:
+        try:
+            after = max(after, datetime.fromisoformat(last))
+        except ValueError:
+            pass
+    try:
+        return compile_alarm(alarm).next_fire(after)
+    except Exception:
+        return None
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+def _fd_sig(fd):
+    st = os.fstat(fd)
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+class JournalStore(AlarmStore):
+    COMPACT_EVERY = 500  # 저널이 이만큼 쌓이면 스냅샷으로 합침
+
+    def __init__(self, path, fsync=False):
+        super().__init__()
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + ".journal.jsonl"
+        self.fsync = fsync
+        self._snap_lock = threading.Lock()  # 스냅샷 쓰기 순서 보장(항상 _lock 보다 먼저 잡는다)
+        self._jf = None
+        self._pending = 0
+        self._compacting = False
+        self._compactor = None
+        self._snap_sig = None   # 마지막으로 읽거나 쓴 alarms.json 상태
+        self._jpos = 0          # 메모리에 반영된 저널 위치(바이트)
+        self._jino = None       # 그 저널 파일의 inode(압축으로 바뀌면 처음부터)
+
+    def ensure(self):
+        if not os.path.exists(self.path):
+            self._write_snapshot([])
+
+    def signature(self):
+        return _file_sig(self.path), _file_sig(self.journal_path)
+
+    def watch_paths(self):
+        return [self.path, self.journal_path]
+
+    def _write_snapshot(self, alarms):
+        # 임시 파일에 쓰고 rename -> 중간에 죽어도 기존 스냅샷은 온전하다
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(alarms, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self._snap_sig = _file_sig(self.path)
+
+    def _read_snapshot(self):
+        self.ensure()
+        try:
+            with open(self.path, "r", encoding="utf-8-sig") as f:
+                # 읽은 파일 그 자체의 상태(읽는 중 교체되어도 다음 refresh 에서 알아챈다)
+                self._snap_sig = _fd_sig(f.fileno())
+                return json.load(f)
+        except Exception:
+            logging.exception("alarms.json 로드 실패 - 빈 리스트로 초기화")
+            return []
+
+    def _replay(self):
+        # 저널 재생. 마지막 줄이 잘려 있으면(기록 중 종료) 그 앞까지만 쓰고 잘라낸다
+        if not os.path.exists(self.journal_path):
+            self._jpos, self._jino = 0, None
+            return
+        good = 0
+        with open(self.journal_path, "rb") as f:
+            self._jino = os.fstat(f.fileno()).st_ino
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    self._apply(json.loads(raw))
+                except Exception:
+                    logging.exception("저널 항목 무시: %r", raw[:200])
+                good += len(raw)
+        if good != os.path.getsize(self.journal_path):
+            logging.warning("저널 끝의 불완전한 기록을 잘라냅니다")
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(good)
+        self._jpos = good
+
+    def _load_all(self):
+        self._index = {alarm_key(a): a for a in self._read_snapshot()}
+        self._replay()
+        return list(self._index.values())
+
+    def _read_tail(self):
+        # 저널의 _jpos 뒤에 붙은 완전한 줄들 -> (기록 목록, 새 위치). 이어 읽을 수 없으면(저널 교체/축소) None
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            return ([], 0) if self._jpos == 0 else None
+        with f:
+            st = os.fstat(f.fileno())
+            if (self._jino is not None and st.st_ino != self._jino) or st.st_size < self._jpos:
+                return None
+            self._jino = st.st_ino
+            f.seek(self._jpos)
+            data = f.read(st.st_size - self._jpos)
+        # 기록 중인 마지막 줄(아직 줄바꿈 없음)은 다음에 읽는다
+        data = data[:data.rfind(b"\n") + 1]
+        recs = []
+        for raw in data.splitlines():
+            try:
+                recs.append(json.loads(raw))
+            except ValueError:
+                logging.warning("저널 항목 무시: %r", raw[:200])
+        return recs, self._jpos + len(data)
+
+    def refresh(self):
+        with STORE_LOAD.time(), self._lock:
+            if not self._loaded or _file_sig(self.path) != self._snap_sig:
+                self.load(force=True)
+                return None
+            tail = self._read_tail()
+            if tail is None:
+                self.load(force=True)
+                return None
+            recs, self._jpos = tail
+            for rec in recs:
+                self._apply(rec)
+            if recs:
+                self._publish()
+            self._seen = self.signature()
+            return recs
+
+    def take_over(self):
+        # 이전 리더가 쓰다 만 마지막 줄은 잘라낸다(그 뒤에 이어 쓰면 두 기록이 한 줄로 붙는다)
+        with self._lock:
+            recs = self.refresh()
+            try:
+                size = os.path.getsize(self.journal_path)
+            except OSError:
+                size = None
+            if size is not None and size > self._jpos:
+                logging.warning("이전 리더가 남긴 불완전한 저널 기록을 잘라냅니다")
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(self._jpos)
+                self._seen = self.signature()
+            return recs
+
+    def _persist(self, rec):
+        self._persist_many((rec,))
+
+    def _persist_many(self, recs):
+        # 여러 줄을 한 번에 쓰고 flush/fsync 도 한 번만
+        if self._jf is None:
+            self._jf = open(self.journal_path, "ab")
+            self._jino = os.fstat(self._jf.fileno()).st_ino
+        data = b"".join(json.dumps(rec, ensure_ascii=False).encode("utf-8") + b"\n" for rec in recs)
+        start = os.fstat(self._jf.fileno()).st_size
+        self._jf.write(data)
+        self._jf.flush()
+        # 그 사이 다른 프로세스가 붙인 기록이 없을 때만 읽은 위치를 당긴다(있으면 refresh 가 다시 읽는다)
+        if self._jpos == start and self._jf.tell() == start + len(data):
+            self._jpos = start + len(data)
+        if self.fsync:
+            os.fsync(self._jf.fileno())
+        self._pending += len(recs)
+        if self._pending >= self.COMPACT_EVERY and not self._compacting:
+            self._compacting = True
+            self._compactor = threading.Thread(target=self.compact, daemon=True)
+            self._compactor.start()
+
+    def save_all(self, alarms):
+        with self._snap_lock:
+            super().save_all(alarms)
+
+    def _replace_all(self, alarms):
+        # 스냅샷을 쓰고 저널은 비운다
+        self._write_snapshot(alarms)
+        self._truncate_journal(None)
+
+    def _truncate_journal(self, upto):
+        # upto 바이트까지 스냅샷에 반영됨 -> 그 뒤(압축 중 추가된 기록)만 남긴다
+        if self._jf is not None:
+            self._jf.close()
+            self._jf = None
+        if not os.path.exists(self.journal_path):
+            self._jpos, self._jino = 0, None
+            return
+        tail = b""
+        if upto is not None:
+            with open(self.journal_path, "rb") as f:
+                f.seek(upto)
+                tail = f.read()
+        tmp = self.journal_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(tail)
+            self._jino = os.fstat(f.fileno()).st_ino
+        os.replace(tmp, self.journal_path)
+        self._pending = tail.count(b"\n")
+        # 남은 기록은 이미 메모리에 있다
+        self._jpos = len(tail)
+
+    def compact(self):
+        try:
+            with self._snap_lock:
+                with self._lock:
+                    # 공개된 스냅샷은 바뀌지 않으므로 복사 없이 잠금 밖에서 써도 된다
+                    snapshot = self.snapshot()
+                    upto = os.path.getsize(self.journal_path) if os.path.exists(self.journal_path) else None
+                # 파일 쓰기는 _lock 밖에서(그동안의 변경은 저널 뒤쪽에 쌓인다)
+                self._write_snapshot(snapshot)
+                with self._lock:
+                    if upto is not None:
+                        self._truncate_journal(upto)
+                    self._seen = self.signature()
+        except Exception:
+            logging.exception("저널 압축 실패")
+        finally:
+            self._compacting = False
+
+    def close(self):
+        # 진행 중인 백그라운드 압축이 끝난 뒤 닫는다
+        t = self._compactor
+        if t is not None and t is not threading.current_thread():
+            t.join()
+        with self._lock:
+            if self._jf is not None:
+                self._jf.close()
+                self._jf = None
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alarms (
+    id         TEXT PRIMARY KEY,
+    enabled    INTEGER NOT NULL,
+    recurrence TEXT,
+    next_fire  INTEGER,            -- 1970-01-01 기준 초(현지 시각), 울릴 일 없으면 NULL
+    data       TEXT NOT NULL       -- 알람 dict(JSON)
+);
+CREATE INDEX IF NOT EXISTS idx_alarms_due ON alarms(enabled, next_fire);
+CREATE INDEX IF NOT EXISTS idx_alarms_recurrence ON alarms(recurrence);
+"""
+
+class SqliteStore(AlarmStore):
+    # 변경 1건 = 행 하나 갱신. 다음 울림 시각을 컬럼으로 들고 있어 곧 울릴 알람만 조회할 수 있다
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        import sqlite3  # JSON 저장소만 쓸 때는 불러오지 않는다
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    @staticmethod
+    def _row(alarm):
+        nf = next_fire_for(alarm) if alarm.get("enabled", True) else None
+        return (alarm.get("id"), 1 if alarm.get("enabled", True) else 0, alarm.get("recurrence"),
+                to_seconds(nf) if nf else None, json.dumps(alarm, ensure_ascii=False))
+
+    def signature(self):
+        # 다른 연결이 커밋할 때만 바뀐다(자기 커밋으로는 바뀌지 않음)
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def watch_paths(self):
+        return [self.path, self.path + "-wal"]
+
+    def _load_all(self):
+        return [json.loads(d) for (d,) in self._db.execute("SELECT data FROM alarms ORDER BY rowid")]
+
+    def load_due(self, until):
+        # 인덱스(enabled, next_fire)만 타고 필요한 행만 역직렬화
+        rows = self._db.execute(
+            "SELECT data FROM alarms WHERE enabled = 1 AND next_fire <= ? ORDER BY next_fire",
+            (to_seconds(until),))
+        return [json.loads(d) for (d,) in rows]
+
+    def next_due(self):
+        row = self._db.execute("SELECT MIN(next_fire) FROM alarms WHERE enabled = 1").fetchone()
+        return from_seconds(row[0]) if row and row[0] is not None else None
+
+    def count(self):
+        return self._db.execute("SELECT COUNT(*) FROM alarms").fetchone()[0]
+
+    def _persist(self, rec):
+        op = rec.get("op")
+        if op == "add":
+            self._db.execute(
+                "INSERT INTO alarms(id, enabled, recurrence, next_fire, data) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET enabled = excluded.enabled, recurrence = excluded.recurrence, "
+                "next_fire = excluded.next_fire, data = excluded.data", self._row(rec["alarm"]))
+        elif op == "delete":
+            self._db.execute("DELETE FROM alarms WHERE id = ?", (rec["id"],))
+        elif op == "delete_many":
+            self._db.executemany("DELETE FROM alarms WHERE id = ?", ((i,) for i in rec["ids"]))
+        elif op == "toggle_many":
+            # data 는 JSON 안의 enabled 만 바꾼다(행마다 알람 전체를 다시 직렬화하지 않음). 끌 때는 다음 울림 계산도 없다
+            enabled = bool(rec["enabled"])
+            rows = []
+            for i in rec["ids"]:
+                alarm = self._index.get(i) if enabled else None
+                nf = next_fire_for(alarm) if alarm is not None else None
+                rows.append((to_seconds(nf) if nf else None, i))
+            self._db.executemany("UPDATE alarms SET enabled = %d, next_fire = ?, "
+                                 "data = json_set(data, '$.enabled', json('%s')) WHERE id = ?"
+                                 % (enabled, "true" if enabled else "false"), rows)
+        elif op in ("toggle", "fired"):
+            alarm = self._index.get(rec["id"])
+            if alarm is None:
+                # load() 없이 쓰는 경우(데몬 등): 행에서 읽어 같은 변경을 적용
+                row = self._db.execute("SELECT data FROM alarms WHERE id = ?", (rec["id"],)).fetchone()
+                if row is None:
+                    return
+                alarm = json.loads(row[0])
+                if op == "toggle":
+                    alarm["enabled"] = rec["enabled"]
+                else:
+                    alarm["last_triggered"] = rec["last_triggered"]
+            # enabled/last_triggered 가 바뀌면 다음 울림 시각도 다시 계산
+            _, enabled, _, nf, data = self._row(alarm)
+            self._db.execute("UPDATE alarms SET enabled = ?, next_fire = ?, data = ? WHERE id = ?",
+                             (enabled, nf, data, rec["id"]))
+
+    def _persist_many(self, recs):
+        # 한 트랜잭션으로 묶는다
+        self._db.execute("BEGIN")
+        try:
+            for rec in recs:
+                self._persist(rec)
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _replace_all(self, alarms):
+        self._db.execute("BEGIN")
+        try:
+            self._db.execute("DELETE FROM alarms")
+            self._db.executemany("INSERT OR REPLACE INTO alarms(id, enabled, recurrence, next_fire, data) "
+                                 "VALUES (?, ?, ?, ?, ?)", map(self._row, alarms))
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def open_store(path):
+    # 확장자로 저장 방식 선택: .db/.sqlite/.sqlite3 -> SQLite, 그 외 -> JSON + 저널
+    if os.path.splitext(path)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+        return SqliteStore(path)
+    return JournalStore(path)
+
+# inotify 이벤트 종류
+IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE, IN_DELETE = 0x2, 0x8, 0x80, 0x100, 0x200
+_INOTIFY_HEADER = struct.Struct("iIII")
+
+def _inotify_open(directory):
+    # 리눅스면 ctypes 로 inotify 를 연다. 안 되면 None(상태 폴링으로 대체)
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        logging.exception("inotify 사용 불가 - 상태 폴링으로 감시합니다")
+        return None
+
+def _inotify_names(buf):
+    pos = 0
+    while pos + _INOTIFY_HEADER.size <= len(buf):
+        _, _, _, length = _INOTIFY_HEADER.unpack_from(buf, pos)
+        pos += _INOTIFY_HEADER.size
+        yield buf[pos:pos + length].rstrip(b"\0").decode(errors="replace")
+        pos += length
+
+class StoreWatcher:
+    # 다른 프로세스/스크립트가 저장 파일을 바꾸면 on_change() 호출.
+    # inotify 가 있으면 이벤트로 바로 깨어나고, 없으면 interval 초마다 signature 를 비교한다.
+    # 어느 쪽이든 store.changed_on_disk() 로 확인하므로 자기 쓰기에는 반응하지 않는다.
+    def __init__(self, store, on_change, interval=0.5, debounce=0.1):
+        self.store = store
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread = None
+        self._paths = [os.path.abspath(p) for p in store.watch_paths()]
+        self._fd = None
+        self.mode = None
+
+    def start(self):
+        # inotify 등록은 여기서(호출한 쪽이 start() 직후에 일어난 변경도 놓치지 않게)
+        if self._paths:
+            self._fd = _inotify_open(os.path.dirname(self._paths[0]))
+        self._thread = threading.Thread(target=self._run, name="alarm-store-watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _check(self):
+        try:
+            if self.store.changed_on_disk():
+                self.on_change()
+        except Exception:
+            logging.exception("저장 파일 변경 처리 실패")
+
+    def _run(self):
+        if not self._paths:
+            return
+        names = {os.path.basename(p) for p in self._paths}
+        fd = self._fd
+        self.mode = "inotify" if fd is not None else "poll"
+        # 마지막으로 읽은 뒤 감시를 걸기 전까지 바뀐 것
+        self._check()
+        try:
+            while not self._stop.is_set():
+                if fd is None:
+                    self._stop.wait(self.interval)
+                    self._check()
+                    continue
+                # 이벤트가 없어도 가끔은 확인(네트워크 드라이브 등 inotify 가 놓치는 경우)
+                ready, _, _ = select.select([fd], [], [], 5.0)
+                if not ready:
+                    self._check()
+                    continue
+                hit = False
+                # 연달아 오는 이벤트(저장 중 여러 번 쓰기)를 잠깐 모았다가 한 번만 처리
+                while True:
+                    try:
+                        buf = os.read(fd, 65536)
+                    except BlockingIOError:
+                        if self._stop.wait(self.debounce):
+                            return
+                        ready, _, _ = select.select([fd], [], [], 0)
+                        if not ready:
+                            break
+                        continue
+                    hit = hit or any(n in names for n in _inotify_names(buf))
+                if hit:
+                    self._check()
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+def migrate(src, dst):
+    # alarms.json(+저널) -> SQLite 등 다른 저장소로 복사
+    alarms = open_store(src).load()
+    target = open_store(dst)
+    target.save_all(alarms)
+    target.close()
+    return len(alarms)
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="알람 저장소 도구")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="alarms.json 을 SQLite(.db) 등으로 옮긴다")
+    m.add_argument("src")
+    m.add_argument("dst")
+    args = ap.parse_args(argv)
+    if os.path.abspath(args.src) == os.path.abspath(args.dst):
+        ap.error("원본과 대상이 같습니다")
+    n = migrate(args.src, args.dst)
+    print(f"{n}개 알람을 {args.dst} 로 옮겼습니다")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from store_calendaralarmclock import JournalStore
+from engine_calendaralarmclock import AlarmEngine, ReadOnlyError
+from logCalendarAlarmClock import FireHistory, FIRE
+
+# 같은 저장 파일을 연 두 인스턴스(리더 A, 팔로워 B)의 리더 전환
+# - A 가 울린 회차를 B 가 넘겨받은 뒤 다시 울리지 않는다(분산 스케줄러 포함)
+# - 울림 기록 링 버퍼는 A 의 기록 뒤에 이어 쓴다
+
+def _wait(cond, timeout):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return cond()
+
+class HandoverTest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp(prefix="handover_")
+        self.path = os.path.join(self.dir, "alarms.json")
+        self.history = os.path.join(self.dir, "history.bin")
+        self._env = {k: os.environ.get(k) for k in ("CALENDARALARM_HISTORY", "CALENDARALARM_ELECT")}
+        os.environ["CALENDARALARM_HISTORY"] = self.history
+        os.environ.pop("CALENDARALARM_ELECT", None)
+        self.engines = []
+
+    def tearDown(self):
+        for e in self.engines:
+            e.stop()
+            e.store.close()
+        for k, v in self._env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def _engine(self, **kw):
+        e = AlarmEngine(JournalStore(self.path), **kw).start()
+        self.engines.append(e)
+        return e
+
+    def test_history_appends_after_other_writer(self):
+        t = datetime(2026, 1, 1, 9)
+        other = FireHistory(self.history, capacity=16)
+        mine = FireHistory(self.history, capacity=16)   # 다른 쪽이 쓰기 전에 열어 둠(count 0)
+        for i in range(3):
+            other.append("a", t + timedelta(minutes=i), FIRE, t)
+        mine.append("b", t + timedelta(minutes=9), FIRE, t)
+        other.close()
+        mine.close()
+        with FireHistory(self.history) as h:
+            self.assertEqual(len(h), 4)
+            self.assertEqual([r.scheduled.minute for r in h.records()], [0, 1, 2, 9])
+
+    def _handover(self, shards):
+        a = self._engine(shards=shards)
+        b = self._engine(shards=shards)
+        self.assertTrue(a.is_leader)
+        self.assertFalse(b.is_leader)
+        with self.assertRaises(ReadOnlyError):
+            b.call(b.add({"name": "x", "times": ["10:00"]}))
+        due = (datetime.now() + timedelta(seconds=2)).replace(microsecond=0)
+        a.call(a.add({"name": "soon", "times": [due.strftime("%H:%M:%S")], "recurrence": "daily"}))
+        self.assertTrue(_wait(lambda: a.fired == 1, 10), "리더가 울리지 않음")
+        # 팔로워에도 울림 기록이 도착한 뒤 리더 종료
+        self.assertTrue(_wait(lambda: any(x.get("last_triggered") for x in b.alarms), 5))
+        a.stop()
+        t0 = time.monotonic()
+        self.assertTrue(_wait(lambda: b.is_leader, 5))
+        self.assertLess(time.monotonic() - t0, 1.0)
+        time.sleep(1.5)
+        self.assertEqual(b.fired, 0, "넘겨받은 인스턴스가 이미 울린 회차를 다시 울림")
+        b.record(b.alarms[0]["id"], due, FIRE)
+        with FireHistory(self.history) as h:
+            self.assertEqual(len(h), 2, "넘겨받은 뒤 울림 기록이 이전 기록을 덮어씀")
+
+    def test_handover(self):
+        self._handover(shards=None)
+
+    def test_handover_sharded(self):
+        self._handover(shards=1)
+
+if __name__ == "__main__":
+    unittest.main()
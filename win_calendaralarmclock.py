@@ -1,38 +1,47 @@
 import os
 import sys
-import json
 import threading
 import time
 import uuid
 import logging
 import calendar
-from datetime import datetime
+from datetime import datetime, date
+from core_calendaralarmclock import parse_time_token
+from holiday_calendaralarmclock import CALENDARS
+from expand_calendaralarmclock import MonthCountCache
+from store_calendaralarmclock import open_store, alarm_tags, AlarmSnapshot
+from engine_calendaralarmclock import AlarmEngine
+from dispatch_calendaralarmclock import FireExecutor, FireCoalescer, lead_event, batch_lines
+from metrics_calendaralarmclock import METRICS
+from logCalendarAlarmClock import SNOOZE, DISMISS
+import ical_calendaralarmclock as ical
 # tkinter 안전 로드
 try:
     import tkinter as tk
-    from tkinter import simpledialog, messagebox, ttk
+    from tkinter import simpledialog, messagebox, ttk, filedialog
 except Exception as e:
     raise SystemExit("tkinter을 사용할 수 없습니다. Python 설치 시 'tcl/tk' 포함했는지 확인하세요.") from e
 
-# 사운드 처리 (winsound 또는 대체)
-try:
-    import winsound
+# 사운드 처리 (winsound 또는 대체) - 처음 울릴 때 불러온다
+MB_ICONASTERISK = 0x40
 
-    def beep_alert():
+def beep_alert():
+    try:
+        import winsound
+    except Exception:
+        winsound = None
+    if winsound is not None:
         for _ in range(3):
             winsound.Beep(1000, 300)
             time.sleep(0.1)
-except Exception:
+        return
     import ctypes
-    MB_ICONASTERISK = 0x40
-
-    def beep_alert():
-        for _ in range(3):
-            try:
-                ctypes.windll.user32.MessageBeep(MB_ICONASTERISK)
-            except Exception:
-                pass
-            time.sleep(0.2)
+    for _ in range(3):
+        try:
+            ctypes.windll.user32.MessageBeep(MB_ICONASTERISK)
+        except Exception:
+            pass
+        time.sleep(0.2)
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
@@ -49,111 +58,24 @@ calendar.setfirstweekday(calendar.MONDAY)
 REC_MAP = {"매일": "daily", "매주": "weekly", "매월": "monthly", "매년": "yearly", "간격": "interval"}
 REC_MAP_INV = {v: k for k, v in REC_MAP.items()}
 
+SNOOZE_MINUTES = 5
+POPUP_DELAY = METRICS.histogram("alarm_popup_delay_seconds", "알람 발생 -> 팝업 표시(Tk 메인 루프 도달)까지")
+
+# 저장소: 기본은 alarms.json 스냅샷 + 변경 저널, CALENDARALARM_STORE=*.db 면 SQLite
+store = open_store(os.environ.get("CALENDARALARM_STORE") or DATA_FILE)
+
 def ensure_data_file():
-    if not os.path.exists(DATA_FILE):
-        save_alarms([])
+    store.ensure()
 
 def load_alarms():
-    ensure_data_file()
-    try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        logging.exception("alarms.json 로드 실패 - 빈 리스트로 초기화")
-        return []
+    return store.load()
 
 def save_alarms(alarms):
     try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(alarms, f, ensure_ascii=False, indent=2)
+        store.save_all(alarms)
     except Exception:
         logging.exception("alarms.json 저장 실패")
 
-def parse_time_token(tok):
-    tok = tok.strip()
-    if not tok:
-        return None
-    parts = tok.split(":")
-    try:
-        if len(parts) == 2:
-            return f"{int(parts[0]):02d}:{int(parts[1]):02d}:00"
-        if len(parts) == 3:
-            return f"{int(parts[0]):02d}:{int(parts[1]):02d}:{int(parts[2]):02d}"
-    except Exception:
-        return None
-    return None
-
-def time_matches_spec(now, spec):
-    cur = now.strftime("%H:%M:%S")
-    return cur.startswith(spec)
-
-def should_trigger(alarm, now):
-    if not alarm.get("enabled", True):
-        return False
-    # 기간 검사(선택)
-    ps = alarm.get("period_start") or alarm.get("start_date")
-    pe = alarm.get("period_end")
-    if ps:
-        try:
-            start_dt = datetime.fromisoformat(ps)
-            if now < start_dt:
-                return False
-        except Exception:
-            return False
-    if pe:
-        try:
-            end_dt = datetime.fromisoformat(pe)
-            if now > end_dt:
-                return False
-        except Exception:
-            return False
-
-    times = alarm.get("times", [])
-    if not times:
-        return False
-    if not any(time_matches_spec(now, t) for t in times):
-        return False
-
-    last = alarm.get("last_triggered")
-    if last == now.strftime("%Y-%m-%d %H:%M:%S"):
-        return False
-
-    rt = alarm.get("recurrence", "daily")
-    if rt == "daily":
-        return True
-    if rt == "weekly":
-        weekdays = alarm.get("weekdays", [])
-        return now.weekday() in weekdays
-    if rt == "monthly":
-        day = alarm.get("day_of_month")
-        return day == now.day
-    if rt == "yearly":
-        m = alarm.get("month")
-        d = alarm.get("day")
-        return (m == now.month and d == now.day)
-    if rt == "interval":
-        # 핵심: interval_offsets(1-based)로 간격내 어떤 날에 울릴지 결정
-        interval = max(1, int(alarm.get("interval_days", 1)))
-        start = alarm.get("period_start") or alarm.get("start_date")
-        if not start:
-            # 시작일이 없으면 매 interval마다(즉 delta 기준 없음) 동작으로 간주
-            return True
-        try:
-            start_date = datetime.fromisoformat(start).date()
-            delta = (now.date() - start_date).days
-            if delta < 0:
-                return False
-            pos = (delta % interval) + 1  # 1 기반 위치
-            offsets = alarm.get("interval_offsets")  # 예: [1,3]
-            if offsets:
-                return int(pos) in [int(x) for x in offsets]
-            else:
-                # offsets 지정 없으면 기본적으로 매 interval의 첫날(pos==1)만 동작
-                return pos == 1
-        except Exception:
-            return False
-    return False
-
 # 간단 툴팁 클래스 (tkinter에 툴팁 추가)
 class Tooltip:
     def __init__(self, widget, text, delay=400):
@@ -178,12 +100,16 @@ class Tooltip:
     def show(self):
         if self.tw:
             return
+        # text 가 함수면 보여줄 때마다 불러 내용을 정한다(빈 문자열이면 표시 안 함)
+        text = self.text() if callable(self.text) else self.text
+        if not text:
+            return
         x = self.widget.winfo_rootx() + 20
         y = self.widget.winfo_rooty() + self.widget.winfo_height() + 1
         self.tw = tk.Toplevel(self.widget)
         self.tw.wm_overrideredirect(True)
         self.tw.wm_geometry(f"+{x}+{y}")
-        lbl = ttk.Label(self.tw, text=self.text, background="#ffffe0", relief="solid", borderwidth=1)
+        lbl = ttk.Label(self.tw, text=text, background="#ffffe0", relief="solid", borderwidth=1, justify="left")
         lbl.pack(ipadx=4, ipady=2)
 
     def hide(self):
@@ -194,7 +120,152 @@ class Tooltip:
                 pass
             self.tw = None
 
-import AlarmMusicPlayerFile as music_player  # 추가된 코드
+def music_player():
+    # 음악 모듈은 처음 쓸 때 불러온다(창이 뜨는 데 필요 없음)
+    import AlarmMusicPlayerFile
+    return AlarmMusicPlayerFile
+
+# 가상 스크롤 알람 목록: 보이는 줄 수만큼의 Treeview 행만 만들어 두고 스크롤 위치에 맞춰 내용만 바꿔 쓴다.
+# 알람 수와 상관없이 다시 그리는 비용은 보이는 줄 수에 비례한다.
+class VirtualAlarmList(ttk.Frame):
+    COLUMNS = (("name", "제목", 160), ("rec", "반복", 60), ("times", "시간", 200), ("en", "상태", 60),
+               ("tags", "태그", 100))
+
+    def __init__(self, parent, rows=8):
+        super().__init__(parent)
+        self.alarms = AlarmSnapshot()   # 엔진 스냅샷(읽기 전용)
+        self.offset = 0
+        self._lines = {}          # id -> 표시용 값(보이는 줄만 만들고 변경 시 지운다)
+        self._selected_id = None
+        self.tree = ttk.Treeview(self, columns=[c[0] for c in self.COLUMNS], show="headings",
+                                 height=rows, selectmode="browse")
+        for key, title, width in self.COLUMNS:
+            self.tree.heading(key, text=title)
+            self.tree.column(key, width=width, stretch=True)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.scrollbar.pack(side="left", fill="y")
+        self._pool = []
+        self._resize_pool(rows)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_by(-3 if e.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(3))
+        self.tree.bind("<Up>", lambda e: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda e: self._move_selection(1))
+        self.tree.bind("<Configure>", self._on_configure)
+
+    # --- 데이터 ---
+    def set_items(self, alarms):
+        # 전체 교체(시작/다시 읽기)
+        self.alarms = alarms
+        self._lines.clear()
+        self.render()
+
+    def apply(self, event, alarms=None):
+        # 엔진 ChangeEvent 하나 반영(alarms: 그 변경이 들어 있는 스냅샷). 보이는 범위만 다시 쓴다
+        if alarms is not None:
+            self.alarms = alarms
+        if event.alarm_id is not None:
+            self._lines.pop(event.alarm_id, None)
+        if event.kind == "removed" and event.alarm_id == self._selected_id:
+            self._selected_id = None
+        if event.kind != "fired":  # 울림 기록은 목록 표시 내용에 없다
+            self.render()
+
+    def _line(self, a):
+        aid = a.get("id")
+        vals = self._lines.get(aid)
+        if vals is None:
+            rec_kor = REC_MAP_INV.get(a.get("recurrence"), a.get("recurrence"))
+            vals = self._lines[aid] = (a.get("name", "(이름없음)"), rec_kor, ",".join(a.get("times", [])),
+                                       "사용" if a.get("enabled", True) else "비사용", ",".join(alarm_tags(a)))
+        return vals
+
+    def selected_alarm(self):
+        if self._selected_id is None:
+            return None
+        return self.alarms.get(self._selected_id)
+
+    # --- 화면 ---
+    def _resize_pool(self, rows):
+        rows = max(1, rows)
+        while len(self._pool) < rows:
+            self._pool.append(self.tree.insert("", "end", values=("",) * len(self.COLUMNS)))
+        while len(self._pool) > rows:
+            self.tree.delete(self._pool.pop())
+
+    def render(self):
+        n = len(self.alarms)
+        rows = len(self._pool)
+        self.offset = max(0, min(self.offset, n - rows))
+        sel = None
+        for i, iid in enumerate(self._pool):
+            k = self.offset + i
+            a = self.alarms[k] if k < n else None
+            if a is None:
+                self.tree.item(iid, values=("",) * len(self.COLUMNS), tags=("empty",))
+                continue
+            self.tree.item(iid, values=self._line(a), tags=())
+            if a.get("id") == self._selected_id:
+                sel = iid
+        if sel:
+            self.tree.selection_set(sel)
+        elif self.tree.selection():
+            self.tree.selection_remove(self.tree.selection())
+        if n <= rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.offset / n, (self.offset + rows) / n)
+
+    def scroll_by(self, delta):
+        old = self.offset
+        self.offset = max(0, min(self.offset + delta, len(self.alarms) - len(self._pool)))
+        if self.offset != old:
+            self.render()
+        return "break"
+
+    def _on_scroll(self, *args):
+        n, rows = len(self.alarms), len(self._pool)
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * n)
+        elif args[0] == "scroll":
+            step = rows if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def _on_configure(self, event):
+        # 창 크기에 맞춰 행 개수 조정. 첫 행의 위치/높이로 헤더와 행 높이를 잰다
+        box = self.tree.bbox(self._pool[0])
+        if not box:
+            return
+        rows = max(1, (event.height - box[1]) // max(1, box[3]))
+        if rows != len(self._pool):
+            self._resize_pool(rows)
+            self.render()
+
+    def _on_select(self, _):
+        sel = self.tree.selection()
+        if not sel:
+            return
+        k = self.offset + self._pool.index(sel[0])
+        if k < len(self.alarms):
+            self._selected_id = self.alarms[k].get("id")
+
+    def _move_selection(self, delta):
+        ids = [a.get("id") for a in self.alarms[self.offset:self.offset + len(self._pool)]]
+        if self._selected_id in ids:
+            k = self.offset + ids.index(self._selected_id) + delta
+        else:
+            k = self.offset
+        if 0 <= k < len(self.alarms):
+            self._selected_id = self.alarms[k].get("id")
+            if k < self.offset:
+                self.offset = k
+            elif k >= self.offset + len(self._pool):
+                self.offset = k - len(self._pool) + 1
+            self.render()
+        return "break"
 
 class AddAlarmDialog(simpledialog.Dialog):
     def __init__(self, parent, prefill_date=None):
@@ -249,10 +320,20 @@ class AddAlarmDialog(simpledialog.Dialog):
         self.period_end.grid(row=8, column=1, sticky="ew")
         Tooltip(self.period_end, "알람이 유효한 기간의 종료 시각 입력(예: 2025-11-15 18:00:00)")
 
+        ttk.Label(master, text="제외 달력(콤마구분, 선택):").grid(row=9, column=0, sticky="w")
+        self.exclude = ttk.Entry(master)
+        self.exclude.grid(row=9, column=1, sticky="ew")
+        Tooltip(self.exclude, lambda: "이 달력에 든 날은 울리지 않음. 사용 가능: " + (", ".join(CALENDARS.names()) or "없음(holidays.json)"))
+
+        ttk.Label(master, text="태그(콤마구분, 선택):").grid(row=10, column=0, sticky="w")
+        self.tags = ttk.Entry(master)
+        self.tags.grid(row=10, column=1, sticky="ew")
+        Tooltip(self.tags, "예: 야간조,본사 — 같은 태그의 알람을 한꺼번에 켜고 끌 수 있음")
+
         # 음악 파일 선택 버튼 추가
-        ttk.Button(master, text="음악 파일 선택", command=self.select_music_file).grid(row=9, column=0, columnspan=2, sticky="ew")
+        ttk.Button(master, text="음악 파일 선택", command=self.select_music_file).grid(row=11, column=0, columnspan=2, sticky="ew")
         self.music_label = ttk.Label(master, text="선택된 음악 파일 없음")
-        self.music_label.grid(row=10, column=0, columnspan=2, sticky="ew")
+        self.music_label.grid(row=12, column=0, columnspan=2, sticky="ew")
 
         # prefill 날짜 보조
         if self.prefill_date:
@@ -263,7 +344,7 @@ class AddAlarmDialog(simpledialog.Dialog):
         return self.name
 
     def select_music_file(self):
-        self.music_file = music_player.select_music_file()
+        self.music_file = music_player().select_music_file()
         if self.music_file:
             self.music_label.config(text=os.path.basename(self.music_file))
 
@@ -359,6 +440,12 @@ class AddAlarmDialog(simpledialog.Dialog):
             alarm["period_start"] = self.period_start.get().strip()
         if self.period_end.get().strip():
             alarm["period_end"] = self.period_end.get().strip()
+        exclude = [n.strip() for n in self.exclude.get().split(",") if n.strip()]
+        if exclude:
+            alarm["exclude_calendars"] = exclude
+        tags = alarm_tags({"tags": self.tags.get()})
+        if tags:
+            alarm["tags"] = list(tags)
 
         # 간격(recurrence == 'interval')이고 times 비어있고 interval_count가 있으면 자동 시간 생성(기존 로직 유지)
         if alarm.get("recurrence") == "interval" and (not alarm.get("times")):
@@ -373,13 +460,25 @@ class AlarmApp:
     def __init__(self, root):
         self.root = root
         root.title("캘린더 알람 시계")
-        self.alarms = load_alarms()
         self.current_year = datetime.now().year
         self.current_month = datetime.now().month
+        # 알람 후속 작업은 고정 크기 작업 스레드에서, 소리는 전용 채널 하나에서 순서대로
+        self.executor = FireExecutor(workers=2)
+        # 같은 순간에 울린 알람들은 팝업 하나, 소리 한 번으로 묶는다
+        self.coalescer = FireCoalescer(lambda events, first_at: self.executor.submit(self.fire_batch, events, first_at))
+        # 스케줄링/저장은 헤드리스 엔진(별도 스레드의 asyncio 루프)이 맡고 이 클래스는 화면만 담당
+        self.engine = AlarmEngine(store)
+        self.engine.start()
+        self.month_cache = MonthCountCache(self.engine.rules_for)
+        self._changes = []
+        self._changes_lock = threading.Lock()
+        self.engine.call(self.engine.subscribe(self.on_alarm_due))
+        self.engine.call(self.engine.subscribe(self.on_alarms_changed, changes=True))
+        self.alarms = self.engine.alarms
         self.build_ui()
-        self.running = True
-        t = threading.Thread(target=self.scheduler_loop, daemon=True)
-        t.start()
+        # 알람 음악은 미리 디코딩해 두어 울릴 때 디스크를 읽지 않게 한다
+        for path in {a.get("music_file") for a in self.alarms if a.get("music_file")}:
+            self.executor.submit(music_player().preload, path)
 
     def build_ui(self):
         # 상단: 달력 네비게이션
@@ -408,15 +507,22 @@ class AlarmApp:
 
         self.days_grid = ttk.Frame(cal_frame)
         self.days_grid.pack()
+        # 6주 x 7일 칸을 한 번만 만들고 달이 바뀌면 글자/스타일만 바꾼다
+        ttk.Style().configure("Today.TButton", foreground="blue")
+        ttk.Style().configure("Holiday.TButton", foreground="red", background="#eeeeee")
+        self._cell_days = [0] * 42
+        self._cells = []
+        for i in range(42):
+            btn = ttk.Button(self.days_grid, width=6, command=lambda i=i: self._on_cell(i))
+            btn.grid(row=i // 7, column=i % 7, padx=2, pady=2)
+            Tooltip(btn, lambda i=i: self._cell_tooltip(i))
+            self._cells.append(btn)
 
         # 하단: 알람 리스트와 조작 버튼 (한글)
         bottom = ttk.Frame(self.root, padding=6)
         bottom.pack(fill="both", expand=True)
-        self.listbox = tk.Listbox(bottom, height=8)
-        self.listbox.pack(side="left", fill="both", expand=True)
-        scrollbar = ttk.Scrollbar(bottom, orient="vertical", command=self.listbox.yview)
-        scrollbar.pack(side="left", fill="y")
-        self.listbox.config(yscrollcommand=scrollbar.set)
+        self.alarm_list = VirtualAlarmList(bottom, rows=8)
+        self.alarm_list.pack(side="left", fill="both", expand=True)
 
         btn_frame = ttk.Frame(self.root, padding=6)
         btn_frame.pack(fill="x")
@@ -429,54 +535,166 @@ class AlarmApp:
         self.btn_toggle = ttk.Button(btn_frame, text="사용/비사용 토글", command=self.toggle_alarm)
         self.btn_toggle.pack(side="left")
         Tooltip(self.btn_toggle, "선택한 알람을 사용 또는 비사용으로 전환합니다")
-        self.btn_refresh = ttk.Button(btn_frame, text="새로고침", command=self.refresh_list)
+        self.btn_refresh = ttk.Button(btn_frame, text="새로고침", command=self.reload_list)
         self.btn_refresh.pack(side="left")
         Tooltip(self.btn_refresh, "알람 목록을 새로 불러옵니다")
+        self.btn_import = ttk.Button(btn_frame, text="iCal 가져오기", command=self.import_ics)
+        self.btn_import.pack(side="left")
+        Tooltip(self.btn_import, ".ics 파일의 일정을 알람으로 추가합니다")
+        self.btn_export = ttk.Button(btn_frame, text="iCal 내보내기", command=self.export_ics)
+        self.btn_export.pack(side="left")
+        Tooltip(self.btn_export, "알람을 .ics 파일로 저장합니다")
+        self.btn_tag = ttk.Button(btn_frame, text="태그 켜기/끄기", command=self.bulk_tag)
+        self.btn_tag.pack(side="left")
+        Tooltip(self.btn_tag, "같은 태그의 알람을 한꺼번에 켜거나 끕니다")
+        self.btn_expired = ttk.Button(btn_frame, text="만료 삭제", command=self.delete_expired)
+        self.btn_expired.pack(side="left")
+        Tooltip(self.btn_expired, "기간 종료가 지난 알람을 모두 삭제합니다")
 
         self.refresh_list()
-        self.draw_calendar()
+
+    def reload_list(self):
+        # 파일이 실제로 바뀌었을 때만 다시 읽는다(바뀌었으면 reloaded 이벤트로 목록이 갱신됨)
+        if not self.engine.call(self.engine.reload()):
+            self.status_note("변경 없음")
+
+    def import_ics(self):
+        path = filedialog.askopenfilename(title="iCalendar 가져오기",
+                                          filetypes=[("iCalendar", "*.ics"), ("모든 파일", "*.*")])
+        if not path:
+            return
+
+        # 큰 파일도 화면이 멈추지 않게 별도 스레드에서 읽고, 묶음마다 엔진에서 한 번씩 저장
+        def work():
+            try:
+                stats = ical.import_ics(path, lambda batch: self.engine.call(self.engine.add_many(batch), None))
+                msg = ical.summary("가져왔습니다", stats)
+            except Exception as e:
+                logging.exception("iCalendar 가져오기 실패")
+                msg = f"가져오기 실패: {e}"
+            self.root.after(0, lambda: messagebox.showinfo("iCalendar", msg))
+
+        threading.Thread(target=work, name="ics-import", daemon=True).start()
+
+    def export_ics(self):
+        path = filedialog.asksaveasfilename(title="iCalendar 내보내기", defaultextension=".ics",
+                                            filetypes=[("iCalendar", "*.ics")])
+        if not path:
+            return
+        try:
+            stats = ical.export_ics(list(self.alarms), path)
+        except OSError as e:
+            messagebox.showerror("오류", f"내보내기 실패: {e}")
+            return
+        messagebox.showinfo("iCalendar", ical.summary(f"{os.path.basename(path)} 로 내보냈습니다", stats))
+
+    def _title(self):
+        return "캘린더 알람 시계" + ("" if self.engine.is_leader else " (읽기 전용)")
+
+    def status_note(self, text):
+        self.root.title(f"{self._title()} - {text}")
+        self.root.after(2000, lambda: self.root.title(self._title()))
+
+    def _update_role(self):
+        # 같은 alarms.json 을 연 다른 창이 알람을 담당하면(팔로워) 변경 버튼을 끈다. 넘겨받으면 reloaded 로 다시 켜진다
+        state = "!disabled" if self.engine.is_leader else "disabled"
+        for btn in (self.btn_add, self.btn_del, self.btn_toggle, self.btn_import, self.btn_tag, self.btn_expired):
+            btn.state([state])
+        self.root.title(self._title())
 
     def refresh_list(self):
-        self.alarms = load_alarms()
-        self.listbox.delete(0, tk.END)
-        for a in self.alarms:
-            times = ",".join(a.get("times", []))
-            en = "사용" if a.get("enabled", True) else "비사용"
-            rec_kor = REC_MAP_INV.get(a.get("recurrence"), a.get("recurrence"))
-            line = f"{a.get('name','(이름없음)')} | {rec_kor} | {times} | {en}"
-            self.listbox.insert(tk.END, line)
+        # 전체 다시 그리기(시작/다시 읽기/리더 전환). 평소 변경은 on_alarms_changed 가 부분 반영한다
+        self._update_role()
+        self.alarms = self.engine.alarms
+        self.alarm_list.set_items(self.alarms)
+        self.month_cache.clear()
+        self.draw_calendar()
+
+    def on_alarms_changed(self, event):
+        # 엔진 스레드에서 호출됨 -> 모아서 Tk 루프에서 한 번에 반영
+        with self._changes_lock:
+            self._changes.append(event)
+            if len(self._changes) > 1:
+                return
+        self.root.after(0, self._flush_changes)
+
+    def _flush_changes(self):
+        with self._changes_lock:
+            events, self._changes = self._changes, []
+        # 지금 스냅샷 하나를 잡는다(모인 변경이 모두 들어 있음). 버전이 이어지면 변경분만 반영하고,
+        # 전체 다시 읽기이거나 버전을 건너뛰었으면(놓친 변경) 전체를 다시 그린다
+        snap = self.engine.alarms
+        seen = self.alarms.version
+        for ev in events:
+            if ev.kind == "reloaded" or ev.version is None or ev.version > seen + 1:
+                self.refresh_list()
+                return
+            seen = max(seen, ev.version)
+        self.alarms = snap
+        months = set()
+        for ev in events:
+            self.alarm_list.apply(ev, snap)
+            months.update(self.month_cache.apply(ev.kind, ev.alarm_id, ev.alarm))
+        # 보고 있는 달의 개수가 바뀐 경우에만 달력 칸을 다시 쓴다
+        if (self.current_year, self.current_month) in months:
+            self.draw_calendar()
 
     def add_alarm(self, prefill_date=None):
+        if not self.engine.is_leader:
+            self.status_note("읽기 전용")
+            return
         dlg = AddAlarmDialog(self.root, prefill_date=prefill_date)
         alarm = dlg.result
         if alarm:
             alarm["times"] = [parse_time_token(t) or t for t in alarm.get("times", [])]
             alarm["id"] = str(uuid.uuid4())
             alarm["last_triggered"] = ""
-            self.alarms.append(alarm)
-            save_alarms(self.alarms)
-            self.refresh_list()
+            self.engine.call(self.engine.add(alarm))
+            if alarm.get("music_file"):
+                self.executor.submit(music_player().preload, alarm["music_file"])
 
     def delete_alarm(self):
-        sel = self.listbox.curselection()
-        if not sel:
+        alarm = self.alarm_list.selected_alarm()
+        if alarm is None:
             messagebox.showinfo("안내", "삭제할 알람을 선택하세요.")
             return
-        idx = sel[0]
         if messagebox.askyesno("확인", "선택한 알람을 삭제하시겠습니까?"):
-            self.alarms.pop(idx)
-            save_alarms(self.alarms)
-            self.refresh_list()
+            alarm_id = alarm.get("id")
+            self.engine.call(self.engine.remove(alarm_id))
 
     def toggle_alarm(self):
-        sel = self.listbox.curselection()
-        if not sel:
+        alarm = self.alarm_list.selected_alarm()
+        if alarm is None:
             messagebox.showinfo("안내", "토글할 알람을 선택하세요.")
             return
-        idx = sel[0]
-        self.alarms[idx]["enabled"] = not self.alarms[idx].get("enabled", True)
-        save_alarms(self.alarms)
-        self.refresh_list()
+        self.engine.call(self.engine.toggle(alarm.get("id")))
+
+    def bulk_tag(self):
+        tags = self.engine.store.tags()
+        if not tags:
+            messagebox.showinfo("안내", "태그가 붙은 알람이 없습니다.")
+            return
+        tag = simpledialog.askstring("태그", "대상 태그: " + ", ".join(tags), parent=self.root)
+        tag = (tag or "").strip()
+        if not tag:
+            return
+        if tag not in tags:
+            messagebox.showinfo("안내", f"'{tag}' 태그가 붙은 알람이 없습니다.")
+            return
+        enable = messagebox.askyesnocancel("태그 켜기/끄기", f"'{tag}' 알람 {tags[tag]}개\n예: 켜기 / 아니오: 끄기")
+        if enable is None:
+            return
+        # 저장은 한 번, 목록 갱신은 reloaded 이벤트 한 번
+        n = self.engine.call(self.engine.set_tag_enabled(tag, enable))
+        self.status_note(f"'{tag}' 알람 {n}개를 {'켰' if enable else '껐'}습니다")
+
+    def delete_expired(self):
+        n = len(self.engine.store.expired_ids())
+        if not n:
+            messagebox.showinfo("안내", "기간이 끝난 알람이 없습니다.")
+            return
+        if messagebox.askyesno("확인", f"기간이 끝난 알람 {n}개를 삭제하시겠습니까?"):
+            self.engine.call(self.engine.delete_expired())
 
     def go_prev_month(self):
         if self.current_month == 1:
@@ -495,70 +713,102 @@ class AlarmApp:
         self.draw_calendar()
 
     def draw_calendar(self):
-        # 제목
-        self.month_label.config(text=f"{self.current_year}년 {self.current_month}월")
-        # clear grid
-        for child in self.days_grid.winfo_children():
-            child.destroy()
-        month_days = calendar.monthcalendar(self.current_year, self.current_month)
-        for r, week in enumerate(month_days):
-            for c, day in enumerate(week):
-                if day == 0:
-                    lbl = ttk.Label(self.days_grid, text="", width=6)
-                    lbl.grid(row=r, column=c, padx=2, pady=2)
-                else:
-                    btn = ttk.Button(self.days_grid, text=str(day), width=6)
-                    btn.grid(row=r, column=c, padx=2, pady=2)
-                    def make_cmd(d):
-                        return lambda ev=None: self.add_alarm(prefill_date=(self.current_year, self.current_month, d))
-                    btn.config(command=make_cmd(day))
-                    # 오늘 강조
-                    if (self.current_year, self.current_month, day) == (datetime.now().year, datetime.now().month, datetime.now().day):
-                        btn.state(["!disabled"])
-                        btn.config(style="Today.TButton")
-        # 스타일: 오늘 강조(간단)
-        style = ttk.Style()
-        style.configure("Today.TButton", foreground="blue")
-
-    def scheduler_loop(self):
-        while self.running:
-            now = datetime.now()
-            changed = False
-            for alarm in list(self.alarms):
-                try:
-                    if should_trigger(alarm, now):
-                        alarm["last_triggered"] = now.strftime("%Y-%m-%d %H:%M:%S")
-                        save_alarms(self.alarms)
-                        changed = True
-                        threading.Thread(target=self.fire_alarm, args=(alarm,), daemon=True).start()
-                except Exception:
-                    logging.exception("스케줄러 오류")
-            if changed:
-                self.root.after(0, self.refresh_list)
-            time.sleep(1)
-
-    def fire_alarm(self, alarm):
+        y, m = self.current_year, self.current_month
+        self.month_label.config(text=f"{y}년 {m}월")
+        # 날짜별 알람 개수(달 단위 캐시)
+        counts = self.month_cache.get(self.alarms, y, m)
+        today = datetime.now().date()
+        today_day = today.day if (today.year, today.month) == (y, m) else 0
+        weeks = calendar.monthcalendar(y, m)
+        # 휴일 달력에 든 날은 음영(알람 판정과 같은 연도 비트열)
+        excl = CALENDARS.union()
+        jan1, bits = excl.year(y) if excl is not None else (0, 0)
+        first = date(y, m, 1).toordinal() - 1
+        for i, btn in enumerate(self._cells):
+            r, c = divmod(i, 7)
+            day = weeks[r][c] if r < len(weeks) else 0
+            self._cell_days[i] = day
+            if not day:
+                btn.grid_remove()
+                continue
+            n = counts.get(day)
+            if day == today_day:
+                style = "Today.TButton"
+            elif bits >> (first + day - jan1) & 1:
+                style = "Holiday.TButton"
+            else:
+                style = "TButton"
+            btn.config(text=f"{day}\n({n})" if n else str(day), style=style)
+            btn.grid()
+
+    def _on_cell(self, i):
+        day = self._cell_days[i]
+        if day:
+            self.add_alarm(prefill_date=(self.current_year, self.current_month, day))
+
+    def _cell_tooltip(self, i):
+        day = self._cell_days[i]
+        if not day:
+            return ""
+        lines = CALENDARS.titles_on(date(self.current_year, self.current_month, day))
+        if lines:
+            lines = ["[" + ", ".join(lines) + "]"]
+        lines += self.month_cache.day_alarms(self.alarms, self.current_year, self.current_month, day)
+        return "\n".join(lines)
+
+    def on_alarm_due(self, event):
+        # 엔진 스레드에서 호출됨 (알람 1개씩, 울림 기록은 엔진이 이미 저장함) -> 묶음으로 모은다
+        self.coalescer.add(event)
+
+    @staticmethod
+    def _alarm_line(alarm):
         rec_kor = REC_MAP_INV.get(alarm.get("recurrence"), alarm.get("recurrence"))
-        msg = f"알람: {alarm.get('name')}\n{rec_kor} at {','.join(alarm.get('times', []))}"
+        return f"{alarm.get('name')} - {rec_kor} at {','.join(alarm.get('times', []))}"
+
+    def fire_batch(self, events, triggered_at=None):
+        # 묶음 하나 = 팝업 하나 + 소리 한 번. 다시 알림/끄기는 묶음 전체에 적용
+        lead = lead_event(events)
+        if len(events) == 1:
+            alarm = lead.alarm
+            rec_kor = REC_MAP_INV.get(alarm.get("recurrence"), alarm.get("recurrence"))
+            msg = f"알람: {alarm.get('name')}\n{rec_kor} at {','.join(alarm.get('times', []))}"
+        else:
+            msg = f"알람 {len(events)}개\n" + "\n".join(batch_lines(events, fmt=self._alarm_line))
+        def show():
+            if triggered_at is not None:
+                POPUP_DELAY.observe(time.perf_counter() - triggered_at)
+            # 예: SNOOZE_MINUTES 분 뒤 다시 알림, 아니오: 끄기 (둘 다 울림 기록에 남긴다)
+            outcome = SNOOZE if messagebox.askyesno("알람", f"{msg}\n\n{SNOOZE_MINUTES}분 뒤에 다시 알릴까요?") else DISMISS
+            for e in events:
+                self.engine.record(e.alarm["id"], e.scheduled or datetime.now(), outcome)
+            if outcome == SNOOZE:
+                self.root.after(SNOOZE_MINUTES * 60000, lambda: self.executor.submit(self.fire_batch, events))
         try:
-            self.root.after(0, lambda: messagebox.showinfo("알람", msg))
+            self.root.after(0, show)
         except Exception:
             logging.exception("팝업 실패")
-        try:
-            beep_alert()
-        except Exception:
-            logging.exception("비프 실패")
-        music_file = alarm.get("music_file")
+        # 소리는 오디오 채널에 넘기고 바로 반환(재생을 기다리지 않음). 음악은 대표 알람 것만
+        self.executor.audio.submit(beep_alert)
+        music_file = lead.alarm.get("music_file")
         if music_file:
-            music_player.play_music(music_file)  # 음악 재생
+            self.executor.audio.submit(music_player().play_music, music_file, triggered_at)  # 음악 재생
 
 if __name__ == "__main__":
     ensure_data_file()
     root = tk.Tk()
     app = AlarmApp(root)
     def on_close():
-        app.running = False
-        save_alarms(app.alarms)
+        # 마지막 버전을 저장한다(화면이 들고 있던 스냅샷은 아직 반영 전일 수 있다).
+        # 리더만, 잠금을 쥔 동안(엔진을 멈추면 잠금이 풀려 다른 창이 넘겨받는다). 그 뒤의 울림 기록은 저널에 남는다
+        # 저장은 엔진 스레드에서: 진행 중인 쓰기/압축이 끝난 뒤 한 스레드에서만 쓴다
+        if app.engine.is_leader:
+            try:
+                app.engine.call(app.engine.save_all())
+            except Exception:
+                logging.exception("alarms.json 저장 실패")
+        app.engine.stop()
+        app.coalescer.close()
+        app.executor.shutdown()
         root.destroy()
     root.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
\ No newline at end of file